@@ -4,13 +4,46 @@
 
 from dotenv import load_dotenv
 import os
+import sys
 import csv
 import json
-from pprint import pprint
+import argparse
 from pathlib import Path
 
+from utils.report import ReportBuilder
+from utils.access_index import AccessIndex
+from utils.schedules import analyze_levels
+from utils.columnar import write_columnar
+from utils.user_index import UserIndex
+from utils.access_users import migrate_user, migrate_user_attributes
+from utils.sharding import partition, run_shards, merge_shard_results
+from utils.jobs import run_batch, merge_job_results
+from utils.retry import retry_call
+from utils.failures import failure, summarize, write_failure_log, replay_failures
+from utils.credentials import plan_credentials
+from utils.user_records import UserRecord, AccessProfile
+from utils.transforms import normalize_users
+from utils.eventlog import EventLog
+from utils.tokens import shared_token_manager
+from utils.step_cache import StepCache, prune_cached_failures
+
 load_dotenv(override=True)
 
+STEPS = ["users", "groups", "attributes", "doors", "levels", "calendars", "report"]
+
+parser = argparse.ArgumentParser(description="Migrate Access Control from Org A to Org B.")
+parser.add_argument("--steps", default=",".join(STEPS),
+                    help=f"Comma-separated subset of: {', '.join(STEPS)} (default: all). "
+                         "Skipped steps reuse the results cached by their last run in ../CSVs/.cache")
+parser.add_argument("--retry-failures", action="store_true",
+                    help="Only replay the operations recorded in ../Failures/AccessControl_failures.jsonl")
+args = parser.parse_args()
+
+steps = {s.strip() for s in args.steps.split(",") if s.strip()}
+unknown = steps - set(STEPS)
+if unknown:
+    parser.error(f"unknown steps: {', '.join(sorted(unknown))}")
+
 # Load API keys
 api_key_a = os.getenv("VERKADA_API_KEY_A")
 api_key_b = os.getenv("VERKADA_API_KEY_B")
@@ -19,11 +52,35 @@ api_key_b = os.getenv("VERKADA_API_KEY_B")
 from pykada.core_command import CoreCommandClient
 from pykada.access_control import AccessControlClient
 
-core_client_a = CoreCommandClient(api_key_a)
-core_client_b = CoreCommandClient(api_key_b)
+core_client_a = CoreCommandClient(token_manager=shared_token_manager(api_key_a))
+core_client_b = CoreCommandClient(token_manager=shared_token_manager(api_key_b))
+
+access_client_a = AccessControlClient(token_manager=shared_token_manager(api_key_a))
+access_client_b = AccessControlClient(token_manager=shared_token_manager(api_key_b))
+
+clients = {
+    "core_a": core_client_a,
+    "core_b": core_client_b,
+    "access_a": access_client_a,
+    "access_b": access_client_b,
+}
+
+if args.retry_failures:
+    _, still_failing = replay_failures("AccessControl", clients)
+    # Otherwise a later --steps run would restore the fixed failures from the cache
+    dropped = prune_cached_failures("AccessControl", still_failing)
+    if dropped:
+        print(f"✔ Cleared {dropped} fixed failures from the cached step results\n")
+    sys.exit(0)
 
-access_client_a = AccessControlClient(api_key_a)
-access_client_b = AccessControlClient(api_key_b)
+# Split STEP 1 / STEP 3 across this many worker processes (huge orgs only)
+ACCESS_SHARDS = max(1, int(os.getenv("ACCESS_SHARDS", "1")))
+
+# Shared SQLite job queue; when set, STEP 1 / STEP 3 are handed to Worker.py
+# processes on any host and take precedence over ACCESS_SHARDS
+JOB_QUEUE = os.getenv("JOB_QUEUE")
+
+log = EventLog("AccessControl")
 
 Path("../CSVs").mkdir(exist_ok=True)
 Path("../Documentation").mkdir(exist_ok=True)
@@ -33,6 +90,8 @@ Path("../Documentation").mkdir(exist_ok=True)
 # ============================================
 
 failures = {
+    "user_index": [],
+    "credential_index": [],
     "user_create": [],
     "group_create": [],
     "group_assign": [],
@@ -49,6 +108,7 @@ failures = {
 stats = {
     "users_total": 0,
     "users_created": 0,
+    "users_existing": 0,
     "groups_total": 0,
     "groups_created": 0,
     "group_assign_attempted": 0,
@@ -69,330 +129,389 @@ stats = {
     "mfa_success": 0,
     "plates_attempted": 0,
     "plates_success": 0,
+    "credentials_skipped": 0,
+    "credentials_in_org_b": 0,
 }
 
-# ============================================
-# STEP 1 — MIGRATE USERS
-# ============================================
-
-all_users_a = access_client_a.get_all_access_users()["access_members"]
-stats["users_total"] = len(all_users_a)
+# Skipped steps (--steps) are restored from here so the report stays complete
+step_cache = StepCache("AccessControl", stats, failures)
+if steps != set(STEPS):
+    print(f"Running steps: {', '.join(s for s in STEPS if s in steps)}")
 
-# user_id → full_name
-user_lookup = {}
 
-for user in all_users_a:
-    uid = user["user_id"]
-    full_name = user["full_name"]
-    email = user.get("email", "")
-    user_lookup[uid] = full_name
+def failure_count():
+    return sum(len(items) for items in failures.values())
 
-    core_user = core_client_a.get_user(uid)
 
-    first, *rest = full_name.split(" ")
-    last = rest[0] if rest else ""
+def run_logged(op, label, items, entity, migrate):
+    """In-process STEP 1 / STEP 3 loop: one event per user plus a progress bar.
 
-    try:
-        core_client_b.create_user(
-            external_id=uid,
-            company_name=user.get("company_name"),
-            department=user.get("department"),
-            department_id=user.get("department_id"),
-            email=email,
-            employee_title=user.get("employee_title"),
-            first_name=first,
-            last_name=last,
-            phone=core_user.get("phone")
-        )
-        stats["users_created"] += 1
-    except Exception as e:
-        failures["user_create"].append({
-            "user_id": uid,
-            "name": full_name,
-            "email": email,
-            "reason": str(e)
-        })
+    migrate() records its own failures; a user is "partial" if any were added.
+    """
+    bar = log.progress(len(items), label)
+    for item in items:
+        before = failure_count()
+        with log.timed(op, entity(item)) as event:
+            migrate(item)
+            added = failure_count() - before
+            if added:
+                event.update(outcome="partial", failures=added)
+        bar.update(failed=bool(added))
+    bar.close()
 
-# ============================================
-# STEP 2 — MIGRATE ACCESS GROUPS
-# ============================================
 
-groups_a = access_client_a.get_access_groups()["access_groups"]
+def fetch_org_a_users():
+    # Compact records; the raw member dicts are dropped as soon as they are parsed
+    return normalize_users(
+        [UserRecord.from_api(m) for m in access_client_a.get_all_access_users()["access_members"]]
+    )
 
-stats["groups_total"] = len(groups_a)
 
-group_name_lookup = {g["group_id"]: g["name"] for g in groups_a}
+def profile_dict(profile):
+    return profile.to_dict() if profile is not None else None
 
-group_name_to_b_id = {}
 
-for g in groups_a:
-    name = g["name"]
+def load_org_b_users():
     try:
-        created = access_client_b.create_access_group(name=name)
-        group_name_to_b_id[name] = created["group_id"]
-        stats["groups_created"] += 1
+        return UserIndex.load(access_client_b)
     except Exception as e:
-        failures["group_create"].append({"group_name": name, "reason": str(e)})
+        failures["user_index"].append({"org": "B", "reason": str(e)})
+        return UserIndex()
+
 
 # ============================================
-# STEP 3 — USER ACCESS ATTRIBUTES
+# STEP 1 — MIGRATE USERS
 # ============================================
 
-for u in all_users_a:
-    uid = u["user_id"]
-    full = access_client_a.get_access_user(user_id=uid)
-    full_name = user_lookup.get(uid, "(unknown user)")
+if "users" in steps:
+    step_cache.begin("users")
 
-    # BLE
-    if full.get("ble_unlock"):
-        stats["ble_attempted"] += 1
-        try:
-            access_client_b.activate_ble_for_access_user(external_id=uid)
-            stats["ble_success"] += 1
-        except Exception as e:
-            failures["ble_toggle"].append({"user": full_name, "reason": str(e)})
+    all_users_a = fetch_org_a_users()
+    stats["users_total"] = len(all_users_a)
 
-    # Remote Unlock
-    if full.get("remote_unlock"):
-        stats["remote_attempted"] += 1
-        try:
-            access_client_b.activate_remote_unlock_for_user(external_id=uid)
-            stats["remote_success"] += 1
-        except Exception as e:
-            failures["remote_toggle"].append({"user": full_name, "reason": str(e)})
+    # Bulk-load Org B's users once so existing users are skipped, not re-created
+    user_index_b = load_org_b_users()
 
-    # Start/End Dates
-    if full.get("start_date"):
-        stats["start_attempted"] += 1
-        try:
-            access_client_b.set_start_date_for_user(
-                external_id=uid,
-                start_date=full["start_date"]
-            )
-            stats["start_success"] += 1
-        except Exception as e:
-            failures["start_date"].append({"user": full_name, "reason": str(e)})
+    # Users skipped because they already exist in Org B
+    existing_users = []
+    users_to_create = []
 
-    if full.get("end_date"):
-        stats["end_attempted"] += 1
-        try:
-            access_client_b.set_end_date_for_user(
-                external_id=uid,
-                end_date=full["end_date"]
-            )
-            stats["end_success"] += 1
-        except Exception as e:
-            failures["end_date"].append({"user": full_name, "reason": str(e)})
+    for user in all_users_a:
+        uid = user.user_id
+        full_name = user.full_name
+        email = user.email
 
-    # Entry Code
-    if full.get("entry_code"):
-        stats["entry_attempted"] += 1
-        try:
-            access_client_b.set_entry_code_for_user(
-                external_id=uid,
-                entry_code=full["entry_code"]
-            )
-            stats["entry_success"] += 1
-        except Exception as e:
-            failures["entry_code"].append({"user": full_name, "reason": str(e)})
+        existing, matched_on = user_index_b.find(external_id=uid, email=email)
+        if existing:
+            stats["users_existing"] += 1
+            existing_users.append({
+                "user_id": uid,
+                "name": full_name,
+                "email": email,
+                "matched_on": matched_on
+            })
+            continue
 
-    # Group Assignments
-    for g in full.get("access_groups", []):
-        stats["group_assign_attempted"] += 1
+        users_to_create.append(user)
 
-        gname = g["name"]
-        gid_b = group_name_to_b_id.get(gname)
+    if JOB_QUEUE:
+        merge_job_results(
+            run_batch(JOB_QUEUE, "access_users", "access_user", [u.to_dict() for u in users_to_create],
+                      meta={"stat_keys": list(stats), "failure_keys": list(failures)}),
+            stats,
+            failures
+        )
+    elif ACCESS_SHARDS > 1:
+        print(f"Creating {len(users_to_create)} users across {ACCESS_SHARDS} shard processes...")
+        merge_shard_results(
+            run_shards("utils.access_users", [
+                {"phase": "users", "items": [u.to_dict() for u in part],
+                 "stat_keys": list(stats), "failure_keys": list(failures)}
+                for part in partition(users_to_create, ACCESS_SHARDS, key=lambda u: u.user_id)
+            ]),
+            stats,
+            failures
+        )
+    else:
+        run_logged("user_create", "Users", users_to_create, lambda u: u.user_id,
+                   lambda u: migrate_user(u, clients, stats, failures))
 
-        if not gid_b:
-            failures["group_assign"].append({"user": full_name, "group": gname, "reason": "Missing in Org B"})
-            continue
+    step_cache.save("users", users=[u.to_dict() for u in all_users_a], existing_users=existing_users)
+else:
+    cached = step_cache.restore("users") or {}
+    all_users_a = [UserRecord.from_dict(d) for d in cached.get("users", [])]
+    existing_users = cached.get("existing_users", [])
 
-        try:
-            access_client_b.add_user_to_access_group(external_id=uid, group_id=gid_b)
-            stats["group_assign_success"] += 1
-        except Exception as e:
-            failures["group_assign"].append({"user": full_name, "group": gname, "reason": str(e)})
+# ============================================
+# STEP 2 — MIGRATE ACCESS GROUPS
+# ============================================
 
-    # Keycards
-    for card in full.get("cards", []):
-        stats["cards_attempted"] += 1
-        card_summary = f"{card.get('type')} — {card.get('card_number') or card.get('card_number_hex') or card.get('card_number_base36')}"
+if "groups" in steps:
+    step_cache.begin("groups")
 
-        try:
-            kwargs = {}
-            if card.get("card_number"):
-                kwargs["card_number"] = card["card_number"]
-            elif card.get("card_number_hex"):
-                kwargs["card_number_hex"] = card["card_number_hex"]
-            elif card.get("card_number_base36"):
-                kwargs["card_number_base36"] = card["card_number_base36"]
-
-            access_client_b.add_card_to_user(
-                external_id=uid,
-                active=card.get("active", False),
-                facility_code=card.get("facility_code", ""),
-                card_type=card.get("type", ""),
-                **kwargs
-            )
-            stats["cards_success"] += 1
-        except Exception as e:
-            failures["card_add"].append({"user": full_name, "card": card_summary, "reason": str(e)})
+    groups_a = access_client_a.get_access_groups()["access_groups"]
 
-    # MFA
-    for m in full.get("mfa_codes", []):
-        stats["mfa_attempted"] += 1
-        code = m.get("code", "unknown")
+    stats["groups_total"] = len(groups_a)
 
-        try:
-            access_client_b.add_mfa_code_to_user(code=code, external_id=uid)
-            stats["mfa_success"] += 1
-        except Exception as e:
-            failures["mfa_add"].append({"user": full_name, "code": code, "reason": str(e)})
+    group_name_lookup = {g["group_id"]: g["name"] for g in groups_a}
 
-    # License Plates
-    for lp in full.get("license_plates", []):
-        stats["plates_attempted"] += 1
-        plate_summary = f"{lp.get('license_plate_number')} ({lp.get('name', '')})"
+    group_name_to_b_id = {}
 
+    for g in groups_a:
+        name = g["name"]
         try:
-            access_client_b.add_license_plate_to_user(
-                external_id=uid,
-                license_plate_number=lp.get("license_plate_number"),
-                name=lp.get("name", None),
-                active=lp.get("active", False)
+            created = retry_call(
+                access_client_b.create_access_group,
+                idempotent=False,
+                verify=lambda: next(
+                    (g for g in access_client_b.get_access_groups()["access_groups"] if g["name"] == name), None
+                ),
+                name=name
             )
-            stats["plates_success"] += 1
+            group_name_to_b_id[name] = created["group_id"]
+            stats["groups_created"] += 1
         except Exception as e:
-            failures["license_plates"].append({
-                "user": full_name,
-                "plate": plate_summary,
-                "reason": str(e)
-            })
+            failures["group_create"].append(failure(
+                "access_b.create_access_group", e, kwargs={"name": name}, group_name=name
+            ))
+
+    step_cache.save("groups", group_name_to_b_id=group_name_to_b_id)
+else:
+    group_name_to_b_id = (step_cache.restore("groups") or {}).get("group_name_to_b_id")
+    if group_name_to_b_id is None and "attributes" in steps:
+        # Never cached: match Org A group names against the groups already in Org B
+        group_name_to_b_id = {g["name"]: g["group_id"] for g in access_client_b.get_access_groups()["access_groups"]}
+    group_name_to_b_id = group_name_to_b_id or {}
+
+# ============================================
+# STEP 3 — USER ACCESS ATTRIBUTES
+# ============================================
+
+if "attributes" in steps:
+    step_cache.begin("attributes")
+
+    if "users" not in steps:
+        # STEP 1 was skipped: use its cached Org A users, and re-read Org B
+        # so users created by that earlier run are part of the pre-check
+        all_users_a = all_users_a or fetch_org_a_users()
+        user_index_b = load_org_b_users()
+
+    # ---------- Credential pre-check: index every card, MFA code and plate in
+    # both orgs so duplicates and conflicts are skipped instead of failing
+    # user_id → AccessProfile; each detail response is reduced to a profile inside
+    # the worker thread so no raw dicts pile up while the pre-check runs
+    details_a = {}
+    for u, profile, err in log.bounded(
+        "access_profile_a", lambda u: AccessProfile.from_api(access_client_a.get_access_user(user_id=u.user_id)),
+        all_users_a, entity=lambda u: u.user_id, label="Org A credentials"
+    ):
+        if err is None:
+            details_a[u.user_id] = profile
+        else:
+            # STEP 3 fetches this user again; only the pre-check misses them
+            failures["credential_index"].append({"org": "A", "user": u.full_name, "reason": str(err)})
+
+    details_b = []
+    for m, profile, err in log.bounded(
+        "access_profile_b", lambda m: AccessProfile.from_api(access_client_b.get_access_user(user_id=m["user_id"])),
+        user_index_b.members, entity=lambda m: m["user_id"], label="Org B credentials"
+    ):
+        if err is None:
+            details_b.append((m.get("external_id") or m["user_id"], m.get("full_name", ""), profile))
+        else:
+            failures["credential_index"].append({"org": "B", "user": m.get("full_name"), "reason": str(err)})
+
+    credential_skip, credential_conflicts, stats["credentials_in_org_b"] = plan_credentials(
+        [(u.user_id, u.full_name, details_a[u.user_id]) for u in all_users_a if u.user_id in details_a],
+        details_b
+    )
+    print(f"Credential pre-check: {len(credential_conflicts)} duplicates/conflicts, "
+          f"{stats['credentials_in_org_b']} already in Org B")
+
+    if JOB_QUEUE:
+        merge_job_results(
+            run_batch(JOB_QUEUE, "access_attributes", "access_attributes", [
+                {
+                    "user_id": u.user_id,
+                    "full_name": u.full_name,
+                    "skip": sorted(credential_skip.get(u.user_id, ())),
+                    "profile": profile_dict(details_a.pop(u.user_id, None)),
+                }
+                for u in all_users_a
+            ], meta={
+                "group_name_to_b_id": group_name_to_b_id,
+                "stat_keys": list(stats),
+                "failure_keys": list(failures),
+            }),
+            stats,
+            failures
+        )
+    elif ACCESS_SHARDS > 1:
+        print(f"Migrating access attributes across {ACCESS_SHARDS} shard processes...")
+        merge_shard_results(
+            run_shards("utils.access_users", [
+                {
+                    "phase": "attributes",
+                    # The pre-check already fetched each Org A profile; ship it
+                    # so shard workers don't read every user a second time
+                    "items": [
+                        (u.user_id, u.full_name, sorted(credential_skip.get(u.user_id, ())),
+                         profile_dict(details_a.pop(u.user_id, None)))
+                        for u in part
+                    ],
+                    "group_name_to_b_id": group_name_to_b_id,
+                    "stat_keys": list(stats),
+                    "failure_keys": list(failures),
+                }
+                for part in partition(all_users_a, ACCESS_SHARDS, key=lambda u: u.user_id)
+            ]),
+            stats,
+            failures
+        )
+    else:
+        # pop: each profile is released once its user has been migrated
+        run_logged("user_attributes", "User attributes", all_users_a, lambda u: u.user_id,
+                   lambda u: migrate_user_attributes(
+                       u.user_id, u.full_name, group_name_to_b_id, clients, stats, failures,
+                       credential_skip.get(u.user_id, ()), details_a.pop(u.user_id, None)
+                   ))
+    step_cache.save("attributes", credential_conflicts=credential_conflicts)
+else:
+    credential_conflicts = (step_cache.restore("attributes") or {}).get("credential_conflicts", [])
 
 # ============================================
 # STEP 4 — EXPORT DOORS TO CSV
 # ============================================
 
-doors_a = access_client_a.get_doors().get("doors", [])
+def fetch_inventory():
+    step_cache.begin("inventory")
+    fetched = {
+        "doors": access_client_a.get_doors().get("doors", []),
+        "levels": access_client_a.get_all_access_levels().get("access_levels", []),
+        "calendars": access_client_a.get_all_door_exception_calendars().get("door_exception_calendars", []),
+    }
+    step_cache.save("inventory", **fetched)
+    return fetched
+
+
+# The exports always re-read Org A; a report-only run uses the cached copy
+inventory = {"doors": [], "levels": [], "calendars": []}
+if steps & {"doors", "levels", "calendars"}:
+    inventory = fetch_inventory()
+elif "report" in steps:
+    inventory = step_cache.restore("inventory") or fetch_inventory()
+
+doors_a = inventory["doors"]
+levels_a = inventory["levels"]
+exception_cals = inventory["calendars"]
+exception_cal_count = len(exception_cals)
 
-with open("../CSVs/doors_backup.csv", "w", newline="", encoding="utf-8") as f:
-    writer = csv.writer(f)
+# Normalize doors / sites / levels / calendars once; every export and
+# report section below reads from this index
+access_index = AccessIndex(doors_a, levels_a, exception_cals)
 
-    # Updated header row
-    writer.writerow([
-        "door_id",
-        "door_name",
-        "site_id",
-        "site_name",
-        "controller_id",
-        "controller_name"
-    ])
+# Bitmap every level's schedule once; identical schedules share one pattern
+schedule_patterns, level_pattern = analyze_levels(access_index.levels)
 
-    for d in doors_a:
-        site = d.get("site", {}) or {}
+if "doors" in steps:
+    with open("../CSVs/doors_backup.csv", "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
 
+        # Updated header row
         writer.writerow([
-            d.get("door_id", ""),
-            d.get("name", ""),
-            site.get("site_id", ""),
-            site.get("name", ""),
-            d.get("acu_id", ""),
-            d.get("acu_name", "")
+            "door_id",
+            "door_name",
+            "site_id",
+            "site_name",
+            "controller_id",
+            "controller_name",
+            "access_levels"
         ])
 
-door_lookup = {d.get("door_id"): d.get("name") for d in doors_a}
-
-site_lookup = {}
-for d in doors_a:
-    site = d.get("site", {}) or {}
-    sid = site.get("site_id")
-    sname = site.get("name")
-    if sid:
-        site_lookup[sid] = sname
-
-controller_lookup = {
-    d.get("door_id"): d.get("acu_name") for d in doors_a
-}
+        for door_id, d in access_index.doors.items():
+            writer.writerow([
+                d["door_id"],
+                d["door_name"],
+                d["site_id"],
+                d["site_name"],
+                d["controller_id"],
+                d["controller_name"],
+                ";".join(access_index.levels_for_door(door_id))
+            ])
+
+    write_columnar("../CSVs/doors_backup.csv", [
+        {**d, "access_levels": access_index.levels_for_door(door_id)}
+        for door_id, d in access_index.doors.items()
+    ])
 
 # ============================================
 # STEP 5 — EXPORT ACCESS LEVELS to CSV
 # ============================================
 
-levels_response = access_client_a.get_all_access_levels()
-levels_a = levels_response.get("access_levels", [])
-
-with open("../CSVs/access_levels_backup.csv", "w", newline="", encoding="utf-8") as f:
-    writer = csv.writer(f)
-    writer.writerow([
-        "access_level_id",
-        "name",
-        "door_ids",
-        "door_names",
-        "site_ids",
-        "site_names",
-        "schedule"
-    ])
-
-    for lvl in levels_a:
-
-        door_ids = lvl.get("doors", [])
-        if isinstance(door_ids, str):
-            door_ids = [door_ids]
-        door_names = [door_lookup.get(d, "(Unknown Door)") for d in door_ids]
-
-        site_ids = lvl.get("sites", [])
-        if isinstance(site_ids, str):
-            site_ids = [site_ids]
-        site_names = [site_lookup.get(s, "(Unknown Site)") for s in site_ids]
-
-        schedule = json.dumps(lvl.get("access_schedule_events", []))
-
+if "levels" in steps:
+    with open("../CSVs/access_levels_backup.csv", "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
         writer.writerow([
-            lvl.get("access_level_id"),
-            lvl.get("name"),
-            ";".join(door_ids),
-            ";".join(door_names),
-            ";".join(site_ids),
-            ";".join(site_names),
-            schedule
+            "access_level_id",
+            "name",
+            "door_ids",
+            "door_names",
+            "site_ids",
+            "site_names",
+            "schedule",
+            "schedule_pattern"
         ])
 
+        for lvl in access_index.levels:
+            writer.writerow([
+                lvl["access_level_id"],
+                lvl["name"],
+                ";".join(lvl["door_ids"]),
+                ";".join(lvl["door_names"]),
+                ";".join(lvl["site_ids"]),
+                ";".join(lvl["site_names"]),
+                json.dumps(lvl["schedule"]),
+                level_pattern[lvl["access_level_id"]]["label"]
+            ])
+
+    write_columnar("../CSVs/access_levels_backup.csv", [
+        {**lvl, "schedule_pattern": level_pattern[lvl["access_level_id"]]["label"]}
+        for lvl in access_index.levels
+    ])
+
 # ============================================
 # STEP 6 — EXPORT DOOR EXCEPTION CALENDARS TO CSV
 # ============================================
 
-exception_response = access_client_a.get_all_door_exception_calendars()
-exception_cals = exception_response.get("door_exception_calendars", [])
-exception_cal_count = len(exception_cals)
-
-with open("../CSVs/door_exception_calendars_backup.csv", "w", newline="", encoding="utf-8") as f:
-    writer = csv.writer(f)
-    writer.writerow([
-        "calendar_id",
-        "calendar_name",
-        "door_ids",
-        "door_names",
-        "exception_count",
-        "exceptions_readable"
-    ])
+if "calendars" in steps:
+    with open("../CSVs/door_exception_calendars_backup.csv", "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow([
+            "calendar_id",
+            "calendar_name",
+            "door_ids",
+            "door_names",
+            "exception_count",
+            "exceptions_readable"
+        ])
 
-    for cal in exception_cals:
-        doors = cal.get("doors", [])
-        door_names = [door_lookup.get(d, "(Unknown Door)") for d in doors]
+        for cal in access_index.calendars:
+            writer.writerow([
+                cal["calendar_id"],
+                cal["name"],
+                ";".join(cal["door_ids"]),
+                ";".join(cal["door_names"]),
+                len(cal["exceptions"]),
+                "; ".join(cal["exceptions_readable"])
+            ])
 
-        readable_exceptions = []
-        for ex in cal.get("exceptions", []):
-            readable = f"{ex.get('date')} {ex.get('door_status')} {ex.get('start_time')}-{ex.get('end_time')}"
-            readable_exceptions.append(readable)
+    write_columnar("../CSVs/door_exception_calendars_backup.csv", access_index.calendars)
 
-        writer.writerow([
-            cal.get("door_exception_calendar_id"),
-            cal.get("name"),
-            ";".join(doors),
-            ";".join(door_names),
-            len(cal.get("exceptions", [])),
-            "; ".join(readable_exceptions)
-        ])
+if "report" not in steps:
+    failure_log = write_failure_log("AccessControl", failures)
+    print(f"\n✔ Steps completed: {', '.join(s for s in STEPS if s in steps)}")
+    print(f"✔ Failure log saved to: {failure_log} (replay with --retry-failures)\n")
+    sys.exit(0)
 
 # ============================================
 # STEP 7 — GENERATE FULL MARKDOWN REPORT
@@ -400,7 +519,9 @@ with open("../CSVs/door_exception_calendars_backup.csv", "w", newline="", encodi
 
 report_path = "../Documentation/access_control_migration_report.md"
 
-with open(report_path, "w", encoding="utf-8") as f:
+report = ReportBuilder("Verkada Access Control Migration Report")
+
+with report.section("header") as f:
     # ===========================================================
     # HEADER
     # ===========================================================
@@ -408,6 +529,7 @@ with open(report_path, "w", encoding="utf-8") as f:
     f.write("Generated automatically by the Org Migration Utility\n\n")
     f.write("---\n\n")
 
+with report.section("introduction") as f:
     # ===========================================================
     # INTRODUCTION
     # ===========================================================
@@ -427,6 +549,7 @@ with open(report_path, "w", encoding="utf-8") as f:
     )
     f.write("---\n\n")
 
+with report.section("migrated") as f:
     # ===========================================================
     # MIGRATED AUTOMATICALLY
     # ===========================================================
@@ -453,6 +576,7 @@ with open(report_path, "w", encoding="utf-8") as f:
     )
     f.write("---\n\n")
 
+with report.section("manual_rebuild") as f:
     # ===========================================================
     # ITEMS REQUIRING MANUAL REBUILD
     # ===========================================================
@@ -467,6 +591,7 @@ with open(report_path, "w", encoding="utf-8") as f:
     )
     f.write("---\n\n")
 
+with report.section("summary", data=stats) as f:
     # ===========================================================
     # MIGRATION SUMMARY TABLE
     # ===========================================================
@@ -474,6 +599,7 @@ with open(report_path, "w", encoding="utf-8") as f:
     f.write("| Category | Success | Total |\n")
     f.write("|----------|--------:|------:|\n")
     f.write(f"| Users | {stats['users_created']} | {stats['users_total']} |\n")
+    f.write(f"| Users Already Present in Org B | {stats['users_existing']} | {stats['users_total']} |\n")
     f.write(f"| Access Groups | {stats['groups_created']} | {stats['groups_total']} |\n")
     f.write(f"| Group Assignments | {stats['group_assign_success']} | {stats['group_assign_attempted']} |\n")
     f.write(f"| BLE Unlock | {stats['ble_success']} | {stats['ble_attempted']} |\n")
@@ -484,8 +610,56 @@ with open(report_path, "w", encoding="utf-8") as f:
     f.write(f"| Keycards | {stats['cards_success']} | {stats['cards_attempted']} |\n")
     f.write(f"| MFA Codes | {stats['mfa_success']} | {stats['mfa_attempted']} |\n")
     f.write(f"| License Plates | {stats['plates_success']} | {stats['plates_attempted']} |\n")
+    f.write(f"| Credentials Not Sent (already in Org B, duplicate or conflicting) | {stats['credentials_skipped']} | — |\n")
     f.write("\n---\n")
 
+with report.section("credential_conflicts", data=credential_conflicts) as f:
+    # ===========================================================
+    # CREDENTIAL CONFLICTS
+    # ===========================================================
+    f.write("## Credential Duplicates and Conflicts\n\n")
+    f.write(
+        f"{stats['credentials_in_org_b']} credentials were already assigned to the same user in Org B and were not re-sent.\n\n"
+    )
+    if credential_conflicts:
+        f.write(
+            "The credentials below were not sent because another user already owns them. "
+            "Decide which user should keep each one and assign it manually in Org B.\n\n"
+        )
+        f.write("| Type | Credential | Org A User | Reason |\n")
+        f.write("|------|------------|------------|--------|\n")
+        for c in credential_conflicts:
+            f.write(f"| {c['type']} | {c['credential']} | {c['user']} | {c['reason']} |\n")
+        f.write("\n")
+    else:
+        f.write("No duplicate or conflicting keycards, MFA codes or license plates.\n\n")
+    f.write("---\n\n")
+
+with report.section("already_present", data=existing_users) as f:
+    # ===========================================================
+    # USERS ALREADY PRESENT IN ORG B
+    # ===========================================================
+    f.write("## Users Already Present in Org B\n\n")
+    if existing_users:
+        f.write(
+            "These users already existed in Org B and were not re-created. "
+            "Their access attributes (groups, credentials, etc.) were still migrated in STEP 3.\n\n"
+        )
+        f.write("| User | Email | Matched On |\n")
+        f.write("|------|-------|------------|\n")
+        for u in existing_users:
+            f.write(f"| {u['name']} | {u['email']} | {u['matched_on']} |\n")
+        if any(u["matched_on"] == "email" for u in existing_users):
+            f.write(
+                "\n**Note:** users matched on email only do not carry Org A's user ID as their external ID in Org B; "
+                "attribute writes for them may fail and should be reviewed below.\n"
+            )
+        f.write("\n")
+    else:
+        f.write("None — every user was created by this run.\n\n")
+    f.write("---\n\n")
+
+with report.section("failures", data=failures) as f:
     # ===========================================================
     # FAILURE SECTION
     # ===========================================================
@@ -498,7 +672,7 @@ with open(report_path, "w", encoding="utf-8") as f:
         wrote_any_failure = True
         f.write(f"### {category}\n")
         for item in items:
-            f.write(f"- {item}\n")
+            f.write(f"- {summarize(item)}\n")
         f.write("\n")
 
     if not wrote_any_failure:
@@ -506,6 +680,7 @@ with open(report_path, "w", encoding="utf-8") as f:
 
     f.write("---\n\n")
 
+with report.section("workflow") as f:
     # ===========================================================
     # FULL ACCESS CONTROL MIGRATION WORKFLOW
     # ===========================================================
@@ -521,7 +696,7 @@ with open(report_path, "w", encoding="utf-8") as f:
     f.write("The utility generates three CSV files that replace manual screenshotting from Org A:\n\n")
 
     f.write("**doors_backup.csv**\n")
-    f.write("- Door ID\n- Door name\n- Site ID\n- Site name\n- Controller ID\n- Controller name\n\n")
+    f.write("- Door ID\n- Door name\n- Site ID\n- Site name\n- Controller ID\n- Controller name\n- Access levels that include the door\n\n")
 
     f.write("**access_levels_backup.csv**\n")
     f.write("- Access level name\n- All associated doors (IDs + names)\n")
@@ -601,69 +776,86 @@ with open(report_path, "w", encoding="utf-8") as f:
     f.write("Full details for each Access Level are included below, so no screenshots are required. Please follow the below list as you manually recreate:\n\n")
     f.write("---\n\n")
 
-    # ===========================================================
-    # ACCESS LEVEL DETAIL OUTPUT
-    # ===========================================================
-    for lvl in levels_a:
-        name = lvl.get("name")
-        lvl_id = lvl.get("access_level_id")
-
-        doors = lvl.get("doors", [])
-        if isinstance(doors, str):
-            doors = [doors]
-
-        sites = lvl.get("sites", [])
-        if isinstance(sites, str):
-            sites = [sites]
-
-        schedules = lvl.get("access_schedule_events", [])
+# ===========================================================
+# ACCESS LEVEL DETAIL OUTPUT
+# (Largest section — rendered as a deferred section)
+# ===========================================================
+def render_access_levels(f):
+    for lvl in access_index.levels:
+        name = lvl["name"]
+        lvl_id = lvl["access_level_id"]
+        schedules = lvl["schedule"]
 
         f.write(f"### **Access Level Name:** {name}\n")
 
         f.write("### **Doors:**\n")
-        if doors:
-            for d in doors:
-                f.write(f"- {door_lookup.get(d, '(Unknown Door)')} (`{d}`)\n")
+        if lvl["door_ids"]:
+            for d, door_name in zip(lvl["door_ids"], lvl["door_names"]):
+                f.write(f"- {door_name} (`{d}`)\n")
         else:
             f.write("- None\n")
 
         f.write("\n### **Schedule Blocks:**\n")
 
-        normalized = [
-            (
-                ev.get("weekday"),
-                ev.get("start_time"),
-                ev.get("end_time"),
-                ev.get("door_status")
-            )
-            for ev in schedules
-        ]
-
-        # Check for 24/7 access across all 7 days
-        ALL_DAYS = ["MO", "TU", "WE", "TH", "FR", "SA", "SU"]
+        pattern = level_pattern[lvl_id]
 
-        is_247 = (
-                len(normalized) == 7 and
-                all(
-                    (day, "00:00", "23:59", "access_granted") in normalized
-                    for day in ALL_DAYS
-                )
-        )
-
-        if is_247:
+        if pattern["kind"] == "24/7":
             f.write("- Access granted **24/7**\n")
+        elif pattern["kind"] == "none":
+            f.write("- No schedule (likely 24/7)\n")
+        elif len(pattern["level_ids"]) > 1:
+            # Shared schedule — blocks are listed once under Schedule Patterns
+            f.write(
+                f"- {pattern['label']} — **Schedule Pattern #{pattern['pattern_id']}** "
+                f"(shared by {len(pattern['level_ids'])} access levels)\n"
+            )
         else:
-            if schedules:
-                for ev in schedules:
-                    f.write(
-                        f"- {ev.get('weekday')} {ev.get('start_time')} → {ev.get('end_time')} "
-                        f"({ev.get('door_status')})\n"
-                    )
-            else:
-                f.write("- No schedule (likely 24/7)\n")
+            for ev in schedules:
+                f.write(
+                    f"- {ev.get('weekday')} {ev.get('start_time')} → {ev.get('end_time')} "
+                    f"({ev.get('door_status')})\n"
+                )
 
         f.write("\n---\n\n")
 
+
+report.deferred("access_levels", render_access_levels, data=access_index.levels)
+
+
+# ===========================================================
+# SHARED SCHEDULE PATTERNS
+# ===========================================================
+def render_schedule_patterns(f):
+    shared = [
+        p for p in schedule_patterns
+        if len(p["level_ids"]) > 1 and p["kind"] not in ("24/7", "none")
+    ]
+    if not shared:
+        return
+
+    f.write("### Schedule Patterns\n\n")
+    f.write(
+        "The following schedules are shared by multiple Access Levels. "
+        "Rebuild each pattern once, then apply it to every listed Access Level.\n\n"
+    )
+
+    for p in shared:
+        f.write(f"#### Schedule Pattern #{p['pattern_id']}: {p['label']}\n")
+        for ev in p["blocks"]:
+            f.write(
+                f"- {ev['weekday']} {ev['start_time']} → {ev['end_time']} "
+                f"({ev['door_status']})\n"
+            )
+        f.write(f"\n**Used by {len(p['level_ids'])} Access Levels:** ")
+        f.write(", ".join(str(n) for n in p["level_names"]))
+        f.write("\n\n")
+
+    f.write("---\n\n")
+
+
+report.deferred("schedule_patterns", render_schedule_patterns, data=schedule_patterns)
+
+with report.section("workflow_continued") as f:
     # ---------------------------- Exception Calendars
     f.write("### Step 5: Recreate Door Exception Calendars\n\n")
     f.write(
@@ -692,11 +884,17 @@ with open(report_path, "w", encoding="utf-8") as f:
     f.write(
         "**Licensing:** Verify all doors in Org B have valid Access licenses. Please reach out to licensing@verkada.com for additional support as needed.\n\n"
         "**Functional testing:** Access → Live Feed matches expected behavior\n\n"
+        "**Automated check:** run `python Verify.py` to compare users, groups, memberships and credentials between both orgs (see verification_report.md)\n\n"
     )
     f.write("---\n\n")
 
     f.write(
         "## Congratulations! Access Control Migration Complete. Please run next script(s) as needed to complete full migration process.\n\n")
 
+report.write(report_path)
+
+failure_log = write_failure_log("AccessControl", failures)
+
 # END REPORT
-print(f"\n✔ Migration completed. Markdown report saved to: {report_path}\n")
\ No newline at end of file
+print(f"\n✔ Migration completed. Markdown report saved to: {report_path}")
+print(f"✔ Failure log saved to: {failure_log} (replay with --retry-failures)\n")
\ No newline at end of file
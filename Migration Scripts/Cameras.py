@@ -3,19 +3,60 @@
 # ================================
 
 import os
+import sys
 import csv
-from pprint import pprint
+import argparse
 from pathlib import Path
 from dotenv import load_dotenv
 
-from pykada.cameras import CamerasClient, get_camera_audio_status
+from utils.report import ReportBuilder
+from utils.columnar import write_columnar
+from utils.camera_settings import fetch_camera_settings
+from utils.jobs import run_batch, merge_job_results
+from utils.retry import retry_call
+from utils.failures import failure, summarize, write_failure_log, replay_failures
+from utils.transforms import (
+    camera_list, normalize_cameras, normalize_plate, lpoi_plates, find_lpoi,
+    poi_id, poi_created, poi_updated, poi_image
+)
+from utils.downloads import download_to_store
+from utils.eventlog import EventLog
+from utils.serial_index import SerialIndex
+from utils.site_crawl import crawl_sites, write_site_index
+from utils.camera_guide import bucket_cameras, icon, write_guide
+from utils.tokens import shared_token_manager
+
+from pykada.cameras import CamerasClient
 
 load_dotenv(override=True)
+
+parser = argparse.ArgumentParser(description="Migrate cameras, POIs and LPOIs from Org A to Org B.")
+parser.add_argument("--retry-failures", action="store_true",
+                    help="Only replay the operations recorded in ../Failures/Cameras_failures.jsonl")
+parser.add_argument("--skip-faces", action="store_true",
+                    help="Don't download POI face images into ../CSVs/poi_faces")
+args = parser.parse_args()
 api_key_a = os.getenv("VERKADA_API_KEY_A")
 api_key_b = os.getenv("VERKADA_API_KEY_B")
 
-cam_a = CamerasClient(api_key_a)
-cam_b = CamerasClient(api_key_b)
+cam_a = CamerasClient(token_manager=shared_token_manager(api_key_a))
+cam_b = CamerasClient(token_manager=shared_token_manager(api_key_b))
+
+clients = {"cam_a": cam_a, "cam_b": cam_b}
+
+if args.retry_failures:
+    replay_failures("Cameras", clients)
+    sys.exit(0)
+
+# Shared SQLite job queue; when set, per-camera settings are fetched by
+# Worker.py processes and only this script writes the CSV
+JOB_QUEUE = os.getenv("JOB_QUEUE")
+
+# "inline" (default): every camera in camera_migration_report.md
+# "pages": index + one page per site in ../Documentation/camera_guide
+CAMERA_REPORT_MODE = os.getenv("CAMERA_REPORT_MODE", "inline").strip().lower()
+
+log = EventLog("Cameras")
 
 Path("../CSVs").mkdir(exist_ok=True)
 Path("../Documentation").mkdir(exist_ok=True)
@@ -26,6 +67,7 @@ Path("../Documentation").mkdir(exist_ok=True)
 
 failures = {
     "poi_get": [],
+    "poi_face": [],
     "camera_data": [],
     "cloud_backup_get": [],
     "audio_get": [],
@@ -35,9 +77,12 @@ failures = {
 stats = {
     "pois_total": 0,
     "pois_retrieved": 0,
+    "poi_faces_saved": 0,
     "lpois_total": 0,
     "lpois_created": 0,
+    "lpois_existing": 0,
     "cameras_total": 0,
+    "camera_sites": 0,
 }
 
 # ============================================
@@ -56,24 +101,47 @@ except Exception as e:
     failures["poi_get"].append(("ALL", str(e)))
 
 POI_CSV = "../CSVs/pois_backup.csv"
-try:
-    pois_a = list(cam_a.get_all_pois())
-    stats["pois_retrieved"] = len(pois_a)
-except Exception as e:
-    pois_a = []
-    failures["poi_get"].append(("ALL", str(e)))
+POI_FACES_DIR = "../CSVs/poi_faces"
+
+# -------- FACE IMAGES --------
+# Streamed to disk concurrently, stored once per content hash, resumed if a
+# previous run was interrupted
+face_paths = {}
+
+if not args.skip_faces:
+    face_jobs = [(poi_id(poi), poi_image(poi)) for poi in pois_a if poi_id(poi) and poi_image(poi)]
+    print(f"Downloading {len(face_jobs)} POI face images → {POI_FACES_DIR}")
+
+    for (person_id, _), path, err in log.bounded(
+        "poi_face", lambda job: download_to_store(job[1], POI_FACES_DIR, job[0]), face_jobs,
+        entity=lambda job: job[0], label="POI faces"
+    ):
+        if err is None:
+            face_paths[person_id] = path
+            stats["poi_faces_saved"] += 1
+        else:
+            failures["poi_face"].append((person_id, str(err)))
 
 # -------- CSV EXPORT FOR POIs --------
+poi_records = [
+    {
+        "poi_id": poi_id(poi),
+        "label": poi.get("label"),
+        "notes": poi.get("notes"),
+        "face_url": poi_image(poi),
+        "face_path": face_paths.get(poi_id(poi)),
+    }
+    for poi in pois_a
+]
+
 with open(POI_CSV, "w", newline="") as f:
     writer = csv.writer(f)
-    writer.writerow(["poi_id", "label", "notes", "face_url"])
+    writer.writerow(["poi_id", "label", "notes", "face_url", "face_path"])
 
-    for poi in pois_a:
-        writer.writerow([
-            poi.get("person_id"),
-            poi.get("label"),
-            poi.get("notes"),
-        ])
+    for rec in poi_records:
+        writer.writerow(rec.values())
+
+write_columnar(POI_CSV, poi_records)
 
 # ============================================
 # STEP 2 – GET CAMERA DATA + EXPORT CSV
@@ -89,118 +157,156 @@ except Exception as e:
     data = {}
     failures["camera_data"].append(("ALL", str(e)))
 
-cameras_list = (
-    data.get("cameras_tests")
-    or data.get("cameras")
-    or data.get("devices")
-    or data.get("camera_list")
-    or []
-)
+# camera_id / serial are stored under one key on every camera from here on
+cameras_list = normalize_cameras(camera_list(data))
+
+# Org A's fleet is already in hand; cache its serial index for post-claim tools
+if cameras_list:
+    SerialIndex.from_cameras(cameras_list).save("A")
 
 stats["cameras_total"] = len(cameras_list)
 
 CSV_OUT = "../CSVs/camera_data_backup.csv"
 
-with open(CSV_OUT, "w", newline="") as f:
-    writer = csv.writer(f)
-    writer.writerow([
-        "camera_id",
-        "serial",
-        "name",
-        "model",
+CAMERA_COLUMNS = [
+    "camera_id",
+    "serial",
+    "name",
+    "model",
 
-        "site",
-        "site_id",
+    "site",
+    "site_id",
 
-        "status",
-        "timezone",
+    "status",
+    "timezone",
 
-        "mac",
-        "local_ip",
-        "firmware",
-        "firmware_update_schedule",
+    "mac",
+    "local_ip",
+    "firmware",
+    "firmware_update_schedule",
 
-        "date_added",
-        "last_online",
+    "date_added",
+    "last_online",
 
-        "location",
-        "location_lat",
-        "location_lon",
-        "location_angle",
+    "location",
+    "location_lat",
+    "location_lon",
+    "location_angle",
 
-        "people_history_enabled",
-        "vehicle_history_enabled",
+    "people_history_enabled",
+    "vehicle_history_enabled",
 
-        "cloud_retention",
-        "device_retention",
+    "cloud_retention",
+    "device_retention",
 
-        "cloud_days_to_preserve",
-        "cloud_enabled",
-        "cloud_time_to_preserve",
-        "cloud_upload_timeslot",
-        "cloud_video_quality",
-        "cloud_video_to_upload",
+    "cloud_days_to_preserve",
+    "cloud_enabled",
+    "cloud_time_to_preserve",
+    "cloud_upload_timeslot",
+    "cloud_video_quality",
+    "cloud_video_to_upload",
 
-        "audio_enabled"
-    ])
+    "audio_enabled"
+]
 
-    for cam in cameras_list:
-        cam_id = cam.get("camera_id") or cam.get("device_id")
+camera_records = []
+
+# camera_id → (cloud, audio) when fetched through the job queue
+queued_settings = {}
+if JOB_QUEUE:
+    camera_jobs = run_batch(
+        JOB_QUEUE, "camera_settings", "camera_settings",
+        [{"camera_id": cam["camera_id"]} for cam in cameras_list],
+        meta={"stat_keys": [], "failure_keys": ["cloud_backup_get", "audio_get"]}
+    )
+    merge_job_results(camera_jobs, stats, failures)
+    for payload, result, _ in camera_jobs:
+        if result is not None:
+            queued_settings[payload["camera_id"]] = (result["cloud"], result["audio"])
 
-        try:
-            cloud = cam_a.get_cloud_backup_settings(cam_id)
-        except Exception as e:
-            cloud = {}
-            failures["cloud_backup_get"].append((cam_id, str(e)))
 
-        try:
-            audio = cam_a.get_camera_audio_status(cam_id)
-        except Exception as e:
-            audio = {}
-            failures["audio_get"].append((cam_id, str(e)))
+def camera_row(cam):
+    cam_id = cam["camera_id"]
 
-        writer.writerow([
-            cam_id,
-            cam.get("serial"),
-            cam.get("name"),
-            cam.get("model"),
+    if JOB_QUEUE:
+        cloud, audio = queued_settings.get(cam_id, ({}, {}))
+    else:
+        with log.timed("camera_settings", cam_id, serial=cam.get("serial")):
+            cloud, audio = fetch_camera_settings(cam_a, cam_id, failures)
 
-            cam.get("site"),
-            cam.get("site_id"),
+    row = [
+        cam_id,
+        cam.get("serial"),
+        cam.get("name"),
+        cam.get("model"),
 
-            cam.get("status"),
-            cam.get("timezone"),
+        cam.get("site"),
+        cam.get("site_id"),
 
-            cam.get("mac"),
-            cam.get("local_ip"),
-            cam.get("firmware"),
-            cam.get("firmware_update_schedule"),
+        cam.get("status"),
+        cam.get("timezone"),
 
-            cam.get("date_added"),
-            cam.get("last_online"),
+        cam.get("mac"),
+        cam.get("local_ip"),
+        cam.get("firmware"),
+        cam.get("firmware_update_schedule"),
 
-            cam.get("location"),
-            cam.get("location_lat"),
-            cam.get("location_lon"),
-            cam.get("location_angle"),
+        cam.get("date_added"),
+        cam.get("last_online"),
 
-            cam.get("people_history_enabled"),
-            cam.get("vehicle_history_enabled"),
+        cam.get("location"),
+        cam.get("location_lat"),
+        cam.get("location_lon"),
+        cam.get("location_angle"),
 
-            cam.get("cloud_retention"),
-            cam.get("device_retention"),
+        cam.get("people_history_enabled"),
+        cam.get("vehicle_history_enabled"),
 
-            cloud.get("days_to_preserve"),
-            cloud.get("enabled"),
-            cloud.get("time_to_preserve"),
-            cloud.get("upload_timeslot"),
-            cloud.get("video_quality"),
-            cloud.get("video_to_upload"),
+        cam.get("cloud_retention"),
+        cam.get("device_retention"),
 
-            audio.get("enabled"),
-        ])
+        cloud.get("days_to_preserve"),
+        cloud.get("enabled"),
+        cloud.get("time_to_preserve"),
+        cloud.get("upload_timeslot"),
+        cloud.get("video_quality"),
+        cloud.get("video_to_upload"),
+
+        audio.get("enabled"),
+    ]
+    return row
+
+
+# Settings are fetched per site concurrently; each site's shard is written to
+# ../CSVs/camera_sites as soon as its last camera is done
+row_by_camera = {}
+site_shards = []
+
+bar = log.progress(len({cam.get("site_id") or "unassigned" for cam in cameras_list}), "Site shards")
+for site_id, site_name, shard, cams, rows in crawl_sites(cameras_list, camera_row, CAMERA_COLUMNS):
+    log.event("site_shard", site_id, site=site_name, cameras=len(rows), shard=shard)
+    bar.update()
+    site_shards.append((site_id, site_name, len(rows), os.path.basename(shard)))
+    for cam, row in zip(cams, rows):
+        row_by_camera[id(cam)] = row
+bar.close()
+
+site_index = write_site_index(site_shards)
+stats["camera_sites"] = len(site_shards)
+
+# Merged backup keeps the original camera order
+with open(CSV_OUT, "w", newline="") as f:
+    writer = csv.writer(f)
+    writer.writerow(CAMERA_COLUMNS)
+
+    for cam in cameras_list:
+        row = row_by_camera[id(cam)]
+        writer.writerow(row)
+        camera_records.append(dict(zip(CAMERA_COLUMNS, row)))
+
+write_columnar(CSV_OUT, camera_records)
 
-print(f"Camera CSV exported → {CSV_OUT}")
+print(f"Camera CSV exported → {CSV_OUT} ({len(site_shards)} site shards, index → {site_index})")
 
 # ============================================
 # STEP 3 – LPOIs
@@ -211,8 +317,7 @@ print(" STEP 3: LPOIs")
 print("==============================\n")
 
 try:
-    lp_full = cam_a.get_lpois()
-    lpois = lp_full.get("license_plate_of_interest", [])
+    lpois = list(cam_a.get_all_lpois())
     stats["lpois_total"] = len(lpois)
 except Exception as e:
     lpois = []
@@ -231,16 +336,52 @@ with open(LPOI_CSV, "w", newline="") as f:
             lp.get("description"),
         ])
 
+write_columnar(LPOI_CSV, [
+    {"plate": lp.get("license_plate"), "description": lp.get("description")}
+    for lp in lpois
+])
+
 print(f"LPOI CSV exported → {LPOI_CSV}")
 
+# Org B's plates, loaded once so only missing plates are created (reruns are nearly free)
+try:
+    plates_b = lpoi_plates(cam_b)
+except Exception as e:
+    plates_b = set()
+    failures["lpoi_create"].append(("ORG B LPOI LIST", str(e)))
+
+lpois_to_create = []
 for lp in lpois:
+    key = normalize_plate(lp.get("license_plate"))
+    if key and key in plates_b:
+        stats["lpois_existing"] += 1
+        continue
+    if key:
+        # Also drops plates listed twice in Org A
+        plates_b.add(key)
+    lpois_to_create.append(lp)
+
+
+def create_lpoi(lp):
     plate = lp.get("license_plate")
-    desc = lp.get("description")
-    try:
-        cam_b.create_lpoi(plate, desc)
+    return retry_call(
+        cam_b.create_lpoi, plate, lp.get("description"),
+        idempotent=False,
+        verify=lambda: find_lpoi(cam_b, plate)
+    )
+
+
+print(f"Creating {len(lpois_to_create)} LPOIs in Org B ({stats['lpois_existing']} already present)...")
+
+for lp, _, err in log.bounded("lpoi_create", create_lpoi, lpois_to_create,
+                              entity=lambda lp: lp.get("license_plate"), label="LPOIs"):
+    if err is None:
         stats["lpois_created"] += 1
-    except Exception:
-        failures["lpoi_create"].append((plate, "Failed to create"))
+    else:
+        plate = lp.get("license_plate")
+        failures["lpoi_create"].append(
+            failure("cam_b.create_lpoi", err, args=(plate, lp.get("description")), plate=plate)
+        )
 
 # ============================================
 # CAMERA MIGRATION MARKDOWN REPORT
@@ -248,8 +389,9 @@ for lp in lpois:
 
 report_path = "../Documentation/camera_migration_report.md"
 
-with open(report_path, "w", encoding="utf-8") as f:
+report = ReportBuilder("Verkada Camera Migration Report")
 
+with report.section("header") as f:
     # ------------------------------------------------------
     # HEADER
     # ------------------------------------------------------
@@ -257,6 +399,7 @@ with open(report_path, "w", encoding="utf-8") as f:
     f.write("Generated automatically by the Org Migration Utility\n\n")
     f.write("---\n\n")
 
+with report.section("introduction") as f:
     # ------------------------------------------------------
     # INTRO
     # ------------------------------------------------------
@@ -282,6 +425,7 @@ with open(report_path, "w", encoding="utf-8") as f:
     )
     f.write("---\n\n")
 
+with report.section("manual_rebuild") as f:
     # ------------------------------------------------------
     # WHAT MUST BE RECREATED MANUALLY
     # ------------------------------------------------------
@@ -297,6 +441,7 @@ with open(report_path, "w", encoding="utf-8") as f:
     f.write("- Incidents\n")
     f.write("---\n\n")
 
+with report.section("summary", data=stats) as f:
     # ============================================
     # MIGRATION SUMMARY
     # ============================================
@@ -307,10 +452,13 @@ with open(report_path, "w", encoding="utf-8") as f:
 
     # POIs
     f.write(f"| POIs Extracted | {stats['pois_retrieved']} | {stats['pois_retrieved']} |\n")
+    f.write(f"| POI Face Images Saved | {stats['poi_faces_saved']} | {stats['pois_retrieved']} |\n")
     # LPOIs
     f.write(f"| LPOIs Migrated | {stats['lpois_created']} | {stats['lpois_total']} |\n")
+    f.write(f"| LPOIs Already in Org B | {stats['lpois_existing']} | {stats['lpois_total']} |\n")
     # Cameras
     f.write(f"| Cameras Detected | {stats['cameras_total']} | {stats['cameras_total']} |\n")
+    f.write(f"| Site Shards Written | {stats['camera_sites']} | {stats['camera_sites']} |\n")
     # Cloud Backup
     cloud_success = stats['cameras_total'] - len(failures['cloud_backup_get'])
     f.write(f"| Cloud Backup Settings Extracted | {cloud_success} | {stats['cameras_total']} |\n")
@@ -319,6 +467,7 @@ with open(report_path, "w", encoding="utf-8") as f:
     f.write(f"| Audio Settings Extracted | {audio_success} | {stats['cameras_total']} |\n")
     f.write("\n---\n\n")
 
+with report.section("failures", data=failures) as f:
     # ------------------------------------------------------
     # FAILURE SECTION
     # ------------------------------------------------------
@@ -330,7 +479,7 @@ with open(report_path, "w", encoding="utf-8") as f:
         wrote_any_failure = True
         f.write(f"### {category}\n")
         for item in items:
-            f.write(f"- {item}\n")
+            f.write(f"- {summarize(item)}\n")
         f.write("\n")
 
     if not wrote_any_failure:
@@ -338,6 +487,7 @@ with open(report_path, "w", encoding="utf-8") as f:
 
     f.write("---\n\n")
 
+with report.section("workflow") as f:
     # ------------------------------------------------------
     # CAMERA MIGRATION WORKFLOW
     # ------------------------------------------------------
@@ -396,10 +546,10 @@ with open(report_path, "w", encoding="utf-8") as f:
 
     f.write("### Step 4: Manual Rebuild Items\n\n")
 
-    # ------------------------------------------------------
-    # CAMERA-BY-CAMERA SUMMARY
-    # ------------------------------------------------------
-
+# ------------------------------------------------------
+# CAMERA-BY-CAMERA SUMMARY
+# ------------------------------------------------------
+def render_camera_summary(f):
     f.write("### Camera-by-Camera Configuration Summary\n")
     f.write(
         "Below is a complete breakdown for every camera found in Org A.\n"
@@ -414,37 +564,17 @@ with open(report_path, "w", encoding="utf-8") as f:
         "4. **People = NOT ENABLED, Vehicle = ENABLED**\n\n"
     )
 
-
-    def icon(val):
-        return "ENABLED ✅" if val else "NOT ENABLED ❌"
-
-
-    bucket_1 = []
-    bucket_2 = []
-    bucket_3 = []
-    bucket_4 = []
-
-    for cam in cameras_list:
-        people = cam.get("people_history_enabled")
-        vehicle = cam.get("vehicle_history_enabled")
-
-        if people and not vehicle:
-            bucket_1.append(cam)
-        elif people and vehicle:
-            bucket_2.append(cam)
-        elif not people and not vehicle:
-            bucket_3.append(cam)
-        else:
-            bucket_4.append(cam)
-
-    ordered_buckets = [
-        ("1. People ENABLED / Vehicle NOT ENABLED", bucket_1),
-        ("2. People ENABLED / Vehicle ENABLED", bucket_2),
-        ("3. People NOT ENABLED / Vehicle NOT ENABLED", bucket_3),
-        ("4. People NOT ENABLED / Vehicle ENABLED", bucket_4),
-    ]
-
-    for title, bucket in ordered_buckets:
+    if CAMERA_REPORT_MODE == "pages":
+        f.write(
+            f"The per-camera guide is split into one page per site: **{guide['index']}** "
+            f"({guide['pages']} sites, {guide['rendered']} pages regenerated this run).\n\n"
+        )
+        for title, bucket in bucket_cameras(cameras_list):
+            f.write(f"- **{title}:** {len(bucket)} cameras\n")
+        f.write("\n---\n\n")
+        return
+
+    for title, bucket in bucket_cameras(cameras_list):
         f.write(f"### {title}\n\n")
 
         if not bucket:
@@ -452,8 +582,7 @@ with open(report_path, "w", encoding="utf-8") as f:
             continue
 
         for cam in bucket:
-            cam_id = cam.get("camera_id") or cam.get("device_id")
-            serial = cam.get("serial") or cam.get("serial_number")
+            serial = cam["serial"]
             model = cam.get("model")
             name = cam.get("name") or f"{model} · {serial}"
 
@@ -469,10 +598,20 @@ with open(report_path, "w", encoding="utf-8") as f:
 
         f.write("---\n\n")
 
-    # ------------------------------------------------------
-    # POI-BY-POI SUMMARY
-    # ------------------------------------------------------
 
+# In "pages" mode only sites whose exported rows changed since the last run
+# are re-rendered (see utils/camera_guide.py)
+if CAMERA_REPORT_MODE == "pages":
+    guide = write_guide(camera_records)
+    print(f"Camera guide → {guide['index']} ({guide['rendered']}/{guide['pages']} site pages regenerated)")
+
+report.deferred("cameras", render_camera_summary, data=cameras_list)
+
+
+# ------------------------------------------------------
+# POI-BY-POI SUMMARY
+# ------------------------------------------------------
+def render_poi_summary(f):
     f.write("\n### People of Interest (POI) Summary\n")
     f.write(
         "Below is a complete list of all People of Interest pulled from Org A.\n"
@@ -484,18 +623,23 @@ with open(report_path, "w", encoding="utf-8") as f:
     else:
         for poi in pois_a:
             label = poi.get("label", "Unknown")
-            poi_id = poi.get("person_id") or poi.get("poi_id") or "(No ID Provided)"
-            created_at = poi.get("created") or poi.get("created_at") or "Unknown"
-            updated_at = poi.get("updated") or poi.get("updated_at") or "Unknown"
-            img_url = poi.get("image_url") or "(Image unavailable)"
+            person_id = poi_id(poi) or "(No ID Provided)"
+            created_at = poi_created(poi) or "Unknown"
+            updated_at = poi_updated(poi) or "Unknown"
+            face_path = face_paths.get(poi_id(poi)) or "(Image unavailable)"
 
             f.write(f"#### **POI: {label}**\n")
-            f.write(f"**POI ID:** `{poi_id}`,\n")
+            f.write(f"**POI ID:** `{person_id}`,\n")
             f.write(f"**Created At:** {created_at}\n")
+            f.write(f"**Updated At:** {updated_at}\n")
+            f.write(f"**Face Image:** `{face_path}`\n")
 
             f.write("---\n\n")
 
 
+report.deferred("pois", render_poi_summary, data=pois_a)
+
+with report.section("validation") as f:
     f.write("**Note:** if needed, do not forget to manually recreate the settings acquired from Step 2!\n")
 
     f.write("### Step 5) Final Validation\n")
@@ -505,6 +649,7 @@ with open(report_path, "w", encoding="utf-8") as f:
     )
     f.write("---\n\n")
 
+with report.section("finish") as f:
     # ------------------------------------------------------
     # FINISH
     # ------------------------------------------------------
@@ -512,5 +657,10 @@ with open(report_path, "w", encoding="utf-8") as f:
         "## Congratulations! Camera Migration Complete. Please run next script(s) as needed to complete full migration process.\n\n"
     )
 
-print(f"\n✔ Camera Markdown report saved to: {report_path}\n")
+report.write(report_path)
+
+failure_log = write_failure_log("Cameras", failures)
+
+print(f"\n✔ Camera Markdown report saved to: {report_path}")
+print(f"✔ Failure log saved to: {failure_log} (replay with --retry-failures)\n")
 
@@ -4,97 +4,316 @@
 # ================================
 
 import os
-import csv
+import sys
+import json
+import time
+import argparse
 from dotenv import load_dotenv
 from pykada.cameras import CamerasClient
 
+from utils.camera_settings import restore_camera_settings
+from utils.jobs import run_batch
+from utils.failures import summarize, write_failure_log, replay_failures
+from utils.serial_index import SerialIndex, SERIAL_INDEX_MAX_AGE
+from utils.report import ReportBuilder
+from utils.backup_reader import CAMERA_SCHEMA, load_backup
+from utils.eventlog import EventLog
+from utils.tokens import shared_token_manager
+
 load_dotenv(override=True)
 
+parser = argparse.ArgumentParser(description="Restore cloud backup and audio settings into Org B.")
+parser.add_argument("--retry-failures", action="store_true",
+                    help="Only replay the operations recorded in ../Failures/CloudBackup&Audio_failures.jsonl")
+parser.add_argument("--refresh-serials", action="store_true",
+                    help=f"Re-download Org B's camera list instead of using the cached serial index "
+                         f"(cache is refreshed automatically after SERIAL_INDEX_MAX_AGE = {SERIAL_INDEX_MAX_AGE}s)")
+parser.add_argument("--watch", action="store_true",
+                    help="Keep running and restore each camera as soon as it is claimed into Org B")
+parser.add_argument("--watch-interval", type=float, default=60,
+                    help="Seconds between camera list polls while cameras are being claimed (default: 60)")
+parser.add_argument("--watch-max-interval", type=float, default=900,
+                    help="Longest wait between polls when nothing changes (default: 900)")
+parser.add_argument("--watch-timeout", type=float, default=0,
+                    help="Stop watching after this many seconds (default: 0, until every camera is restored)")
+args = parser.parse_args()
+
 # Org B keys (post-migration)
 api_key_b = os.getenv("VERKADA_API_KEY_B")
 
-cam_b = CamerasClient(api_key_b)
+cam_b = CamerasClient(token_manager=shared_token_manager(api_key_b))
+
+clients = {"cam_b": cam_b}
+
+if args.retry_failures:
+    replay_failures("CloudBackup&Audio", clients)
+    sys.exit(0)
+
+# Shared SQLite job queue; when set, restores are handed to Worker.py processes
+JOB_QUEUE = os.getenv("JOB_QUEUE")
+
+log = EventLog("CloudBackup&Audio")
 
 CSV_CAMERA_FILE = "../CSVs/camera_data_backup.csv"
+REPORT_PATH = "../Documentation/cloud_backup_restore_report.md"
+RESTORED_STATE = "../CSVs/.cache/restored_serials_B.json"
+os.makedirs(os.path.dirname(REPORT_PATH), exist_ok=True)
+
+failures = {
+    "cloud_backup_restore": [],
+    "audio_restore": [],
+    "job_queue": [],
+    "backup_rows": [],
+}
+
+stats = {
+    "cameras_in_backup": 0,
+    "cloud_restored": 0,
+    "audio_restored": 0,
+}
 
 print("\n==============================")
 print(" RESTORING CLOUD BACKUP + AUDIO INTO ORG B")
 print("==============================\n")
 
 # ---------------------------------------------------------
-# BUILD SERIAL → NEW camera_id MAP FOR ORG B
+# SERIAL → NEW camera_id INDEX FOR ORG B
+# ---------------------------------------------------------
+serial_index = SerialIndex.load(cam_b, "B", refresh=args.refresh_serials)
+
+print(f"Serial index for Org B: {len(serial_index)} cameras "
+      f"(fetched {serial_index.age / 60:.0f} min ago).\n")
+
+# ---------------------------------------------------------
+# READ CSV & RESTORE SETTINGS
 # ---------------------------------------------------------
-serial_map = {}
+# Latest result per serial. Watch mode retries failed cameras, so a later
+# attempt replaces an earlier one and the report counts each camera once.
+outcomes = {}   # serial → restore_camera_settings() outcome
+row_errors = {}  # serial → (failure category, entry) for cameras that could not be restored at all
+
+
+def report_outcome(serial, cam_id_b, outcome):
+    outcomes[serial] = outcome
+    row_errors.pop(serial, None)
+    log.event("camera_settings", serial, restore_outcome(outcome), camera_id_b=cam_id_b,
+              cloud_error=(outcome["cloud"] or {}).get("reason"),
+              audio_error=(outcome["audio"] or {}).get("reason"),
+              audio_enabled=outcome["audio_enabled"])
+
+
+def report_error(category, serial, reason):
+    row_errors[serial] = (category, {"serial": serial, "reason": reason})
+    outcomes.pop(serial, None)
+
+
+def restore_outcome(outcome):
+    succeeded = [outcome["cloud"], outcome["audio"]].count(None)
+    return {2: "ok", 1: "partial", 0: "error"}[succeeded]
+
+
+def restore_rows(pending):
+    """Restore (row, camera_id_b) pairs in-process or through the job queue.
+
+    Returns the serials whose cloud backup and audio settings both restored.
+    """
+    if not JOB_QUEUE:
+        for (row, cam_id_b), outcome, error in log.bounded(
+            "camera_restore", lambda item: restore_camera_settings(cam_b, item[1], item[0]), pending,
+            entity=lambda item: item[0]["serial"], outcome_of=restore_outcome, label="Restoring cameras"
+        ):
+            if outcome is None:
+                # restore_camera_settings records API errors itself; this is a bad row
+                report_error("backup_rows", row["serial"], str(error))
+                continue
+            report_outcome(row["serial"], cam_id_b, outcome)
+    else:
+        restore_jobs = [{"serial": row["serial"], "camera_id_b": cam_id_b, "row": row} for row, cam_id_b in pending]
+        for payload, outcome, error in run_batch(JOB_QUEUE, "camera_restore", "camera_restore", restore_jobs):
+            if outcome is None:
+                log.event("camera_restore", payload["serial"], "error", reason=error)
+                report_error("job_queue", payload["serial"], error)
+                continue
+            report_outcome(payload["serial"], payload["camera_id_b"], outcome)
 
-camera_data_b = cam_b.get_camera_data()
+    return {
+        row["serial"] for row, _ in pending
+        if row["serial"] in outcomes and restore_outcome(outcomes[row["serial"]]) == "ok"
+    }
 
-cameras_b = (
-    camera_data_b.get("cameras_tests")
-    or camera_data_b.get("cameras")
-    or camera_data_b.get("devices")
-    or camera_data_b.get("camera_list")
-    or camera_data_b.get("cameras_list")
-    or []
-)
 
-print(f"DEBUG: Raw camera_data_b keys = {list(camera_data_b.keys())}")
-print(f"Found {len(cameras_b)} cameras in Org B.\n")
+def claimed_rows(index, skip=()):
+    """Backup rows whose serial is now in Org B, as (row, camera_id_b)."""
+    pending = []
+    for row in backup_rows:
+        if row["serial"] in skip:
+            continue
+        cam_id_b = index.camera_id(row["serial"])
+        if cam_id_b is not None:
+            pending.append((row, cam_id_b))
+    return pending
+
+
+def load_restored():
+    if not os.path.exists(RESTORED_STATE):
+        return set()
+    with open(RESTORED_STATE, encoding="utf-8") as f:
+        return set(json.load(f))
+
+
+def save_restored(serials):
+    os.makedirs(os.path.dirname(RESTORED_STATE), exist_ok=True)
+    with open(RESTORED_STATE, "w", encoding="utf-8") as f:
+        json.dump(sorted(serials), f)
+
+
+# Typed rows (ints/bools already converted); bad cells are kept as text and listed
+backup_rows = load_backup(CSV_CAMERA_FILE, CAMERA_SCHEMA, errors=failures["backup_rows"])
+
+stats["cameras_in_backup"] = len(backup_rows)
+
+if not args.watch:
+    # Only fully restored serials are recorded; failed ones are tried again next run
+    save_restored(load_restored() | restore_rows(claimed_rows(serial_index)))
+
+else:
+    # -----------------------------------------------------
+    # WATCH MODE — restore cameras as they are claimed
+    # -----------------------------------------------------
+    # Polls Org B's camera list; an unchanged list (same fingerprint) does
+    # no work and doubles the wait, up to --watch-max-interval. Any change
+    # or restore resets it. Serials already restored are kept in
+    # RESTORED_STATE, so stopping and restarting the watcher is safe.
+    # Cameras whose restore failed stay pending and are retried after the
+    # next wait.
+    restored = load_restored()
+    retry_failed = False
+    wanted = {row["serial"] for row in backup_rows}
+    interval = args.watch_interval
+    last_fingerprint = None
+    deadline = time.monotonic() + args.watch_timeout if args.watch_timeout else None
+
+    print(f"Watching Org B for {len(wanted - restored)} unrestored cameras "
+          f"(poll every {args.watch_interval}–{args.watch_max_interval}s, Ctrl+C to stop)\n")
 
-for c in cameras_b:
-    serial = c.get("serial_number") or c.get("serial")
-    cam_id = c.get("camera_id") or c.get("device_id")
-    if serial and cam_id:
-        serial_map[serial] = cam_id
+    try:
+        while wanted - restored:
+            if serial_index.fingerprint() != last_fingerprint or retry_failed:
+                last_fingerprint = serial_index.fingerprint()
+                retry_failed = False
+                pending = claimed_rows(serial_index, skip=restored)
+                if pending:
+                    print(f"\n{len(pending)} claimed cameras to restore — restoring settings")
+                    done = restore_rows(pending)
+                    restored |= done
+                    save_restored(restored)
+                    if len(done) == len(pending):
+                        interval = args.watch_interval
+                        continue
+                    print(f"  • {len(pending) - len(done)} restores failed; retrying after the next wait")
+                    retry_failed = True
 
-print(f"Built serial map for {len(serial_map)} cameras in Org B.\n")
+            if deadline and time.monotonic() >= deadline:
+                print("\nWatch timeout reached.")
+                break
+
+            print(f"  • {len(wanted - restored)} cameras not restored yet; next check in {interval:.0f}s")
+            time.sleep(interval)
+
+            try:
+                serial_index = SerialIndex.fetch(cam_b, "B")
+            except Exception as e:
+                print(f"  • camera list fetch failed ({e}); backing off")
+                interval = min(args.watch_max_interval, interval * 2)
+                continue
+
+            if serial_index.fingerprint() == last_fingerprint:
+                interval = min(args.watch_max_interval, interval * 2)
+            else:
+                interval = args.watch_interval
+    except KeyboardInterrupt:
+        print("\nWatch stopped.")
+
+    if not wanted - restored:
+        print("\nEvery camera in the backup has been restored.")
+
+for outcome in outcomes.values():
+    if outcome["cloud"] is None:
+        stats["cloud_restored"] += 1
+    else:
+        failures["cloud_backup_restore"].append(outcome["cloud"])
+
+    if outcome["audio"] is None:
+        stats["audio_restored"] += 1
+    else:
+        failures["audio_restore"].append(outcome["audio"])
+
+for category, entry in row_errors.values():
+    failures[category].append(entry)
+
+unclaimed = [
+    {"serial": row["serial"], "name": row.get("name"), "site": row.get("site")}
+    for row in backup_rows
+    if row["serial"] not in serial_index.serial_to_id
+]
+
+if unclaimed:
+    print(f"\n{len(unclaimed)} serials from {CSV_CAMERA_FILE} are not claimed in Org B yet (see report).")
 
 # ---------------------------------------------------------
-# READ CSV & RESTORE SETTINGS
+# RESTORE REPORT
 # ---------------------------------------------------------
-with open(CSV_CAMERA_FILE, "r") as f:
-    reader = csv.DictReader(f)
+report = ReportBuilder("Cloud Backup + Audio Restore Report")
+
+with report.section("header") as f:
+    f.write("# Cloud Backup + Audio Restore Report\n")
+    f.write("Generated automatically by the Org Migration Utility\n\n")
+    f.write("---\n\n")
 
-    for row in reader:
+with report.section("summary", data=stats) as f:
+    claimed = stats["cameras_in_backup"] - len(unclaimed)
+    f.write("## Summary\n\n")
+    f.write("| Category | Success | Total |\n")
+    f.write("|----------|--------:|------:|\n")
+    f.write(f"| Cameras Claimed in Org B | {claimed} | {stats['cameras_in_backup']} |\n")
+    f.write(f"| Cloud Backup Settings | {stats['cloud_restored']} | {claimed} |\n")
+    f.write(f"| Audio Settings | {stats['audio_restored']} | {claimed} |\n")
+    f.write("\n---\n\n")
 
-        serial = row["serial"]
+with report.section("unclaimed", data=unclaimed) as f:
+    f.write("## Serials Not Yet Claimed in Org B\n\n")
+    if unclaimed:
+        f.write("Claim these cameras into Org B, then rerun this script to restore their settings.\n\n")
+        f.write("| Serial | Name | Site |\n")
+        f.write("|--------|------|------|\n")
+        for cam in unclaimed:
+            f.write(f"| {cam['serial']} | {cam['name'] or ''} | {cam['site'] or ''} |\n")
+        f.write("\n")
+    else:
+        f.write(f"Every camera in {CSV_CAMERA_FILE} is claimed in Org B.\n\n")
+    f.write("---\n\n")
 
-        if serial not in serial_map:
-            print(f"Skipping serial {serial} — not found in Org B")
+with report.section("failures", data=failures) as f:
+    f.write("## Items Requiring Manual Review\n\n")
+    wrote_any_failure = False
+    for category, items in failures.items():
+        if not items:
             continue
+        wrote_any_failure = True
+        f.write(f"### {category}\n")
+        for item in items:
+            f.write(f"- {summarize(item)}\n")
+        f.write("\n")
+    if not wrote_any_failure:
+        f.write("No errors detected.\n\n")
 
-        cam_id_b = serial_map[serial]
-
-        print(f"\nRestoring settings for {serial} → Camera ID {cam_id_b}")
-
-        # -----------------------------------------
-        # CLOUD BACKUP RESTORE
-        # -----------------------------------------
-        try:
-            cam_b.update_cloud_backup_settings(
-                camera_id=cam_id_b,
-                days_to_preserve=row["cloud_days_to_preserve"],
-                enabled=int(row["cloud_enabled"]),
-                time_to_preserve=row["cloud_time_to_preserve"],
-                upload_timeslot=row["cloud_upload_timeslot"],
-                video_quality=row["cloud_video_quality"],
-                video_to_upload=row["cloud_video_to_upload"]
-            )
-            print("Cloud backup restored.")
-        except Exception as e:
-            print(f"Cloud backup restore FAILED: {e}")
-
-        # -----------------------------------------
-        # AUDIO RESTORE
-        # -----------------------------------------
-        try:
-            audio_enabled = row["audio_enabled"].lower() == "true"
-            cam_b.set_camera_audio_status(cam_id_b, audio_enabled)
-            print(f"Audio restored → {audio_enabled}")
-        except Exception as e:
-            print(f"Audio restore FAILED: {e}")
+report.write(REPORT_PATH)
 
 print("\n=====================================")
 print(" RESTORE SCRIPT COMPLETED SUCCESSFULLY")
 print("=====================================\n")
 
+print(f"Restore report saved to: {REPORT_PATH}")
 
+failure_log = write_failure_log("CloudBackup&Audio", failures)
+print(f"Failure log saved to: {failure_log} (replay with --retry-failures)\n")
@@ -4,11 +4,17 @@ import time
 import csv
 from pykada.workplace import WorkplaceClient
 
+from utils.report import ReportBuilder
+from utils.columnar import write_columnar
+from utils.failures import write_failure_log
+from utils.eventlog import EventLog
+from utils.tokens import shared_token_manager
+
 load_dotenv(override=True)
 api_key_a = os.getenv("VERKADA_API_KEY_A")
 
 # Initialize WorkplaceClient (handles OAuth)
-workplace_a = WorkplaceClient(api_key_a)
+workplace_a = WorkplaceClient(token_manager=shared_token_manager(api_key_a))
 
 # Determine project root (folder ABOVE "Migration Scripts")
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -30,6 +36,9 @@ os.makedirs(DOCS_DIR, exist_ok=True)
 # Path to write the final markdown report
 REPORT_PATH = os.path.join(DOCS_DIR, "guest_migration_report.md")
 
+# Per-site progress goes to Logs/Guest.jsonl; the console shows a progress bar
+log = EventLog("Guest", log_dir=os.path.join(PROJECT_ROOT, "Logs"))
+
 # ----------------------------------
 # FAILURE TRACKER
 # ----------------------------------
@@ -75,6 +84,11 @@ try:
                 s.get("site_name", ""),
             ])
 
+    write_columnar(sites_csv, [
+        {"org_id": s.get("org_id", ""), "site_id": s.get("site_id", ""), "site_name": s.get("site_name", "")}
+        for s in sites_a
+    ])
+
     print(f"Guest Sites saved → {sites_csv}")
 except Exception as e:
     failures["csv"].append(("guest_sites", str(e)))
@@ -100,12 +114,13 @@ try:
             "enabled_for_invites"
         ])
 
+        bar = log.progress(len(sites_a), "Guest Types")
         for s in sites_a:
             site_id = s["site_id"]
-            print(f"  • Guest Types → {site_id}")
 
             try:
-                resp = workplace_a.get_guest_types(site_id)
+                with log.timed("guest_types", site_id):
+                    resp = workplace_a.get_guest_types(site_id)
                 items = resp.get("items", [])
 
                 for t in items:
@@ -118,9 +133,22 @@ try:
                     ])
 
                 guest_types_all.extend(items)
+                bar.update()
 
             except Exception as e:
                 failures["guest_types"].append((site_id, str(e)))
+                bar.update(failed=True)
+        bar.close()
+
+    write_columnar(guest_types_csv, [
+        {
+            "site_id": t.get("site_id"),
+            "guest_type_id": t.get("guest_type_id", ""),
+            "name": t.get("name", ""),
+            "enabled_for_invites": t.get("enabled_for_invites"),
+        }
+        for t in guest_types_all
+    ])
 
     print(f"Guest Types saved → {guest_types_csv}")
 except Exception as e:
@@ -153,12 +181,13 @@ try:
             "delegate_email"
         ])
 
+        bar = log.progress(len(sites_a), "Hosts")
         for s in sites_a:
             site_id = s["site_id"]
-            print(f"  • Hosts → {site_id}")
 
             try:
-                resp = workplace_a.get_guest_hosts(site_id)
+                with log.timed("guest_hosts", site_id):
+                    resp = workplace_a.get_guest_hosts(site_id)
                 items = resp.get("items", [])
 
                 for h in items:
@@ -176,9 +205,27 @@ try:
                     ])
 
                 guest_hosts_all.extend(items)
+                bar.update()
 
             except Exception as e:
                 failures["guest_hosts"].append((site_id, str(e)))
+                bar.update(failed=True)
+        bar.close()
+
+    write_columnar(hosts_csv, [
+        {
+            "site_id": h.get("site_id"),
+            "host_id": h.get("host_id", ""),
+            "email": h.get("email", ""),
+            "first_name": h.get("first_name", ""),
+            "last_name": h.get("last_name", ""),
+            "phone_number": h.get("phone_number", ""),
+            "requires_host_approval": h.get("requires_host_approval"),
+            "has_delegate": h.get("has_delegate"),
+            "delegate": h.get("delegate") or None,
+        }
+        for h in guest_hosts_all
+    ])
 
     print(f"Guest Hosts saved → {hosts_csv}")
 except Exception as e:
@@ -199,25 +246,28 @@ all_visits = []
 end_time = int(time.time())
 start_time = end_time - 86400  # last 24h
 
+bar = log.progress(len(sites_a), "Visits")
 for s in sites_a:
     site_id = s["site_id"]
     site_name = s.get("site_name", "")
 
-    print(f"  • Visits → {site_name} ({site_id})")
-
     try:
-        visits_gen = workplace_a.get_all_guest_visits(
-            site_id=site_id,
-            start_time=start_time,
-            end_time=end_time
-        )
-
-        for v in visits_gen:
-            v["site_id"] = site_id
-            all_visits.append(v)
+        with log.timed("guest_visits", site_id, site_name=site_name):
+            visits_gen = workplace_a.get_all_guest_visits(
+                site_id=site_id,
+                start_time=start_time,
+                end_time=end_time
+            )
+
+            for v in visits_gen:
+                v["site_id"] = site_id
+                all_visits.append(v)
+        bar.update()
 
     except Exception as e:
         failures["visit_fetch"].append((site_id, str(e)))
+        bar.update(failed=True)
+bar.close()
 
 try:
     with open(visits_csv, "w", newline="") as f:
@@ -239,6 +289,17 @@ try:
                 v.get("deleted", "")
             ])
 
+    write_columnar(visits_csv, [
+        {
+            "site_id": v.get("site_id"),
+            "visit_id": v.get("visit_id"),
+            "check_in_time": v.get("check_in_time"),
+            "approval_status": v.get("approval_status"),
+            "deleted": v.get("deleted"),
+        }
+        for v in all_visits
+    ])
+
     print(f"Guest Visits saved → {visits_csv}")
 except Exception as e:
     failures["csv"].append(("guest_visits", str(e)))
@@ -273,8 +334,9 @@ print("\nGuest Export Completed.\n")
 # GENERATE FULL MARKDOWN REPORT
 # ============================================
 
-with open(REPORT_PATH, "w", encoding="utf-8") as f:
+report = ReportBuilder("Verkada Guest Migration Report")
 
+with report.section("header") as f:
     # ===========================================================
     # HEADER
     # ===========================================================
@@ -282,6 +344,7 @@ with open(REPORT_PATH, "w", encoding="utf-8") as f:
     f.write("Generated automatically by the Org Migration Utility\n\n")
     f.write("---\n\n")
 
+with report.section("introduction") as f:
     # ===========================================================
     # INTRODUCTION
     # ===========================================================
@@ -297,6 +360,7 @@ with open(REPORT_PATH, "w", encoding="utf-8") as f:
     )
     f.write("---\n\n")
 
+with report.section("exported") as f:
     # ===========================================================
     # WHAT WAS EXPORTED AUTOMATICALLY
     # ===========================================================
@@ -310,6 +374,7 @@ with open(REPORT_PATH, "w", encoding="utf-8") as f:
     )
     f.write("---\n\n")
 
+with report.section("manual_rebuild") as f:
     # ===========================================================
     # WHAT MUST BE REBUILT MANUALLY
     # ===========================================================
@@ -329,6 +394,7 @@ with open(REPORT_PATH, "w", encoding="utf-8") as f:
     )
     f.write("---\n\n")
 
+with report.section("summary") as f:
     # ===========================================================
     # EXPORT SUMMARY TABLE (SUCCESS / TOTAL)
     # ===========================================================
@@ -341,6 +407,7 @@ with open(REPORT_PATH, "w", encoding="utf-8") as f:
     f.write(f"| Guest Visits Extracted | {len(all_visits)} | {len(all_visits)} |\n\n")
     f.write("---\n\n")
 
+with report.section("failures", data=failures) as f:
     # ===========================================================
     # FAILURES
     # ===========================================================
@@ -359,6 +426,7 @@ with open(REPORT_PATH, "w", encoding="utf-8") as f:
 
     f.write("---\n\n")
 
+with report.section("workflow") as f:
     # ===========================================================
     # FULL GUEST WORKFLOW
     # ===========================================================
@@ -404,9 +472,21 @@ with open(REPORT_PATH, "w", encoding="utf-8") as f:
         "2. Add or map users so the host lists match each listed site.\n\n"
         "---\n\n"
     )
-    # ===========================================================
-    # PER-SITE DETAIL OUTPUT (Guest Types + Hosts)
-    # ===========================================================
+
+# ===========================================================
+# PER-SITE DETAIL OUTPUT (Guest Types + Hosts)
+# ===========================================================
+# Group types/hosts by site once instead of rescanning both lists per site
+types_by_site = {}
+for t in guest_types_all:
+    types_by_site.setdefault(t.get("site_id"), []).append(t)
+
+hosts_by_site = {}
+for h in guest_hosts_all:
+    hosts_by_site.setdefault(h.get("site_id"), []).append(h)
+
+
+def render_site_details(f):
     f.write("Full Recreation List:\n")
     for s in sites_a:
         site_id = s.get("site_id")
@@ -418,7 +498,7 @@ with open(REPORT_PATH, "w", encoding="utf-8") as f:
 
         # Guest Types
         f.write("#### Guest Types\n")
-        site_types = [t for t in guest_types_all if t.get("site_id") == site_id]
+        site_types = types_by_site.get(site_id, [])
         if site_types:
             for t in site_types:
                 f.write(
@@ -431,7 +511,7 @@ with open(REPORT_PATH, "w", encoding="utf-8") as f:
 
         # Hosts
         f.write("#### Hosts\n")
-        site_hosts = [h for h in guest_hosts_all if h.get("site_id") == site_id]
+        site_hosts = hosts_by_site.get(site_id, [])
         if site_hosts:
             for h in site_hosts[:25]:
                 f.write(
@@ -447,6 +527,10 @@ with open(REPORT_PATH, "w", encoding="utf-8") as f:
 
     f.write("---\n\n")
 
+
+report.deferred("sites", render_site_details, data=sites_a)
+
+with report.section("workflow_continued") as f:
     # ---------- iPads, Printers
     f.write("### Step 3: Reconnect iPads & Printers as Needed\n\n")
     f.write(
@@ -499,5 +583,9 @@ with open(REPORT_PATH, "w", encoding="utf-8") as f:
     # ---------- Ending
     f.write("## Congratulations! Guest Backup Complete. Please run next script(s) as needed to complete full migration process.\n\n")
 
+report.write(REPORT_PATH)
 
 print(f"Generated Guest Report → {REPORT_PATH}")
+
+failure_log = write_failure_log("Guest", failures)
+print(f"Failure log saved to: {failure_log}\n")
@@ -4,16 +4,39 @@
 
 from dotenv import load_dotenv
 import os
+import sys
 import csv
+import json
+import argparse
 from pykada.helix import HelixClient
 
+from utils.report import ReportBuilder
+from utils.columnar import write_columnar
+from utils.retry import retry_call
+from utils.failures import failure, summarize, write_failure_log, replay_failures
+from utils.eventlog import EventLog
+from utils.tokens import shared_token_manager
+
 load_dotenv(override=True)
 
+parser = argparse.ArgumentParser(description="Migrate Helix event types from Org A to Org B.")
+parser.add_argument("--retry-failures", action="store_true",
+                    help="Only replay the operations recorded in ../Failures/Helix_failures.jsonl")
+args = parser.parse_args()
+
 api_key_a = os.getenv("VERKADA_API_KEY_A")
 api_key_b = os.getenv("VERKADA_API_KEY_B")
 
-helix_a = HelixClient(api_key_a)
-helix_b = HelixClient(api_key_b)
+helix_a = HelixClient(token_manager=shared_token_manager(api_key_a))
+helix_b = HelixClient(token_manager=shared_token_manager(api_key_b))
+
+clients = {"helix_a": helix_a, "helix_b": helix_b}
+
+if args.retry_failures:
+    replay_failures("Helix", clients)
+    sys.exit(0)
+
+log = EventLog("Helix")
 
 # ----------------------------------
 # PREP CSV FOLDER
@@ -65,11 +88,20 @@ for et in event_types_a:
     schema = et["event_schema"]
 
     try:
-        created = helix_b.create_helix_event_type(schema, name)
+        with log.timed("event_type_create", name):
+            created = retry_call(
+                helix_b.create_helix_event_type, schema, name,
+                idempotent=False,
+                verify=lambda: next(
+                    (t for t in helix_b.get_helix_event_types().get("event_types", []) if t["name"] == name), None
+                )
+            )
         new_uid = created["event_type_uid"]
         event_type_map[name] = new_uid
     except Exception as e:
-        failures["event_type_create"].append((name, str(e)))
+        failures["event_type_create"].append(failure(
+            "helix_b.create_helix_event_type", e, args=(schema, name), name=name
+        ))
         continue
 
 
@@ -89,6 +121,17 @@ try:
                 et.get("event_schema")
             ])
 
+    # Schemas differ per event type, so they are kept as JSON text rather
+    # than a single struct column
+    write_columnar(event_types_csv, [
+        {
+            "name": et.get("name"),
+            "event_type_uid": et.get("event_type_uid"),
+            "event_schema": json.dumps(et.get("event_schema")),
+        }
+        for et in event_types_a
+    ])
+
     print(f"Event Types backed up → {event_types_csv}")
 
 except Exception as e:
@@ -107,7 +150,7 @@ print("==============================\n")
 for k, v in failures.items():
     print(f"{k}: {len(v)} failures")
     for item in v:
-        print("  -", item)
+        print("  -", summarize(item))
 
 
 # ----------------------------------
@@ -130,8 +173,9 @@ print("\nHelix Event Type Migration Completed.\n")
 report_path = "../Documentation/helix_event_type_migration_report.md"
 os.makedirs(os.path.dirname(report_path), exist_ok=True)
 
-with open(report_path, "w", encoding="utf-8") as r:
+report = ReportBuilder("Helix Migration Report")
 
+with report.section("header") as r:
     # ------------------------------------------------------
     # HEADER
     # ------------------------------------------------------
@@ -139,6 +183,7 @@ with open(report_path, "w", encoding="utf-8") as r:
     r.write("Generated automatically by the Org Migration Utility\n\n")
     r.write("---\n\n")
 
+with report.section("introduction") as r:
     # ------------------------------------------------------
     # INTRODUCTION
     # ------------------------------------------------------
@@ -158,6 +203,7 @@ with open(report_path, "w", encoding="utf-8") as r:
     )
     r.write("---\n\n")
 
+with report.section("summary") as r:
     # ------------------------------------------------------
     # MIGRATION SUMMARY TABLE
     # ------------------------------------------------------
@@ -172,6 +218,7 @@ with open(report_path, "w", encoding="utf-8") as r:
     r.write(f"| CSV Backup Generated | {1 if total_count > 0 else 0} | 1 |\n")
     r.write("\n---\n\n")
 
+with report.section("migrated", data=event_type_map) as r:
     # ------------------------------------------------------
     # MIGRATED EVENT TYPES
     # ------------------------------------------------------
@@ -188,6 +235,7 @@ with open(report_path, "w", encoding="utf-8") as r:
 
     r.write("---\n\n")
 
+with report.section("failures", data=failures) as r:
     # ------------------------------------------------------
     # FAILURES
     # ------------------------------------------------------
@@ -204,12 +252,16 @@ with open(report_path, "w", encoding="utf-8") as r:
                 continue
             wrote_any_failure = True
             r.write(f"### {category}\n")
-            for name, reason in items:
-                r.write(f"- **{name}** → `{reason}`\n")
+            for item in items:
+                if isinstance(item, dict):
+                    r.write(f"- **{item['name']}** → `{item['reason']}`\n")
+                else:
+                    r.write(f"- {item}\n")
             r.write("\n")
 
     r.write("---\n\n")
 
+with report.section("next_steps") as r:
     # ------------------------------------------------------
     # NEXT STEPS & INTEGRATION READINESS
     # ------------------------------------------------------
@@ -228,9 +280,15 @@ with open(report_path, "w", encoding="utf-8") as r:
         "**TLDR:** All Event Types from Org A have been recreated in Org B and are ready to power Helix integrations.\n\n"
     )
 
+with report.section("completion") as r:
     # ------------------------------------------------------
     # COMPLETION
     # ------------------------------------------------------
     r.write("## Migration Complete!\n")
 
-print(f"\n✔ Helix Markdown report saved to: {report_path}\n")
+report.write(report_path)
+
+failure_log = write_failure_log("Helix", failures)
+
+print(f"\n✔ Helix Markdown report saved to: {report_path}")
+print(f"✔ Failure log saved to: {failure_log} (replay with --retry-failures)\n")
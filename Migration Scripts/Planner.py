@@ -0,0 +1,277 @@
+# ================================
+# PRE-FLIGHT CAPACITY PLANNER
+# (Read-only — run before AccessControl.py / Cameras.py / Guest.py)
+# ================================
+#
+# Issues only the cheap list calls against Org A (plus Org B's user list when
+# VERKADA_API_KEY_B is set), counts the per-entity requests each migration
+# step will send, and projects wall time from the observed latency and the
+# way each step actually runs: through the MIGRATION_MAX_WORKERS pool, across
+# ACCESS_SHARDS / JOB_QUEUE workers, or one request at a time.
+
+import os
+import time
+import argparse
+import statistics
+from dotenv import load_dotenv
+
+from pykada.access_control import AccessControlClient
+from pykada.cameras import CamerasClient
+from pykada.workplace import WorkplaceClient
+
+from utils.report import ReportBuilder
+from utils.pool import MAX_WORKERS, run_bounded
+from utils.transforms import camera_list, poi_image
+from utils.tokens import shared_token_manager
+
+load_dotenv(override=True)
+api_key_a = os.getenv("VERKADA_API_KEY_A")
+api_key_b = os.getenv("VERKADA_API_KEY_B")
+
+# Same switches AccessControl.py reads for STEP 1 / STEP 3
+ACCESS_SHARDS = max(1, int(os.getenv("ACCESS_SHARDS", "1")))
+JOB_QUEUE = os.getenv("JOB_QUEUE")
+
+parser = argparse.ArgumentParser(description="Estimate API calls and runtime before migrating.")
+parser.add_argument("--concurrency", type=int, default=MAX_WORKERS,
+                    help=f"Requests in flight to plan for (default: MIGRATION_MAX_WORKERS = {MAX_WORKERS})")
+parser.add_argument("--sample", type=int, default=0,
+                    help="Fetch this many access user details to measure writes per user (default: 0, use estimate)")
+parser.add_argument("--queue-workers", type=int, default=1,
+                    help="Worker.py processes that will drain JOB_QUEUE (default: 1)")
+parser.add_argument("--latency-ms", type=float, default=None,
+                    help="Override the per-request latency instead of using the observed list-call latency")
+args = parser.parse_args()
+
+access_client_a = AccessControlClient(token_manager=shared_token_manager(api_key_a))
+cam_a = CamerasClient(token_manager=shared_token_manager(api_key_a))
+workplace_a = WorkplaceClient(token_manager=shared_token_manager(api_key_a))
+access_client_b = AccessControlClient(token_manager=shared_token_manager(api_key_b)) if api_key_b else None
+
+# Average Org B writes per user in STEP 3 (BLE, remote, dates, entry code,
+# group memberships, cards, MFA, plates) when no sample is taken
+ASSUMED_WRITES_PER_USER = 3.0
+
+latencies = []
+failures = {"list_calls": []}
+
+
+def timed(name, fn):
+    start = time.perf_counter()
+    try:
+        result = fn()
+    except Exception as e:
+        failures["list_calls"].append((name, str(e)))
+        print(f"  • {name}: FAILED ({e})")
+        return None
+    elapsed = time.perf_counter() - start
+    latencies.append(elapsed)
+    print(f"  • {name}: {elapsed * 1000:.0f} ms")
+    return result
+
+
+print("\n==============================")
+print(" PRE-FLIGHT: LIST CALLS (ORG A)")
+print("==============================\n")
+
+users_resp = timed("get_all_access_users", access_client_a.get_all_access_users) or {}
+users = users_resp.get("access_members", [])
+
+groups_resp = timed("get_access_groups", access_client_a.get_access_groups) or {}
+groups = groups_resp.get("access_groups", [])
+
+camera_data = timed("get_camera_data", cam_a.get_camera_data) or {}
+cameras = camera_list(camera_data)
+
+lpois = timed("get_all_lpois", lambda: list(cam_a.get_all_lpois())) or []
+
+pois = timed("get_all_pois", lambda: list(cam_a.get_all_pois())) or []
+
+sites_resp = timed("get_guest_sites", workplace_a.get_guest_sites) or {}
+guest_sites = sites_resp.get("guest_sites", [])
+
+# STEP 3's credential pre-check also reads every Org B user
+if access_client_b is not None:
+    users_b_resp = timed("get_all_access_users (Org B)", access_client_b.get_all_access_users)
+    users_b = (users_b_resp or {}).get("access_members", [])
+    users_b_source = "listed" if users_b_resp is not None else "list call failed"
+else:
+    users_b = None
+    users_b_source = "estimate (VERKADA_API_KEY_B not set)"
+
+# ----------------------------------
+# OPTIONAL: SAMPLE USER DETAILS
+# ----------------------------------
+writes_per_user = ASSUMED_WRITES_PER_USER
+writes_source = "estimate"
+
+if args.sample and users:
+    def count_writes(u):
+        full = access_client_a.get_access_user(user_id=u["user_id"])
+        return (
+            sum(1 for k in ("ble_unlock", "remote_unlock", "start_date", "end_date", "entry_code") if full.get(k))
+            + len(full.get("access_groups", []))
+            + len(full.get("cards", []))
+            + len(full.get("mfa_codes", []))
+            + len(full.get("license_plates", []))
+        )
+
+    start = time.perf_counter()
+    counts = [n for _, n, err in run_bounded(count_writes, users[:args.sample], args.concurrency) if err is None]
+    if counts:
+        writes_per_user = statistics.mean(counts)
+        writes_source = f"sampled from {len(counts)} users"
+        latencies.append((time.perf_counter() - start) * min(args.concurrency, len(counts)) / len(counts))
+
+if args.latency_ms is not None:
+    latency = args.latency_ms / 1000
+    latency_source = "override"
+elif latencies:
+    latency = statistics.median(latencies)
+    latency_source = f"median of {len(latencies)} observed calls"
+else:
+    latency = 0.25
+    latency_source = "default (no calls succeeded)"
+
+# ----------------------------------
+# PER-STEP REQUEST ESTIMATES
+# ----------------------------------
+n_users = len(users)
+n_users_b = len(users_b) if users_b is not None else n_users
+n_groups = len(groups)
+n_cams = len(cameras)
+n_lpois = len(lpois)
+n_faces = sum(1 for poi in pois if poi_image(poi))
+n_sites = len(guest_sites)
+
+# Requests in flight for each way a step can run: None = the
+# MIGRATION_MAX_WORKERS pool (scales with --concurrency), else a fixed count
+POOL = None
+SERIAL = 1
+if JOB_QUEUE:
+    access_workers = max(1, args.queue_workers)
+    access_mode = f"{access_workers} queue worker(s)"
+elif ACCESS_SHARDS > 1:
+    access_workers = ACCESS_SHARDS
+    access_mode = f"{ACCESS_SHARDS} shard processes"
+else:
+    access_workers = SERIAL
+    access_mode = "serial"
+
+# (script, step, requests, workers)
+plan = [
+    ("AccessControl.py", f"STEP 1 — Users (get_user + create_user, {access_mode})", 1 + 2 * n_users, access_workers),
+    ("AccessControl.py", "STEP 2 — Access Groups", 1 + n_groups, SERIAL),
+    ("AccessControl.py", "STEP 3 — Credential Pre-Check (Org A + Org B user details)", 1 + n_users + n_users_b, POOL),
+    ("AccessControl.py", f"STEP 3 — User Attributes ({access_mode})", round(n_users * writes_per_user), access_workers),
+    ("AccessControl.py", "STEPS 4–6 — Doors, Levels, Calendars", 3, SERIAL),
+    ("Cameras.py", "STEP 1 — POIs", 1, SERIAL),
+    ("Cameras.py", "STEP 1 — POI Face Images", n_faces, POOL),
+    ("Cameras.py", "STEP 2 — Camera Settings (cloud backup + audio)", 1 + 2 * n_cams, POOL),
+    ("Cameras.py", "STEP 3 — LPOIs", 2 + n_lpois, POOL),
+    ("Guest.py", "Guest Types / Hosts / Visits", 1 + 3 * n_sites, SERIAL),
+]
+
+
+def projected_seconds(requests, workers):
+    """Wall time with `workers` requests in flight (None = the --concurrency pool)."""
+    if workers is None:
+        workers = args.concurrency
+    return requests * latency / max(1, workers)
+
+
+def fmt_duration(seconds):
+    seconds = int(round(seconds))
+    h, rem = divmod(seconds, 3600)
+    m, s = divmod(rem, 60)
+    return f"{h}h {m:02d}m {s:02d}s" if h else f"{m}m {s:02d}s"
+
+
+print("\n==============================")
+print(" PROJECTED WORKLOAD")
+print("==============================\n")
+
+print(f"Users: {n_users} (Org B: {n_users_b}, {users_b_source}) | Groups: {n_groups} | Cameras: {n_cams} | "
+      f"LPOIs: {n_lpois} | POI Faces: {n_faces} | Guest Sites: {n_sites}")
+print(f"Latency per request: {latency * 1000:.0f} ms ({latency_source})")
+print(f"Writes per user: {writes_per_user:.1f} ({writes_source})")
+print(f"Concurrency: {args.concurrency}\n")
+
+totals = {}
+for script, step, requests, workers in plan:
+    serial = projected_seconds(requests, SERIAL)
+    concurrent = projected_seconds(requests, workers)
+    t = totals.setdefault(script, [0, 0.0, 0.0])
+    t[0] += requests
+    t[1] += serial
+    t[2] += concurrent
+    print(f"{script:18} {step:60} {requests:>8} req  {fmt_duration(serial):>12} serial  {fmt_duration(concurrent):>12} @ {workers or args.concurrency}")
+
+# ============================================
+# PLAN REPORT
+# ============================================
+
+report_path = "../Documentation/migration_plan.md"
+os.makedirs(os.path.dirname(report_path), exist_ok=True)
+
+report = ReportBuilder("Verkada Migration Capacity Plan")
+
+with report.section("header") as f:
+    f.write("# Verkada Migration Capacity Plan\n")
+    f.write("Generated automatically by the Org Migration Utility\n\n")
+    f.write("---\n\n")
+
+with report.section("inputs", data={"users": n_users, "users_b": n_users_b, "groups": n_groups, "cameras": n_cams,
+                                    "lpois": n_lpois, "poi_faces": n_faces, "guest_sites": n_sites}) as f:
+    f.write("## Inputs\n\n")
+    f.write("| Item | Value |\n")
+    f.write("|------|------:|\n")
+    f.write(f"| Access Users | {n_users} |\n")
+    f.write(f"| Org B Access Users | {n_users_b} ({users_b_source}) |\n")
+    f.write(f"| Access Groups | {n_groups} |\n")
+    f.write(f"| Cameras | {n_cams} |\n")
+    f.write(f"| LPOIs | {n_lpois} |\n")
+    f.write(f"| POI Face Images | {n_faces} |\n")
+    f.write(f"| Guest Sites | {n_sites} |\n")
+    f.write(f"| Latency per Request | {latency * 1000:.0f} ms ({latency_source}) |\n")
+    f.write(f"| Writes per User | {writes_per_user:.1f} ({writes_source}) |\n")
+    f.write(f"| Concurrency | {args.concurrency} |\n")
+    f.write(f"| AccessControl STEP 1 / STEP 3 | {access_mode} |\n")
+    f.write("\n---\n\n")
+
+with report.section("steps", data=[
+    {"script": script, "step": step, "requests": requests, "workers": workers or args.concurrency,
+     "serial_seconds": projected_seconds(requests, SERIAL),
+     "concurrent_seconds": projected_seconds(requests, workers)}
+    for script, step, requests, workers in plan
+]) as f:
+    f.write("## Per-Step Projection\n\n")
+    f.write("| Script | Step | Requests | In Flight | Serial | Projected |\n")
+    f.write("|--------|------|---------:|----------:|-------:|----------:|\n")
+    for script, step, requests, workers in plan:
+        f.write(
+            f"| {script} | {step} | {requests} | {workers or args.concurrency} | "
+            f"{fmt_duration(projected_seconds(requests, SERIAL))} | "
+            f"{fmt_duration(projected_seconds(requests, workers))} |\n"
+        )
+    f.write("\n")
+
+    f.write("### Totals per Script\n\n")
+    f.write("| Script | Requests | Serial | Projected |\n")
+    f.write("|--------|---------:|-------:|-------:|\n")
+    for script, (requests, serial, concurrent) in totals.items():
+        f.write(f"| {script} | {requests} | {fmt_duration(serial)} | {fmt_duration(concurrent)} |\n")
+    f.write("\n---\n\n")
+
+with report.section("failures", data=failures) as f:
+    f.write("## Items Requiring Manual Review\n\n")
+    if failures["list_calls"]:
+        for item in failures["list_calls"]:
+            f.write(f"- {item}\n")
+        f.write("\nCounts for failed list calls are treated as 0 above.\n\n")
+    else:
+        f.write("No errors detected.\n\n")
+
+report.write(report_path)
+
+print(f"\n✔ Capacity plan saved to: {report_path}\n")
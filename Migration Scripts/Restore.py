@@ -0,0 +1,275 @@
+# ================================
+# RESTORE-FROM-BACKUP SCRIPT
+# (Org B only — for when Org A is no longer available)
+# ================================
+#
+# Rebuilds everything the API can write back into Org B from the backups in
+# ../CSVs alone:
+#
+#   camera_data_backup.csv        → cloud backup + audio settings (by serial)
+#   lpois_backup.csv              → license plates of interest
+#   helix_event_types_backup.csv  → Helix event types
+#
+# Backups are loaded through the typed, batched reader (utils/backup_reader.py),
+# Org B's current state is fetched once so existing objects are skipped, and
+# all writes go out through one bounded pool, like a live migration.
+
+import os
+import sys
+import argparse
+from pathlib import Path
+from dotenv import load_dotenv
+
+from pykada.cameras import CamerasClient
+from pykada.helix import HelixClient
+
+from utils.backup_reader import CAMERA_SCHEMA, LPOI_SCHEMA, HELIX_SCHEMA, load_backup
+from utils.camera_settings import restore_camera_settings
+from utils.failures import failure, summarize, write_failure_log, replay_failures
+from utils.pool import run_bounded
+from utils.report import ReportBuilder
+from utils.retry import retry_call
+from utils.serial_index import SerialIndex
+from utils.transforms import normalize_plate, lpoi_plates, find_lpoi
+from utils.eventlog import EventLog
+from utils.tokens import shared_token_manager
+
+load_dotenv(override=True)
+
+RESTORABLE = ["cameras", "lpois", "helix"]
+
+parser = argparse.ArgumentParser(description="Restore Org B from the CSV backups in ../CSVs.")
+parser.add_argument("--only", default=",".join(RESTORABLE),
+                    help=f"Comma-separated subset of: {', '.join(RESTORABLE)} (default: all)")
+parser.add_argument("--csv-dir", default="../CSVs", help="Folder holding the backups (default: ../CSVs)")
+parser.add_argument("--refresh-serials", action="store_true",
+                    help="Re-download Org B's camera list instead of using the cached serial index")
+parser.add_argument("--retry-failures", action="store_true",
+                    help="Only replay the operations recorded in ../Failures/Restore_failures.jsonl")
+args = parser.parse_args()
+
+only = {e.strip() for e in args.only.split(",") if e.strip()}
+unknown = only - set(RESTORABLE)
+if unknown:
+    parser.error(f"unknown backups: {', '.join(sorted(unknown))}")
+
+api_key_b = os.getenv("VERKADA_API_KEY_B")
+
+cam_b = CamerasClient(token_manager=shared_token_manager(api_key_b))
+helix_b = HelixClient(token_manager=shared_token_manager(api_key_b))
+
+clients = {"cam_b": cam_b, "helix_b": helix_b}
+
+if args.retry_failures:
+    replay_failures("Restore", clients)
+    sys.exit(0)
+
+log = EventLog("Restore")
+
+Path("../Documentation").mkdir(exist_ok=True)
+
+BACKUPS = {
+    "cameras": ("camera_data_backup.csv", CAMERA_SCHEMA),
+    "lpois": ("lpois_backup.csv", LPOI_SCHEMA),
+    "helix": ("helix_event_types_backup.csv", HELIX_SCHEMA),
+}
+
+failures = {
+    "backup_rows": [],
+    "org_b_state": [],
+    "cloud_backup_restore": [],
+    "audio_restore": [],
+    "lpoi_create": [],
+    "event_type_create": [],
+}
+
+stats = {
+    name: {"rows": 0, "existing": 0, "unclaimed": 0, "restored": 0, "failed": 0}
+    for name in sorted(only)
+}
+
+# ============================================
+# STEP 1 — LOAD BACKUPS + ORG B STATE (CONCURRENT)
+# ============================================
+
+print("\n==============================")
+print(" STEP 1: LOAD BACKUPS + ORG B STATE")
+print("==============================\n")
+
+loaders = []
+for name in sorted(only):
+    file_name, schema = BACKUPS[name]
+    path = os.path.join(args.csv_dir, file_name)
+    loaders.append((name, "backup", lambda p=path, s=schema: load_backup(p, s, errors=failures["backup_rows"])))
+
+if "cameras" in only:
+    loaders.append(("cameras", "org_b", lambda: SerialIndex.load(cam_b, "B", refresh=args.refresh_serials)))
+if "lpois" in only:
+    loaders.append(("lpois", "org_b", lambda: lpoi_plates(cam_b)))
+if "helix" in only:
+    loaders.append(("helix", "org_b", lambda: {
+        t["name"] for t in helix_b.get_helix_event_types().get("event_types", [])
+    }))
+
+backups = {}
+org_b = {}
+for (name, kind, _), result, err in run_bounded(lambda loader: loader[2](), loaders):
+    if err is not None:
+        print(f"  • {name} ({kind}): FAILED ({err})")
+        target = "backup_rows" if kind == "backup" else "org_b_state"
+        failures[target].append({"backup": name, "reason": str(err)})
+        continue
+    (backups if kind == "backup" else org_b)[name] = result
+    print(f"  • {name} ({kind}): {len(result)}")
+
+# A backup whose Org B state couldn't be read is skipped rather than
+# blindly re-created
+for name in sorted(only):
+    if name not in backups or name not in org_b:
+        print(f"  ! Skipping {name}: backup or Org B state unavailable")
+        backups.pop(name, None)
+    else:
+        stats[name]["rows"] = len(backups[name])
+
+# ============================================
+# STEP 2 — PLAN ORG B WRITES
+# ============================================
+
+writes = []   # (backup, label, row, fn)
+
+if "cameras" in backups:
+    index = org_b["cameras"]
+    for row in backups["cameras"]:
+        cam_id_b = index.camera_id(row["serial"]) if row.get("serial") else None
+        if cam_id_b is None:
+            stats["cameras"]["unclaimed"] += 1
+            continue
+        writes.append(("cameras", row["serial"], row, lambda r=row, c=cam_id_b: restore_camera_settings(cam_b, c, r)))
+
+
+def create_lpoi(plate, description):
+    return retry_call(cam_b.create_lpoi, plate, description,
+                      idempotent=False, verify=lambda: find_lpoi(cam_b, plate))
+
+
+if "lpois" in backups:
+    plates_b = org_b["lpois"]
+    for row in backups["lpois"]:
+        key = normalize_plate(row.get("plate"))
+        if not key:
+            continue
+        if key in plates_b:
+            stats["lpois"]["existing"] += 1
+            continue
+        plates_b.add(key)
+        writes.append(("lpois", row["plate"], row, lambda r=row: create_lpoi(r["plate"], r.get("description"))))
+
+
+def create_event_type(schema, name):
+    return retry_call(
+        helix_b.create_helix_event_type, schema, name,
+        idempotent=False,
+        verify=lambda: next(
+            (t for t in helix_b.get_helix_event_types().get("event_types", []) if t["name"] == name), None
+        )
+    )
+
+
+if "helix" in backups:
+    names_b = org_b["helix"]
+    for row in backups["helix"]:
+        name = row.get("name")
+        if not name:
+            continue
+        if name in names_b:
+            stats["helix"]["existing"] += 1
+            continue
+        names_b.add(name)
+        writes.append(("helix", name, row, lambda r=row: create_event_type(r["event_schema"], r["name"])))
+
+# ============================================
+# STEP 3 — SEND WRITES (CONCURRENT)
+# ============================================
+
+print("\n==============================")
+print(" STEP 3: RESTORE INTO ORG B")
+print("==============================\n")
+
+for (backup, label, row, _), result, err in log.bounded(
+    "restore", lambda write: write[3](), writes, entity=lambda write: f"{write[0]}:{write[1]}", label="Restoring"
+):
+    if backup == "cameras":
+        if err is None and result["cloud"] is None and result["audio"] is None:
+            stats["cameras"]["restored"] += 1
+            continue
+        stats["cameras"]["failed"] += 1
+        if err is not None:
+            failures["backup_rows"].append({"backup": "cameras", "serial": label, "reason": str(err)})
+            continue
+        if result["cloud"] is not None:
+            failures["cloud_backup_restore"].append(result["cloud"])
+        if result["audio"] is not None:
+            failures["audio_restore"].append(result["audio"])
+        continue
+
+    if err is None:
+        stats[backup]["restored"] += 1
+        continue
+
+    stats[backup]["failed"] += 1
+    if backup == "lpois":
+        failures["lpoi_create"].append(failure(
+            "cam_b.create_lpoi", err, args=(row["plate"], row.get("description")), plate=label
+        ))
+    else:
+        failures["event_type_create"].append(failure(
+            "helix_b.create_helix_event_type", err, args=(row["event_schema"], row["name"]), name=label
+        ))
+
+for name, s in stats.items():
+    print(f"  • {name:8} rows {s['rows']:>6} | restored {s['restored']:>6} | already in Org B {s['existing']:>6} | "
+          f"not claimed {s['unclaimed']:>6} | failed {s['failed']:>6}")
+
+# ============================================
+# RESTORE REPORT
+# ============================================
+
+report_path = "../Documentation/restore_report.md"
+report = ReportBuilder("Verkada Restore-from-Backup Report")
+
+with report.section("header") as f:
+    f.write("# Verkada Restore-from-Backup Report\n")
+    f.write("Generated automatically by the Org Migration Utility\n\n")
+    f.write(f"Source: `{args.csv_dir}`\n\n")
+    f.write("---\n\n")
+
+with report.section("summary", data=stats) as f:
+    f.write("## Restore Summary\n\n")
+    f.write("| Backup | Rows | Restored | Already in Org B | Not Claimed in Org B | Failed |\n")
+    f.write("|--------|-----:|---------:|-----------------:|---------------------:|-------:|\n")
+    for name, s in stats.items():
+        f.write(f"| {name} | {s['rows']} | {s['restored']} | {s['existing']} | {s['unclaimed']} | {s['failed']} |\n")
+    f.write("\n_Cameras not yet claimed into Org B can be restored later by rerunning this script "
+            "(or CloudBackup&Audio.py --watch)._\n\n")
+    f.write("---\n\n")
+
+with report.section("failures", data=failures) as f:
+    f.write("## Items Requiring Manual Review\n\n")
+    wrote_any_failure = False
+    for category, items in failures.items():
+        if not items:
+            continue
+        wrote_any_failure = True
+        f.write(f"### {category}\n")
+        for item in items:
+            f.write(f"- {summarize(item)}\n")
+        f.write("\n")
+    if not wrote_any_failure:
+        f.write("No errors detected.\n\n")
+
+report.write(report_path)
+
+failure_log = write_failure_log("Restore", failures)
+
+print(f"\n✔ Restore report saved to: {report_path}")
+print(f"✔ Failure log saved to: {failure_log} (replay with --retry-failures)\n")
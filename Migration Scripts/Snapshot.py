@@ -0,0 +1,44 @@
+# ================================
+# ORG EXPORT SNAPSHOT SCRIPT
+# (Run after any export script)
+# ================================
+
+import argparse
+import json
+
+from utils.snapshot import create_snapshot, restore_snapshot, list_snapshots
+
+parser = argparse.ArgumentParser(description="Archive ../CSVs and ../Documentation into a deduplicated snapshot.")
+parser.add_argument("--label", default="org_a", help="Snapshot name prefix (default: org_a)")
+parser.add_argument("--list", action="store_true", help="List existing snapshots")
+parser.add_argument("--restore", metavar="MANIFEST", help="Restore a snapshot manifest")
+parser.add_argument("--to", default="../Restored", help="Destination folder for --restore (default: ../Restored)")
+args = parser.parse_args()
+
+if args.list:
+    for path in list_snapshots():
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        print(f"{path}  ({manifest['stats']['files']} files, {manifest['created_at']})")
+
+elif args.restore:
+    print("\n==============================")
+    print(" RESTORING SNAPSHOT")
+    print("==============================\n")
+
+    count = restore_snapshot(args.restore, args.to)
+    print(f"Restored {count} files → {args.to}")
+
+else:
+    print("\n==============================")
+    print(" CREATING SNAPSHOT")
+    print("==============================\n")
+
+    manifest_path, stats = create_snapshot(label=args.label)
+
+    reused = stats["chunks"] - stats["chunks_new"]
+    print(f"Files archived:     {stats['files']}")
+    print(f"Chunks:             {stats['chunks']} ({stats['chunks_new']} new, {reused} reused)")
+    print(f"Bytes in:           {stats['bytes_in']}")
+    print(f"Bytes stored (new): {stats['bytes_stored']}")
+    print(f"\nSnapshot manifest saved → {manifest_path}\n")
@@ -0,0 +1,391 @@
+# ================================
+# CROSS-ORG VERIFICATION SCRIPT
+# (Read-only — run after the migration scripts)
+# ================================
+#
+# Bulk-fetches users, access groups, memberships, credentials, LPOIs, Helix
+# event types and camera cloud backup / audio settings from both orgs
+# concurrently, hash-joins them (external_id, name, plate, serial) and writes
+# a mismatch report. The exit status makes sign-off scriptable:
+#
+#     0  PASS        everything from Org A is in Org B unchanged
+#     1  FAIL        something from Org A is missing or different in Org B
+#     2  INCOMPLETE  a list or detail fetch failed, so not everything was
+#                    compared (rerun once the API is reachable)
+
+import os
+import csv
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+from dotenv import load_dotenv
+
+from pykada.access_control import AccessControlClient
+from pykada.cameras import CamerasClient
+from pykada.helix import HelixClient
+
+from utils.report import ReportBuilder
+from utils.pool import run_bounded
+from utils.camera_settings import fetch_camera_settings
+from utils.credentials import credential_keys
+from utils.user_records import UserRecord, AccessProfile
+from utils.transforms import camera_list, normalize_cameras, normalize_email, normalize_plate
+from utils.verify import Verification
+from utils.eventlog import EventLog
+from utils.tokens import shared_token_manager
+
+load_dotenv(override=True)
+
+ENTITIES = ["users", "groups", "credentials", "lpois", "helix", "cameras"]
+
+parser = argparse.ArgumentParser(description="Compare Org A and Org B after migration.")
+parser.add_argument("--only", default=",".join(ENTITIES),
+                    help=f"Comma-separated subset of: {', '.join(ENTITIES)} (default: all)")
+args = parser.parse_args()
+
+only = {e.strip() for e in args.only.split(",") if e.strip()}
+unknown = only - set(ENTITIES)
+if unknown:
+    parser.error(f"unknown entities: {', '.join(sorted(unknown))}")
+
+api_key_a = os.getenv("VERKADA_API_KEY_A")
+api_key_b = os.getenv("VERKADA_API_KEY_B")
+
+access_a = AccessControlClient(token_manager=shared_token_manager(api_key_a))
+access_b = AccessControlClient(token_manager=shared_token_manager(api_key_b))
+cam_a = CamerasClient(token_manager=shared_token_manager(api_key_a))
+cam_b = CamerasClient(token_manager=shared_token_manager(api_key_b))
+helix_a = HelixClient(token_manager=shared_token_manager(api_key_a))
+helix_b = HelixClient(token_manager=shared_token_manager(api_key_b))
+
+log = EventLog("Verify")
+
+Path("../CSVs").mkdir(exist_ok=True)
+Path("../Documentation").mkdir(exist_ok=True)
+
+failures = {
+    "list_calls": [],
+    "details": [],
+    "cloud_backup_get": [],
+    "audio_get": [],
+}
+
+started = time.perf_counter()
+
+# ============================================
+# STEP 1 — LIST CALLS (BOTH ORGS, CONCURRENT)
+# ============================================
+
+print("\n==============================")
+print(" STEP 1: BULK FETCH")
+print("==============================\n")
+
+needs_users = only & {"users", "groups", "credentials"}
+
+list_calls = []
+if needs_users:
+    list_calls += [
+        ("A", "users", lambda: access_a.get_all_access_users()["access_members"]),
+        ("B", "users", lambda: access_b.get_all_access_users()["access_members"]),
+    ]
+if "groups" in only:
+    list_calls += [
+        ("A", "groups", lambda: access_a.get_access_groups()["access_groups"]),
+        ("B", "groups", lambda: access_b.get_access_groups()["access_groups"]),
+    ]
+if "lpois" in only:
+    list_calls += [
+        ("A", "lpois", lambda: list(cam_a.get_all_lpois())),
+        ("B", "lpois", lambda: list(cam_b.get_all_lpois())),
+    ]
+if "helix" in only:
+    list_calls += [
+        ("A", "helix", lambda: helix_a.get_helix_event_types().get("event_types", [])),
+        ("B", "helix", lambda: helix_b.get_helix_event_types().get("event_types", [])),
+    ]
+if "cameras" in only:
+    list_calls += [
+        ("A", "cameras", lambda: normalize_cameras(camera_list(cam_a.get_camera_data()))),
+        ("B", "cameras", lambda: normalize_cameras(camera_list(cam_b.get_camera_data()))),
+    ]
+
+fetched = {"A": {}, "B": {}}
+for (org, name, _), result, err in run_bounded(lambda call: call[2](), list_calls):
+    if err is None:
+        fetched[org][name] = result
+        print(f"  • Org {org} {name}: {len(result)}")
+    else:
+        fetched[org][name] = []
+        failures["list_calls"].append({"org": org, "call": name, "reason": str(err)})
+        print(f"  • Org {org} {name}: FAILED ({err})")
+
+users_a = [UserRecord.from_api(m) for m in fetched["A"].get("users", [])]
+members_b = fetched["B"].get("users", [])
+
+# ============================================
+# STEP 2 — PER-ENTITY DETAILS (CONCURRENT)
+# ============================================
+# One pool for both orgs: access profiles for every user, cloud backup +
+# audio for every camera
+
+print("\n==============================")
+print(" STEP 2: DETAIL FETCH")
+print("==============================\n")
+
+detail_jobs = []
+if only & {"groups", "credentials"}:
+    detail_jobs += [("profile", "A", u.user_id) for u in users_a]
+    detail_jobs += [("profile", "B", m["user_id"]) for m in members_b]
+if "cameras" in only:
+    detail_jobs += [("camera", "A", c["camera_id"]) for c in fetched["A"].get("cameras", []) if c["camera_id"]]
+    detail_jobs += [("camera", "B", c["camera_id"]) for c in fetched["B"].get("cameras", []) if c["camera_id"]]
+
+ACCESS = {"A": access_a, "B": access_b}
+CAMS = {"A": cam_a, "B": cam_b}
+
+
+def fetch_detail(job):
+    kind, org, entity_id = job
+    if kind == "profile":
+        return AccessProfile.from_api(ACCESS[org].get_access_user(user_id=entity_id))
+    return fetch_camera_settings(CAMS[org], entity_id, failures)
+
+
+profiles = {"A": {}, "B": {}}
+camera_settings = {"A": {}, "B": {}}
+
+for (kind, org, entity_id), result, err in log.bounded(
+    "detail_fetch", fetch_detail, detail_jobs, entity=lambda job: f"{job[1]}:{job[0]}:{job[2]}", label="Details"
+):
+    if err is not None:
+        failures["details"].append({"org": org, "kind": kind, "id": entity_id, "reason": str(err)})
+    elif kind == "profile":
+        profiles[org][entity_id] = result
+    else:
+        camera_settings[org][entity_id] = result
+
+# ============================================
+# STEP 3 — HASH JOINS + COMPARISON
+# ============================================
+
+print("\n==============================")
+print(" STEP 3: COMPARE")
+print("==============================\n")
+
+check = Verification(failures)
+
+if needs_users:
+    # AccessControl.py creates Org B users with external_id = Org A user_id
+    user_pairs = check.join(
+        "users", users_a, members_b,
+        key_a=lambda u: u.user_id,
+        key_b=lambda m: m.get("external_id"),
+        label=lambda x: x.full_name if isinstance(x, UserRecord) else x.get("full_name"),
+    )
+
+    for uid, user, member in user_pairs:
+        key = f"{user.full_name} ({uid})"
+
+        if "users" in only:
+            check.diff("users", key, {
+                "full_name": user.full_name,
+                "email": normalize_email(user.email),
+                "company_name": user.company_name,
+                "department": user.department,
+                "employee_title": user.employee_title,
+            }, {
+                "full_name": member.get("full_name"),
+                "email": normalize_email(member.get("email")),
+                "company_name": member.get("company_name"),
+                "department": member.get("department"),
+                "employee_title": member.get("employee_title"),
+            })
+
+        profile_a = profiles["A"].get(uid)
+        profile_b = profiles["B"].get(member["user_id"])
+        if profile_a is None or profile_b is None:
+            continue
+
+        if "groups" in only:
+            check.compared("memberships")
+            check.diff_sets("memberships", key, "access_groups", set(profile_a.groups), set(profile_b.groups))
+
+        if "credentials" in only:
+            check.compared("credentials")
+            check.diff("credentials", key, {
+                "ble_unlock": profile_a.ble_unlock,
+                "remote_unlock": profile_a.remote_unlock,
+                "start_date": profile_a.start_date,
+                "end_date": profile_a.end_date,
+                "entry_code": profile_a.entry_code,
+            }, {
+                "ble_unlock": profile_b.ble_unlock,
+                "remote_unlock": profile_b.remote_unlock,
+                "start_date": profile_b.start_date,
+                "end_date": profile_b.end_date,
+                "entry_code": profile_b.entry_code,
+            })
+
+            creds_a = {}
+            for kind, cred in credential_keys(profile_a):
+                creds_a.setdefault(kind, set()).add(cred.split(":", 1)[1])
+            creds_b = {}
+            for kind, cred in credential_keys(profile_b):
+                creds_b.setdefault(kind, set()).add(cred.split(":", 1)[1])
+            for kind in creds_a.keys() | creds_b.keys():
+                check.diff_sets("credentials", key, kind, creds_a.get(kind, set()), creds_b.get(kind, set()))
+
+if "groups" in only:
+    check.join(
+        "groups", fetched["A"]["groups"], fetched["B"]["groups"],
+        key_a=lambda g: g["name"], label=lambda g: g["name"],
+    )
+
+if "lpois" in only:
+    for plate, lp_a, lp_b in check.join(
+        "lpois", fetched["A"]["lpois"], fetched["B"]["lpois"],
+        key_a=lambda lp: normalize_plate(lp.get("license_plate")),
+        label=lambda lp: lp.get("license_plate"),
+    ):
+        check.diff("lpois", plate, {"description": lp_a.get("description")},
+                   {"description": lp_b.get("description")})
+
+if "helix" in only:
+    for name, et_a, et_b in check.join(
+        "helix", fetched["A"]["helix"], fetched["B"]["helix"],
+        key_a=lambda et: et.get("name"), label=lambda et: et.get("name"),
+    ):
+        check.diff("helix", name,
+                   {"event_schema": json.dumps(et_a.get("event_schema"), sort_keys=True)},
+                   {"event_schema": json.dumps(et_b.get("event_schema"), sort_keys=True)})
+
+CLOUD_FIELDS = ["days_to_preserve", "enabled", "time_to_preserve",
+                "upload_timeslot", "video_quality", "video_to_upload"]
+
+if "cameras" in only:
+    # Unclaimed cameras show up as missing in Org B
+    for serial, cam_a_row, cam_b_row in check.join(
+        "cameras", fetched["A"]["cameras"], fetched["B"]["cameras"],
+        key_a=lambda c: c["serial"], label=lambda c: c["serial"],
+    ):
+        settings_a = camera_settings["A"].get(cam_a_row["camera_id"])
+        settings_b = camera_settings["B"].get(cam_b_row["camera_id"])
+        if settings_a is None or settings_b is None:
+            continue
+
+        (cloud_a, audio_a), (cloud_b, audio_b) = settings_a, settings_b
+        if not (cloud_a or audio_a) or not (cloud_b or audio_b):
+            # fetch failed on one side; already in failures
+            continue
+
+        check.diff("cameras", serial,
+                   {**{f"cloud_{k}": cloud_a.get(k) for k in CLOUD_FIELDS}, "audio_enabled": audio_a.get("enabled")},
+                   {**{f"cloud_{k}": cloud_b.get(k) for k in CLOUD_FIELDS}, "audio_enabled": audio_b.get("enabled")})
+
+elapsed = time.perf_counter() - started
+
+for entity, c in check.summary.items():
+    print(f"  • {entity:12} matched {c['matched']:>7} | missing in B {c['missing_in_b']:>6} | "
+          f"extra in B {c['extra_in_b']:>6} | field mismatches {c['field_mismatches']:>6}")
+print(f"\nVerified in {elapsed:.1f}s — {check.status}")
+if check.fetch_failures:
+    print(f"{check.fetch_failures} fetches failed; those entities were not compared (see report)")
+
+# ============================================
+# MISMATCH CSV + REPORT
+# ============================================
+
+MISMATCH_CSV = "../CSVs/verification_mismatches.csv"
+
+with open(MISMATCH_CSV, "w", newline="") as f:
+    writer = csv.DictWriter(f, fieldnames=["entity", "key", "field", "org_a", "org_b"])
+    writer.writeheader()
+    writer.writerows(check.mismatches)
+    for entity, keys in check.missing.items():
+        writer.writerows({"entity": entity, "key": k, "field": "(missing in Org B)"} for k in keys)
+
+# The Markdown report lists this many rows per section; the CSV has them all
+REPORT_LIMIT = 100
+
+RESULT_LABELS = {
+    "PASS": "PASS ✅",
+    "FAIL": "MISMATCHES FOUND ❌",
+    "INCOMPLETE": "INCOMPLETE ⚠️ (some fetches failed, see Items Requiring Manual Review)",
+}
+# PASS → 0, mismatches → 1, fetch failures → 2
+EXIT_CODES = {"PASS": 0, "FAIL": 1, "INCOMPLETE": 2}
+
+report_path = "../Documentation/verification_report.md"
+report = ReportBuilder("Verkada Cross-Org Verification Report")
+
+with report.section("header") as f:
+    f.write("# Verkada Cross-Org Verification Report\n")
+    f.write("Generated automatically by the Org Migration Utility\n\n")
+    f.write(f"**Result:** {RESULT_LABELS[check.status]} "
+            f"(verified in {elapsed:.1f}s)\n\n")
+    f.write("---\n\n")
+
+with report.section("summary", data=check.summary) as f:
+    f.write("## Summary\n\n")
+    f.write("| Entity | Matched | Missing in Org B | Extra in Org B | Field Mismatches |\n")
+    f.write("|--------|--------:|-----------------:|---------------:|-----------------:|\n")
+    for entity, c in check.summary.items():
+        f.write(f"| {entity} | {c['matched']} | {c['missing_in_b']} | {c['extra_in_b']} | {c['field_mismatches']} |\n")
+    f.write("\n_Extra in Org B is informational (objects that existed in Org B before the migration)._\n\n")
+    f.write("---\n\n")
+
+with report.section("mismatches", data=check.mismatches) as f:
+    f.write("## Field Mismatches\n\n")
+    if not check.mismatches:
+        f.write("No field mismatches.\n\n")
+    else:
+        f.write("For set-valued fields, Org A lists what Org B is missing and Org B lists what it has extra.\n\n")
+        f.write("| Entity | Key | Field | Org A | Org B |\n")
+        f.write("|--------|-----|-------|-------|-------|\n")
+        for m in check.mismatches[:REPORT_LIMIT]:
+            f.write(f"| {m['entity']} | {m['key']} | {m['field']} | {m['org_a']} | {m['org_b']} |\n")
+        if len(check.mismatches) > REPORT_LIMIT:
+            f.write(f"\n_{len(check.mismatches) - REPORT_LIMIT} more in {MISMATCH_CSV}._\n")
+        f.write("\n")
+    f.write("---\n\n")
+
+with report.section("missing", data=check.missing) as f:
+    f.write("## Missing in Org B\n\n")
+    wrote_any = False
+    for entity, keys in check.missing.items():
+        if not keys:
+            continue
+        wrote_any = True
+        f.write(f"### {entity} ({len(keys)})\n")
+        for k in keys[:REPORT_LIMIT]:
+            f.write(f"- {k}\n")
+        if len(keys) > REPORT_LIMIT:
+            f.write(f"- _{len(keys) - REPORT_LIMIT} more in {MISMATCH_CSV}_\n")
+        f.write("\n")
+    if not wrote_any:
+        f.write("Nothing from Org A is missing in Org B.\n\n")
+    f.write("---\n\n")
+
+with report.section("failures", data=failures) as f:
+    f.write("## Items Requiring Manual Review\n\n")
+    f.write("Entities below could not be fetched and were not compared.\n\n")
+    wrote_any_failure = False
+    for category, items in failures.items():
+        if not items:
+            continue
+        wrote_any_failure = True
+        f.write(f"### {category}\n")
+        for item in items:
+            f.write(f"- {item}\n")
+        f.write("\n")
+    if not wrote_any_failure:
+        f.write("No errors detected.\n\n")
+
+report.write(report_path)
+
+print(f"\n✔ Verification report saved to: {report_path}")
+print(f"✔ Mismatch CSV saved to: {MISMATCH_CSV}\n")
+
+sys.exit(EXIT_CODES[check.status])
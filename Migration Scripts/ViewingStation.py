@@ -7,18 +7,24 @@ from dotenv import load_dotenv
 import os
 import csv
 
-from pykada.api_tokens import VerkadaTokenManager
 from pykada.verkada_requests import VerkadaRequestManager
 
+from utils.columnar import write_columnar
+from utils.failures import write_failure_log
+from utils.eventlog import EventLog
+from utils.tokens import shared_token_manager
+
 load_dotenv(override=True)
 
 api_key_a = os.getenv("VERKADA_API_KEY_A")
 
+log = EventLog("ViewingStation")
+
 # ----------------------------------
 # TOKEN + REQUEST MANAGER
 # ----------------------------------
 
-token_manager = VerkadaTokenManager(api_key=api_key_a)
+token_manager = shared_token_manager(api_key_a)
 request_manager = VerkadaRequestManager(token_manager=token_manager)
 
 VIEWING_STATION_URL = "https://api.verkada.com/viewing_station/v1/devices"
@@ -41,7 +47,8 @@ print("==============================\n")
 # ----------------------------------
 
 try:
-    resp = request_manager.get(url=VIEWING_STATION_URL)
+    with log.timed("viewing_station_list"):
+        resp = request_manager.get(url=VIEWING_STATION_URL)
     devices_a = resp.get("devices", [])
 
 except Exception as e:
@@ -49,8 +56,12 @@ except Exception as e:
     failures["device_fetch"].append(str(e))
     devices_a = []
 
-print(devices_a)
-print(f"\nFound {len(devices_a)} Viewing Stations in Org A.\n")
+# One event per device instead of dumping the whole list to the console
+for d in devices_a:
+    log.event("viewing_station", d.get("device_id"), name=d.get("name"),
+              serial=d.get("claimed_serial_number"), last_status=d.get("last_status"))
+
+print(f"Found {len(devices_a)} Viewing Stations in Org A (details in {log.path}).\n")
 
 # ----------------------------------
 # 2. WRITE CSV (to ../CSVs/)
@@ -89,6 +100,21 @@ try:
                 d.get("app_version", "")
             ])
 
+    write_columnar(vx_csv, [
+        {
+            "device_id": d.get("device_id", ""),
+            "name": d.get("name", ""),
+            "claimed_serial_number": d.get("claimed_serial_number", ""),
+            "ip_address": d.get("ip_address", ""),
+            "last_status": d.get("last_status", ""),
+            "last_seen_at": d.get("last_seen_at", ""),
+            "site_id": d.get("site_id", ""),
+            "timezone": d.get("timezone", ""),
+            "app_version": d.get("app_version", ""),
+        }
+        for d in devices_a
+    ])
+
 except Exception as e:
     failures["csv"].append(("viewing_stations_backup", str(e)))
     print("Failed to write viewing_stations_backup.csv:", e)
@@ -104,3 +130,6 @@ print("==============================\n")
 
 print(f"Viewing Stations exported: {len(devices_a)} (saved to {vx_csv})")
 print("\nViewing Station Export Completed.\n")
+
+failure_log = write_failure_log("ViewingStation", failures)
+print(f"Failure log saved to: {failure_log}\n")
@@ -0,0 +1,63 @@
+# ================================
+# MIGRATION QUEUE WORKER
+# (Start on any host that can reach JOB_QUEUE, alongside
+#  AccessControl.py / Cameras.py / CloudBackup&Audio.py)
+# ================================
+#
+# Claims per-entity jobs (users, user attributes, camera settings, camera
+# restores) from the shared SQLite queue with a lease, runs them with this
+# host's own API clients and connection pool, and stores the results on the
+# queue. The script that queued the jobs merges them and writes the CSVs.
+
+import os
+import time
+import argparse
+from dotenv import load_dotenv
+
+from utils.jobqueue import JobQueue, LEASE_SECONDS, default_worker_id
+from utils.jobs import work
+
+load_dotenv(override=True)
+
+parser = argparse.ArgumentParser(description="Work migration jobs from a shared queue.")
+parser.add_argument("--queue", default=os.getenv("JOB_QUEUE"),
+                    help="Path to the SQLite job queue (default: JOB_QUEUE)")
+parser.add_argument("--worker-id", default=default_worker_id(),
+                    help="Name recorded on leased jobs (default: <hostname>-<pid>)")
+parser.add_argument("--lease", type=int, default=LEASE_SECONDS,
+                    help=f"Seconds a claimed job stays leased before others may take it (default: {LEASE_SECONDS})")
+parser.add_argument("--poll", type=float, default=2.0,
+                    help="Seconds to wait between polls when the queue is empty (default: 2)")
+parser.add_argument("--idle-exit", type=float, default=0,
+                    help="Exit after this many idle seconds (default: 0, run until stopped)")
+args = parser.parse_args()
+
+if not args.queue:
+    parser.error("no queue given — pass --queue or set JOB_QUEUE")
+
+queue = JobQueue(args.queue)
+
+print(f"Worker {args.worker_id} polling {args.queue} (lease {args.lease}s)")
+
+handled_total = 0
+idle_since = time.monotonic()
+
+try:
+    while True:
+        handled = work(queue, args.worker_id, lease_seconds=args.lease)
+        if handled:
+            handled_total += handled
+            idle_since = time.monotonic()
+            print(f"  • handled {handled} jobs ({handled_total} total)")
+            continue
+
+        if args.idle_exit and time.monotonic() - idle_since >= args.idle_exit:
+            break
+        time.sleep(args.poll)
+except KeyboardInterrupt:
+    # Any job this worker still holds is re-claimed by another worker once its lease expires
+    pass
+finally:
+    queue.close()
+
+print(f"\n✔ Worker {args.worker_id} stopped after {handled_total} jobs\n")
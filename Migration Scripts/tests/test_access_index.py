@@ -0,0 +1,26 @@
+from utils.access_index import AccessIndex, UNKNOWN_DOOR
+
+
+DOORS = [
+    {"door_id": "d1", "name": "Front", "site": {"site_id": "s1", "name": "HQ"}, "acu_id": "c1", "acu_name": "ACU 1"},
+    {"door_id": "", "name": "Side"},
+    {"name": "Back", "site": None},
+]
+
+LEVELS = [
+    {"access_level_id": "l1", "name": "Staff", "doors": ["d1"], "sites": "s1"},
+    {"access_level_id": "l2", "name": None, "doors": ["d1", "d9"]},
+]
+
+
+def test_doors_without_an_id_are_all_kept():
+    index = AccessIndex(DOORS, [], [])
+    assert sorted(d["door_name"] for d in index.doors.values()) == ["Back", "Front", "Side"]
+    assert index.site_to_doors == {"s1": ["d1"]}
+
+
+def test_levels_for_door_tolerates_unnamed_levels():
+    index = AccessIndex(DOORS, LEVELS, [])
+    assert ";".join(index.levels_for_door("d1")) == "Staff;"
+    assert index.levels[1]["door_names"] == ["Front", UNKNOWN_DOOR]
+    assert index.levels[0]["site_names"] == ["HQ"]
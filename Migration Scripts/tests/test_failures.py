@@ -0,0 +1,91 @@
+import json
+
+import pytest
+
+import utils.failures as failures_mod
+import utils.retry as retry_mod
+from utils.failures import failure, write_failure_log, replay_failures
+
+
+class Timeout(Exception):
+    """Transient: a 503 whose write may or may not have landed."""
+    def __str__(self):
+        return "HTTP 503 Service Unavailable"
+
+
+class FakeHelix:
+    def __init__(self, lands_on_timeout=False):
+        self.event_types = []
+        self.creates = 0
+        self.lands_on_timeout = lands_on_timeout
+
+    def get_helix_event_types(self):
+        return {"event_types": list(self.event_types)}
+
+    def create_helix_event_type(self, schema, name):
+        self.creates += 1
+        self.event_types.append({"name": name, "event_type_uid": f"uid{self.creates}"})
+        if self.lands_on_timeout:
+            raise Timeout()
+        return self.event_types[-1]
+
+
+class FakeAccess:
+    def __init__(self, log):
+        self.log = log
+        self.groups = []
+
+    def get_access_groups(self):
+        return {"access_groups": list(self.groups)}
+
+    def create_access_group(self, name):
+        self.log.append(("create_access_group", name))
+        self.groups.append({"name": name, "group_id": "g1"})
+        return self.groups[-1]
+
+    def add_user_to_access_group(self, external_id, group_id):
+        self.log.append(("add_user_to_access_group", external_id))
+
+
+@pytest.fixture(autouse=True)
+def tmp_failures_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(failures_mod, "FAILURES_DIR", str(tmp_path))
+    monkeypatch.setattr(retry_mod.time, "sleep", lambda s: None)
+
+
+def test_replayed_create_that_lands_on_timeout_is_not_sent_twice():
+    helix_b = FakeHelix(lands_on_timeout=True)
+    write_failure_log("Helix", {"event_type_create": [
+        failure("helix_b.create_helix_event_type", Timeout(), args=({"x": 1}, "Door Alarm"), name="Door Alarm")
+    ]})
+
+    fixed, still_failing = replay_failures("Helix", {"helix_b": helix_b})
+
+    assert (fixed, still_failing, helix_b.creates) == (1, [], 1)
+
+
+def test_create_already_in_org_b_is_not_resent():
+    helix_b = FakeHelix()
+    helix_b.event_types.append({"name": "Door Alarm", "event_type_uid": "uid0"})
+    write_failure_log("Helix", {"event_type_create": [
+        failure("helix_b.create_helix_event_type", Timeout(), args=({"x": 1}, "Door Alarm"), name="Door Alarm")
+    ]})
+
+    assert replay_failures("Helix", {"helix_b": helix_b})[0] == 1
+    assert helix_b.creates == 0
+
+
+def test_group_creates_replay_before_assignments():
+    log = []
+    # Logged in the "wrong" order: the assignment comes first in the file
+    write_failure_log("AccessControl", {
+        "group_assign": [failure("access_b.add_user_to_access_group", Timeout(),
+                                 kwargs={"external_id": "u1", "group_id": "g1"})],
+        "group_create": [failure("access_b.create_access_group", Timeout(), kwargs={"name": "Staff"})],
+    })
+
+    replay_failures("AccessControl", {"access_b": FakeAccess(log)})
+
+    assert log == [("create_access_group", "Staff"), ("add_user_to_access_group", "u1")]
+    with open(failures_mod.failure_log_path("AccessControl")) as f:
+        assert [json.loads(line) for line in f] == []
@@ -0,0 +1,30 @@
+from utils.jobqueue import JobQueue
+
+
+def queue_with_one_job(tmp_path):
+    queue = JobQueue(str(tmp_path / "queue.db"))
+    queue.enqueue("b1", "access_user", [{"user_id": "u1"}], meta={"stat_keys": []})
+    return queue
+
+
+def test_claim_reports_the_attempt_number(tmp_path):
+    queue = queue_with_one_job(tmp_path)
+    job_id, kind, payload, meta, attempt = queue.claim("w1")
+    assert (kind, payload, meta, attempt) == ("access_user", {"user_id": "u1"}, {"stat_keys": []}, 1)
+
+    queue.fail(job_id, "w1", "boom")
+    assert queue.claim("w1")[4] == 2
+
+
+def test_job_that_keeps_killing_its_worker_is_failed_after_max_attempts(tmp_path):
+    queue = queue_with_one_job(tmp_path)
+
+    # lease_seconds=-1: every lease is already expired, as if the worker died
+    for attempt in (1, 2, 3):
+        assert queue.claim(f"w{attempt}", lease_seconds=-1)[4] == attempt
+
+    assert queue.claim("w4", lease_seconds=-1) is None
+    assert queue.counts("b1") == {"failed": 1}
+    assert queue.is_finished("b1")
+    [(_, result, error)] = queue.results("b1")
+    assert result is None and "lease expired" in error
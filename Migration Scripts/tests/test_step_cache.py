@@ -0,0 +1,51 @@
+from utils.failures import failure
+from utils.step_cache import StepCache, prune_cached_failures
+
+
+def run_step(cache_dir, added_failures):
+    stats = {"cards_success": 0}
+    failures = {"card_add": [], "user_index": []}
+    cache = StepCache("AccessControl", stats, failures, cache_dir=cache_dir)
+    cache.begin("attributes")
+    stats["cards_success"] += 1
+    for category, item in added_failures:
+        failures[category].append(item)
+    cache.save("attributes", credential_conflicts=[])
+    return cache
+
+
+def restored_failures(cache_dir):
+    failures = {"card_add": [], "user_index": []}
+    StepCache("AccessControl", {}, failures, cache_dir=cache_dir).restore("attributes")
+    return failures
+
+
+def test_skipped_step_restores_stats_and_failures(tmp_path):
+    card = failure("access_b.add_card", RuntimeError("HTTP 503"), args=("u1", "123"), user="u1")
+    run_step(tmp_path, [("card_add", card)])
+
+    stats = {"cards_success": 2}
+    failures = {"card_add": []}
+    outputs = StepCache("AccessControl", stats, failures, cache_dir=tmp_path).restore("attributes")
+
+    assert outputs == {"credential_conflicts": []}
+    assert stats == {"cards_success": 3}
+    assert failures["card_add"] == [card]
+
+
+def test_prune_drops_only_failures_the_replay_fixed(tmp_path):
+    fixed = failure("access_b.add_card", RuntimeError("HTTP 503"), args=("u1", "123"), user="u1")
+    still = failure("access_b.add_card", RuntimeError("HTTP 503"), args=("u2", "456"), user="u2")
+    run_step(tmp_path, [("card_add", fixed), ("card_add", still), ("user_index", "u3: no external_id")])
+
+    # What replay_failures() leaves in the log: the still-failing write (with
+    # its new error) and the non-replayable entry
+    still_failing = [
+        {"category": "card_add", **still, "reason": "HTTP 500"},
+        {"category": "user_index", "item": "u3: no external_id"},
+    ]
+    assert prune_cached_failures("AccessControl", still_failing, cache_dir=tmp_path) == 1
+
+    failures = restored_failures(tmp_path)
+    assert failures["card_add"] == [still]
+    assert failures["user_index"] == ["u3: no external_id"]
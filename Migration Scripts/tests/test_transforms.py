@@ -0,0 +1,54 @@
+import pytest
+
+from utils.transforms import (
+    split_name, clean_email, normalize_email, normalize_plate,
+    normalize_users, normalize_cameras, camera_list, lpoi_plates, find_lpoi,
+    NAME_CORPUS, EMAIL_CORPUS, PLATE_CORPUS, CAMERA_CORPUS,
+)
+from utils.user_records import UserRecord
+
+
+@pytest.mark.parametrize("raw, expected", NAME_CORPUS)
+def test_split_name(raw, expected):
+    assert split_name(raw) == expected
+
+
+def test_split_name_keeps_middle_names_in_last_name():
+    # Regression: the old inline split kept only the second word ("Ann")
+    assert split_name("Mary Ann Smith") == ("Mary", "Ann Smith")
+
+
+@pytest.mark.parametrize("raw, clean, key", EMAIL_CORPUS)
+def test_emails(raw, clean, key):
+    assert clean_email(raw) == clean
+    assert normalize_email(raw) == key
+
+
+@pytest.mark.parametrize("raw, expected", PLATE_CORPUS)
+def test_normalize_plate(raw, expected):
+    assert normalize_plate(raw) == expected
+
+
+def test_normalize_users_fills_names_and_trims_email():
+    users = normalize_users([UserRecord("u1", "Mary Ann Smith", " Mary@Example.com ")])
+    assert (users[0].first_name, users[0].last_name, users[0].email) == ("Mary", "Ann Smith", "Mary@Example.com")
+
+
+@pytest.mark.parametrize("resp, expected", CAMERA_CORPUS)
+def test_normalize_cameras(resp, expected):
+    cams = normalize_cameras(camera_list(resp))
+    assert [(c["camera_id"], c["serial"]) for c in cams] == expected
+
+
+class PagedLpois:
+    """get_all_lpois() walks pages; the match is on the last one."""
+    def get_all_lpois(self):
+        yield from ({"license_plate": f"P{i}"} for i in range(1500))
+        yield {"license_plate": "ab-123", "description": "late page"}
+
+
+def test_lpoi_lookups_cover_every_page():
+    cam = PagedLpois()
+    assert "AB123" in lpoi_plates(cam)
+    assert find_lpoi(cam, "AB 123")["description"] == "late page"
+    assert find_lpoi(cam, "ZZ9") is None
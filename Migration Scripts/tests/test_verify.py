@@ -0,0 +1,32 @@
+from utils.verify import Verification, hash_join
+
+
+def key(item):
+    return item["id"]
+
+
+def test_hash_join_splits_matched_and_one_sided():
+    pairs, only_a, only_b = hash_join([{"id": 1}, {"id": 2}, {"id": None}], [{"id": 2}, {"id": 3}], key)
+    assert [k for k, _, _ in pairs] == [2]
+    assert only_a == [{"id": 1}, {"id": None}]
+    assert only_b == [{"id": 3}]
+
+
+def test_matching_orgs_pass():
+    check = Verification({"list_calls": []})
+    check.join("users", [{"id": 1}], [{"id": 1}, {"id": 2}], key)
+    assert check.clean and check.status == "PASS"
+
+
+def test_missing_in_b_fails():
+    check = Verification()
+    check.join("users", [{"id": 1}], [], key)
+    assert not check.clean and check.status == "FAIL"
+
+
+def test_failed_fetch_is_incomplete_not_pass():
+    # A failed list call leaves both sides empty, which alone would compare clean
+    failures = {"list_calls": [{"org": "A", "call": "users", "reason": "HTTP 503"}]}
+    check = Verification(failures)
+    check.join("users", [], [], key)
+    assert not check.clean and check.status == "INCOMPLETE"
@@ -0,0 +1,4 @@
+# ================================
+# SHARED MIGRATION HELPERS
+# (Imported by the product scripts in "Migration Scripts")
+# ================================
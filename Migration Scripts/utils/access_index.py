@@ -0,0 +1,125 @@
+# ================================
+# ACCESS TOPOLOGY INDEX
+# ================================
+#
+# Normalizes doors, sites, controllers, access levels and door exception
+# calendars from Org A once, with reverse maps (door → levels, site → doors,
+# door → calendars, ...). CSV exports and report sections all read from the
+# same index instead of re-normalizing every level per consumer.
+
+UNKNOWN_DOOR = "(Unknown Door)"
+UNKNOWN_SITE = "(Unknown Site)"
+
+
+def as_list(value):
+    """API fields like doors/sites come back as a list, a single string, or nothing."""
+    if not value:
+        return []
+    if isinstance(value, str):
+        return [value]
+    return list(value)
+
+
+class AccessIndex:
+    def __init__(self, doors_a, levels_a, calendars_a):
+        # ----------------------------------
+        # DOORS, SITES, CONTROLLERS
+        # ----------------------------------
+        self.doors = {}         # door_id (or a positional key, see below) → normalized door record
+        self.sites = {}         # site_id → site name
+        self.controllers = {}   # controller_id → controller name
+
+        self.site_to_doors = {}
+        self.controller_to_doors = {}
+
+        for position, d in enumerate(doors_a):
+            site = d.get("site", {}) or {}
+            door = {
+                "door_id": d.get("door_id") or "",
+                "door_name": d.get("name") or "",
+                "site_id": site.get("site_id") or "",
+                "site_name": site.get("name") or "",
+                "controller_id": d.get("acu_id") or "",
+                "controller_name": d.get("acu_name") or "",
+            }
+            # Doors without an id are kept under their position so they still
+            # reach the export and report (no level can reference them)
+            key = door["door_id"] or f"(no door_id #{position})"
+            self.doors[key] = door
+
+            if door["site_id"]:
+                self.sites[door["site_id"]] = door["site_name"]
+                self.site_to_doors.setdefault(door["site_id"], []).append(key)
+
+            if door["controller_id"]:
+                self.controllers[door["controller_id"]] = door["controller_name"]
+                self.controller_to_doors.setdefault(door["controller_id"], []).append(key)
+
+        # ----------------------------------
+        # ACCESS LEVELS
+        # ----------------------------------
+        self.levels = []
+        self.door_to_levels = {}
+        self.site_to_levels = {}
+
+        for lvl in levels_a:
+            door_ids = as_list(lvl.get("doors"))
+            site_ids = as_list(lvl.get("sites"))
+
+            level = {
+                "access_level_id": lvl.get("access_level_id"),
+                "name": lvl.get("name"),
+                "door_ids": door_ids,
+                "door_names": [self.door_name(d) for d in door_ids],
+                "site_ids": site_ids,
+                "site_names": [self.site_name(s) for s in site_ids],
+                "schedule": lvl.get("access_schedule_events", []) or [],
+            }
+            self.levels.append(level)
+
+            for d in door_ids:
+                self.door_to_levels.setdefault(d, []).append(level["access_level_id"])
+            for s in site_ids:
+                self.site_to_levels.setdefault(s, []).append(level["access_level_id"])
+
+        self.level_names = {lvl["access_level_id"]: lvl["name"] for lvl in self.levels}
+
+        # ----------------------------------
+        # DOOR EXCEPTION CALENDARS
+        # ----------------------------------
+        self.calendars = []
+        self.door_to_calendars = {}
+
+        for cal in calendars_a:
+            door_ids = as_list(cal.get("doors"))
+            exceptions = cal.get("exceptions", []) or []
+
+            calendar = {
+                "calendar_id": cal.get("door_exception_calendar_id"),
+                "name": cal.get("name"),
+                "door_ids": door_ids,
+                "door_names": [self.door_name(d) for d in door_ids],
+                "exceptions": exceptions,
+                "exceptions_readable": [
+                    f"{ex.get('date')} {ex.get('door_status')} {ex.get('start_time')}-{ex.get('end_time')}"
+                    for ex in exceptions
+                ],
+            }
+            self.calendars.append(calendar)
+
+            for d in door_ids:
+                self.door_to_calendars.setdefault(d, []).append(calendar["calendar_id"])
+
+    # ----------------------------------
+    # LOOKUPS
+    # ----------------------------------
+    def door_name(self, door_id):
+        door = self.doors.get(door_id)
+        return door["door_name"] if door else UNKNOWN_DOOR
+
+    def site_name(self, site_id):
+        return self.sites.get(site_id, UNKNOWN_SITE)
+
+    def levels_for_door(self, door_id):
+        """Names of the levels that include door_id, as text (unnamed levels are "")."""
+        return [str(self.level_names[lid] or "") for lid in self.door_to_levels.get(door_id, [])]
@@ -0,0 +1,343 @@
+# ================================
+# ACCESS USER MIGRATION (PER USER)
+# ================================
+#
+# STEP 1 (create user) and STEP 3 (access attributes) of AccessControl.py for a
+# single user. Kept in a module so the same code runs in-process or inside a
+# shard worker process (see utils/sharding.py):
+#
+#     python -m utils.access_users <shard_input.json> <shard_output.json>
+#
+# clients is a dict with "core_a", "core_b", "access_a" and "access_b".
+# Users are utils/user_records.py records, not raw API dicts.
+
+import os
+import sys
+import json
+
+from utils.retry import retry_call
+from utils.failures import failure
+from utils.credentials import card_key, mfa_key, plate_key, credential_keys
+from utils.user_records import UserRecord, AccessProfile, Plate
+from utils.transforms import split_name
+
+
+# ----------------------------------
+# ORG B LOOKUPS (RETRY VERIFICATION)
+# ----------------------------------
+def _user_in_org_b(clients, uid):
+    return clients["core_b"].get_user(external_id=uid)
+
+
+def _org_b_access_user(clients, uid):
+    """Org B's access record for the user migrated with external_id uid."""
+    user_id_b = clients["core_b"].get_user(external_id=uid)["user_id"]
+    return clients["access_b"].get_access_user(user_id=user_id_b)
+
+
+def credentials_in_org_b(clients, uid):
+    """Credential keys (utils/credentials.py) the Org B user already holds."""
+    profile = AccessProfile.from_api(_org_b_access_user(clients, uid))
+    return {key for _, key in credential_keys(profile)}
+
+
+def _card_on_user(clients, uid, number_kwargs):
+    full = _org_b_access_user(clients, uid)
+    field, value = next(iter(number_kwargs.items()))
+    return next((c for c in full.get("cards", []) if c.get(field) == value), None)
+
+
+def _mfa_on_user(clients, uid, code):
+    full = _org_b_access_user(clients, uid)
+    return next((m for m in full.get("mfa_codes", []) if m.get("code") == code), None)
+
+
+def _plate_on_user(clients, uid, plate_number):
+    full = _org_b_access_user(clients, uid)
+    key = plate_key(Plate(plate_number, None, False))
+    return next(
+        (lp for lp in full.get("license_plates", [])
+         if plate_key(Plate(lp.get("license_plate_number"), None, False)) == key),
+        None
+    )
+
+
+# ----------------------------------
+# STEP 1 — CREATE USER IN ORG B
+# ----------------------------------
+def migrate_user(user, clients, stats, failures):
+    uid = user.user_id
+    full_name = user.full_name
+    email = user.email
+
+    core_user = clients["core_a"].get_user(uid)
+
+    if user.first_name is None:
+        user.first_name, user.last_name = split_name(full_name)
+    first, last = user.first_name, user.last_name
+
+    create_kwargs = dict(
+        external_id=uid,
+        company_name=user.company_name,
+        department=user.department,
+        department_id=user.department_id,
+        email=email,
+        employee_title=user.employee_title,
+        first_name=first,
+        last_name=last,
+        phone=core_user.get("phone")
+    )
+
+    try:
+        retry_call(
+            clients["core_b"].create_user,
+            idempotent=False,
+            verify=lambda: _user_in_org_b(clients, uid),
+            **create_kwargs
+        )
+        stats["users_created"] += 1
+    except Exception as e:
+        failures["user_create"].append(failure(
+            "core_b.create_user", e, kwargs=create_kwargs,
+            user_id=uid, name=full_name, email=email
+        ))
+
+
+# ----------------------------------
+# STEP 3 — USER ACCESS ATTRIBUTES
+# ----------------------------------
+def migrate_user_attributes(uid, full_name, group_name_to_b_id, clients, stats, failures,
+                            skip_credentials=(), profile=None):
+    """skip_credentials: credential keys (utils/credentials.py) not to send;
+    profile: the Org A user's AccessProfile if it was already fetched."""
+    if profile is None:
+        profile = AccessProfile.from_api(clients["access_a"].get_access_user(user_id=uid))
+
+    # Credentials sent for this user so far; a repeated card/code/plate is skipped
+    sent = set()
+
+    def skipped(key):
+        if key and (key in skip_credentials or key in sent):
+            stats["credentials_skipped"] += 1
+            return True
+        sent.add(key)
+        return False
+
+    # BLE
+    if profile.ble_unlock:
+        stats["ble_attempted"] += 1
+        try:
+            retry_call(clients["access_b"].activate_ble_for_access_user, external_id=uid)
+            stats["ble_success"] += 1
+        except Exception as e:
+            failures["ble_toggle"].append(failure(
+                "access_b.activate_ble_for_access_user", e, kwargs={"external_id": uid}, user=full_name
+            ))
+
+    # Remote Unlock
+    if profile.remote_unlock:
+        stats["remote_attempted"] += 1
+        try:
+            retry_call(clients["access_b"].activate_remote_unlock_for_user, external_id=uid)
+            stats["remote_success"] += 1
+        except Exception as e:
+            failures["remote_toggle"].append(failure(
+                "access_b.activate_remote_unlock_for_user", e, kwargs={"external_id": uid}, user=full_name
+            ))
+
+    # Start/End Dates
+    if profile.start_date:
+        stats["start_attempted"] += 1
+        try:
+            retry_call(
+                clients["access_b"].set_start_date_for_user,
+                external_id=uid,
+                start_date=profile.start_date
+            )
+            stats["start_success"] += 1
+        except Exception as e:
+            failures["start_date"].append(failure(
+                "access_b.set_start_date_for_user", e,
+                kwargs={"external_id": uid, "start_date": profile.start_date}, user=full_name
+            ))
+
+    if profile.end_date:
+        stats["end_attempted"] += 1
+        try:
+            retry_call(
+                clients["access_b"].set_end_date_for_user,
+                external_id=uid,
+                end_date=profile.end_date
+            )
+            stats["end_success"] += 1
+        except Exception as e:
+            failures["end_date"].append(failure(
+                "access_b.set_end_date_for_user", e,
+                kwargs={"external_id": uid, "end_date": profile.end_date}, user=full_name
+            ))
+
+    # Entry Code
+    if profile.entry_code:
+        stats["entry_attempted"] += 1
+        try:
+            retry_call(
+                clients["access_b"].set_entry_code_for_user,
+                external_id=uid,
+                entry_code=profile.entry_code
+            )
+            stats["entry_success"] += 1
+        except Exception as e:
+            failures["entry_code"].append(failure(
+                "access_b.set_entry_code_for_user", e,
+                kwargs={"external_id": uid, "entry_code": profile.entry_code}, user=full_name
+            ))
+
+    # Group Assignments
+    for gname in profile.groups:
+        stats["group_assign_attempted"] += 1
+
+        gid_b = group_name_to_b_id.get(gname)
+
+        if not gid_b:
+            failures["group_assign"].append({"user": full_name, "group": gname, "reason": "Missing in Org B"})
+            continue
+
+        try:
+            retry_call(clients["access_b"].add_user_to_access_group, external_id=uid, group_id=gid_b)
+            stats["group_assign_success"] += 1
+        except Exception as e:
+            failures["group_assign"].append(failure(
+                "access_b.add_user_to_access_group", e,
+                kwargs={"external_id": uid, "group_id": gid_b}, user=full_name, group=gname
+            ))
+
+    # Keycards
+    for card in profile.cards:
+        if skipped(card_key(card)):
+            continue
+        stats["cards_attempted"] += 1
+        card_summary = f"{card.type} — {card.card_number or card.card_number_hex or card.card_number_base36}"
+
+        kwargs = {}
+        if card.card_number:
+            kwargs["card_number"] = card.card_number
+        elif card.card_number_hex:
+            kwargs["card_number_hex"] = card.card_number_hex
+        elif card.card_number_base36:
+            kwargs["card_number_base36"] = card.card_number_base36
+
+        card_kwargs = dict(
+            external_id=uid,
+            active=card.active,
+            facility_code=card.facility_code,
+            card_type=card.type,
+            **kwargs
+        )
+
+        try:
+            retry_call(
+                clients["access_b"].add_card_to_user,
+                idempotent=False,
+                verify=lambda: _card_on_user(clients, uid, kwargs) if kwargs else None,
+                **card_kwargs
+            )
+            stats["cards_success"] += 1
+        except Exception as e:
+            failures["card_add"].append(failure(
+                "access_b.add_card_to_user", e, kwargs=card_kwargs, user=full_name, card=card_summary
+            ))
+
+    # MFA
+    for code in profile.mfa_codes:
+        if skipped(mfa_key(code)):
+            continue
+        stats["mfa_attempted"] += 1
+
+        try:
+            retry_call(
+                clients["access_b"].add_mfa_code_to_user,
+                idempotent=False,
+                verify=lambda: _mfa_on_user(clients, uid, code),
+                code=code, external_id=uid
+            )
+            stats["mfa_success"] += 1
+        except Exception as e:
+            failures["mfa_add"].append(failure(
+                "access_b.add_mfa_code_to_user", e,
+                kwargs={"code": code, "external_id": uid}, user=full_name, code=code
+            ))
+
+    # License Plates
+    for lp in profile.plates:
+        if skipped(plate_key(lp)):
+            continue
+        stats["plates_attempted"] += 1
+        plate_summary = f"{lp.license_plate_number} ({lp.name or ''})"
+
+        plate_kwargs = dict(
+            external_id=uid,
+            license_plate_number=lp.license_plate_number,
+            name=lp.name,
+            active=lp.active
+        )
+
+        try:
+            retry_call(
+                clients["access_b"].add_license_plate_to_user,
+                idempotent=False,
+                verify=lambda: _plate_on_user(clients, uid, lp.license_plate_number),
+                **plate_kwargs
+            )
+            stats["plates_success"] += 1
+        except Exception as e:
+            failures["license_plates"].append(failure(
+                "access_b.add_license_plate_to_user", e, kwargs=plate_kwargs, user=full_name, plate=plate_summary
+            ))
+
+
+# ----------------------------------
+# SHARD WORKER ENTRY POINT
+# ----------------------------------
+def build_clients(api_key_a, api_key_b):
+    from pykada.core_command import CoreCommandClient
+    from pykada.access_control import AccessControlClient
+    from utils.tokens import shared_token_manager
+
+    return {
+        "core_a": CoreCommandClient(token_manager=shared_token_manager(api_key_a)),
+        "core_b": CoreCommandClient(token_manager=shared_token_manager(api_key_b)),
+        "access_a": AccessControlClient(token_manager=shared_token_manager(api_key_a)),
+        "access_b": AccessControlClient(token_manager=shared_token_manager(api_key_b)),
+    }
+
+
+def run_shard(shard):
+    """Run one phase ("users" or "attributes") over this shard's users."""
+    from dotenv import load_dotenv
+
+    load_dotenv(override=True)
+    clients = build_clients(os.getenv("VERKADA_API_KEY_A"), os.getenv("VERKADA_API_KEY_B"))
+
+    stats = {k: 0 for k in shard["stat_keys"]}
+    failures = {k: [] for k in shard["failure_keys"]}
+
+    if shard["phase"] == "users":
+        for user in shard["items"]:
+            migrate_user(UserRecord.from_dict(user), clients, stats, failures)
+    else:
+        group_map = shard["group_name_to_b_id"]
+        for uid, full_name, skip, profile in shard["items"]:
+            migrate_user_attributes(uid, full_name, group_map, clients, stats, failures, set(skip),
+                                    AccessProfile.from_dict(profile) if profile else None)
+
+    return {"stats": stats, "failures": failures}
+
+
+if __name__ == "__main__":
+    with open(sys.argv[1], encoding="utf-8") as f:
+        shard_input = json.load(f)
+
+    result = run_shard(shard_input)
+
+    with open(sys.argv[2], "w", encoding="utf-8") as f:
+        json.dump(result, f)
@@ -0,0 +1,126 @@
+# ================================
+# TYPED, BATCHED BACKUP CSV READER
+# ================================
+#
+# Restoring from ../CSVs after Org A is gone means reading the backups back
+# with the right types. Instead of csv.DictReader plus ad-hoc int()/lower()
+# calls per field, each backup has a schema (column → converter) that is
+# resolved against the header once; rows are then converted positionally
+# and handed out in batches.
+#
+#     for batch in read_backup("../CSVs/lpois_backup.csv", LPOI_SCHEMA):
+#         ...
+#
+# Empty cells become None. Columns missing from the schema stay strings.
+
+import ast
+import csv
+
+BATCH_SIZE = 5000
+
+
+# ----------------------------------
+# CONVERTERS
+# ----------------------------------
+def to_str(value):
+    return value
+
+
+def to_int(value):
+    lowered = value.strip().lower()
+    if lowered in ("true", "false"):
+        return int(lowered == "true")
+    return int(float(lowered))
+
+
+def to_float(value):
+    return float(value)
+
+
+def to_bool(value):
+    """"True" / "1" / "yes" → True. Accepts values that are already bools."""
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("true", "1", "yes", "y")
+
+
+def to_literal(value):
+    """Python literals written by csv.writer (dicts/lists such as Helix schemas)."""
+    return ast.literal_eval(value)
+
+
+# ----------------------------------
+# SCHEMAS (one per restorable backup)
+# ----------------------------------
+CAMERA_SCHEMA = {
+    "location_lat": to_float,
+    "location_lon": to_float,
+    "location_angle": to_float,
+    "people_history_enabled": to_bool,
+    "vehicle_history_enabled": to_bool,
+    "cloud_days_to_preserve": to_int,
+    "cloud_enabled": to_int,
+    "audio_enabled": to_bool,
+}
+
+LPOI_SCHEMA = {
+    "plate": to_str,
+    "description": to_str,
+}
+
+HELIX_SCHEMA = {
+    "name": to_str,
+    "event_schema": to_literal,
+}
+
+
+# ----------------------------------
+# READER
+# ----------------------------------
+def read_backup(path, schema, batch_size=BATCH_SIZE, errors=None):
+    """Yield lists of typed row dicts from a backup CSV.
+
+    A cell that doesn't convert is kept as its raw string and, when errors is
+    a list, recorded there as {"file", "line", "column", "value", "reason"}.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+
+        columns = [(i, name, schema.get(name, to_str)) for i, name in enumerate(header)]
+        width = len(header)
+
+        batch = []
+        for line, values in enumerate(reader, start=2):
+            if not values:
+                continue
+            if len(values) < width:
+                values += [""] * (width - len(values))
+
+            row = {}
+            for i, name, convert in columns:
+                raw = values[i]
+                if raw == "":
+                    row[name] = None
+                    continue
+                try:
+                    row[name] = convert(raw)
+                except (ValueError, SyntaxError) as e:
+                    row[name] = raw
+                    if errors is not None:
+                        errors.append({"file": path, "line": line, "column": name, "value": raw, "reason": str(e)})
+            batch.append(row)
+
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+
+        if batch:
+            yield batch
+
+
+def load_backup(path, schema, errors=None):
+    """Whole backup as one list of typed rows."""
+    return [row for batch in read_backup(path, schema, errors=errors) for row in batch]
@@ -0,0 +1,151 @@
+# ================================
+# PER-SITE CAMERA REBUILD GUIDE
+# ================================
+#
+# With CAMERA_REPORT_MODE="pages" the camera-by-camera guide is split out of
+# camera_migration_report.md into a compact index plus one page per site:
+#
+#     ../Documentation/camera_guide/index.md
+#     ../Documentation/camera_guide/<site>__<site_id>.md
+#
+# Pages are built from the exported CSV records. A manifest keeps a SHA-256
+# of each site's records, and a page is only re-rendered when that hash
+# changes (or the page is missing), so reruns over a 5,000-camera fleet only
+# touch the sites whose data moved.
+
+import os
+import json
+import hashlib
+
+from utils.site_crawl import site_slug
+
+GUIDE_DIR = "../Documentation/camera_guide"
+MANIFEST = ".manifest.json"
+
+BUCKETS = [
+    ("1. People ENABLED / Vehicle NOT ENABLED", True, False),
+    ("2. People ENABLED / Vehicle ENABLED", True, True),
+    ("3. People NOT ENABLED / Vehicle NOT ENABLED", False, False),
+    ("4. People NOT ENABLED / Vehicle ENABLED", False, True),
+]
+
+
+def icon(val):
+    return "ENABLED ✅" if val else "NOT ENABLED ❌"
+
+
+def bucket_cameras(cameras):
+    """[(title, cameras)] in BUCKETS order, grouped by People/Vehicle analytics state."""
+    grouped = {(people, vehicle): [] for _, people, vehicle in BUCKETS}
+    for cam in cameras:
+        key = (bool(cam.get("people_history_enabled")), bool(cam.get("vehicle_history_enabled")))
+        grouped[key].append(cam)
+    return [(title, grouped[(people, vehicle)]) for title, people, vehicle in BUCKETS]
+
+
+def records_hash(records):
+    payload = json.dumps(records, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+# ----------------------------------
+# RENDERING
+# ----------------------------------
+def render_site_page(site_name, records):
+    lines = [
+        f"# Camera Rebuild Guide: {site_name}\n\n",
+        "[← All sites](index.md)\n\n",
+        f"{len(records)} cameras. Values come from camera_data_backup.csv.\n\n",
+    ]
+
+    for title, bucket in bucket_cameras(records):
+        lines.append(f"## {title}\n\n")
+
+        if not bucket:
+            lines.append("_No cameras in this category._\n\n")
+            continue
+
+        for cam in bucket:
+            serial = cam.get("serial")
+            name = cam.get("name") or f"{cam.get('model')} · {serial}"
+
+            lines.append(f"### {name}\n")
+            lines.append(f"- **Serial:** {serial}\n")
+            lines.append(f"- **Model:** {cam.get('model')}\n")
+            lines.append(f"- **People Analytics:** {icon(cam.get('people_history_enabled'))}\n")
+            lines.append(f"- **Vehicle Analytics:** {icon(cam.get('vehicle_history_enabled'))}\n")
+            lines.append(f"- **Cloud Backup:** {icon(cam.get('cloud_enabled'))}"
+                         f" ({cam.get('cloud_days_to_preserve')} days, {cam.get('cloud_video_quality')})\n")
+            lines.append(f"- **Audio:** {icon(cam.get('audio_enabled'))}\n")
+            lines.append("\n")
+
+    return "".join(lines)
+
+
+def render_index(pages):
+    lines = [
+        "# Camera Rebuild Guide\n\n",
+        "One page per site. Bucket columns count cameras per People/Vehicle analytics group "
+        "(see camera_migration_report.md).\n\n",
+        "| Site | Cameras | 1 | 2 | 3 | 4 |\n",
+        "|------|---------|---|---|---|---|\n",
+    ]
+    for slug, site_name, records in sorted(pages, key=lambda p: str(p[1] or "")):
+        counts = " | ".join(str(len(b)) for _, b in bucket_cameras(records))
+        lines.append(f"| [{site_name}]({slug}.md) | {len(records)} | {counts} |\n")
+    return "".join(lines)
+
+
+# ----------------------------------
+# INCREMENTAL WRITE
+# ----------------------------------
+def write_guide(records, guide_dir=GUIDE_DIR):
+    """Write index.md and any site pages whose records changed.
+
+    Returns {"pages": n, "rendered": n, "removed": n, "index": path}.
+    """
+    os.makedirs(guide_dir, exist_ok=True)
+    manifest_path = os.path.join(guide_dir, MANIFEST)
+
+    previous = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as f:
+            previous = json.load(f)
+
+    sites = {}
+    for rec in records:
+        site_id = rec.get("site_id") or "unassigned"
+        slug = site_slug(site_id, rec.get("site"))
+        sites.setdefault(slug, (rec.get("site") or site_id, []))[1].append(rec)
+
+    manifest = {}
+    rendered = 0
+
+    for slug, (site_name, site_records) in sites.items():
+        digest = records_hash(site_records)
+        manifest[slug] = digest
+        page = os.path.join(guide_dir, f"{slug}.md")
+
+        if previous.get(slug) == digest and os.path.exists(page):
+            continue
+
+        with open(page, "w", encoding="utf-8") as f:
+            f.write(render_site_page(site_name, site_records))
+        rendered += 1
+
+    removed = 0
+    for slug in previous.keys() - manifest.keys():
+        page = os.path.join(guide_dir, f"{slug}.md")
+        if os.path.exists(page):
+            os.remove(page)
+            removed += 1
+
+    index_path = os.path.join(guide_dir, "index.md")
+    with open(index_path, "w", encoding="utf-8") as f:
+        f.write(render_index([(slug, name, recs) for slug, (name, recs) in sites.items()]))
+
+    # Manifest last: an interrupted run re-renders instead of trusting stale pages
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+    return {"pages": len(sites), "rendered": rendered, "removed": removed, "index": index_path}
@@ -0,0 +1,68 @@
+# ================================
+# PER-CAMERA SETTINGS (EXPORT + RESTORE)
+# ================================
+#
+# The per-camera work of Cameras.py STEP 2 (read cloud backup + audio from
+# Org A) and CloudBackup&Audio.py (write them back into Org B), kept here so
+# it can run in-process or from a queue worker (see utils/jobs.py).
+
+from utils.retry import retry_call
+from utils.failures import failure
+from utils.backup_reader import to_bool
+
+
+def fetch_camera_settings(cam_a, cam_id, failures):
+    """Return (cloud, audio) settings for one Org A camera; {} on failure."""
+    try:
+        cloud = cam_a.get_cloud_backup_settings(cam_id)
+    except Exception as e:
+        cloud = {}
+        failures["cloud_backup_get"].append((cam_id, str(e)))
+
+    try:
+        audio = cam_a.get_camera_audio_status(cam_id)
+    except Exception as e:
+        audio = {}
+        failures["audio_get"].append((cam_id, str(e)))
+
+    return cloud, audio
+
+
+def restore_camera_settings(cam_b, cam_id_b, row):
+    """Apply one camera_data_backup.csv row to an Org B camera.
+
+    Returns {"cloud": failure or None, "audio": failure or None, "audio_enabled": bool}.
+    """
+    outcome = {"cloud": None, "audio": None, "audio_enabled": None}
+    serial = row.get("serial")
+
+    # -----------------------------------------
+    # CLOUD BACKUP RESTORE
+    # -----------------------------------------
+    cloud_kwargs = {}
+    try:
+        cloud_kwargs = dict(
+            camera_id=cam_id_b,
+            days_to_preserve=row["cloud_days_to_preserve"],
+            enabled=int(row["cloud_enabled"]),
+            time_to_preserve=row["cloud_time_to_preserve"],
+            upload_timeslot=row["cloud_upload_timeslot"],
+            video_quality=row["cloud_video_quality"],
+            video_to_upload=row["cloud_video_to_upload"]
+        )
+        retry_call(cam_b.update_cloud_backup_settings, **cloud_kwargs)
+    except Exception as e:
+        outcome["cloud"] = failure("cam_b.update_cloud_backup_settings", e, kwargs=cloud_kwargs, serial=serial)
+
+    # -----------------------------------------
+    # AUDIO RESTORE
+    # -----------------------------------------
+    # Typed rows (utils.backup_reader) carry a bool; older string rows "True"/"False"
+    audio_enabled = to_bool(row["audio_enabled"])
+    try:
+        retry_call(cam_b.set_camera_audio_status, cam_id_b, audio_enabled)
+        outcome["audio_enabled"] = audio_enabled
+    except Exception as e:
+        outcome["audio"] = failure("cam_b.set_camera_audio_status", e, args=(cam_id_b, audio_enabled), serial=serial)
+
+    return outcome
@@ -0,0 +1,74 @@
+# ================================
+# COLUMNAR (PARQUET / ARROW) EXPORT
+# ================================
+#
+# Optional companion to every CSV backup. When COLUMNAR_EXPORT is set to
+# "parquet" or "arrow", each backup is also written next to its CSV with real
+# list/struct columns (door_ids, schedule events, exceptions, ...) instead of
+# ";"-joined strings and embedded JSON.
+#
+# Requires pyarrow (pip install pyarrow). Without it the CSVs are still
+# written and the columnar copy is skipped with a notice.
+#
+# Reading back:
+#
+#     table = read_columnar("../CSVs/access_levels_backup.arrow")   # memory-mapped
+
+import os
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+COLUMNAR_EXPORT = os.getenv("COLUMNAR_EXPORT", "").strip().lower()
+
+EXTENSIONS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+
+def write_columnar(csv_path, records, fmt=None):
+    """Write records (list of dicts) next to csv_path in the configured format.
+
+    Returns the written path, or None when the export is disabled or skipped.
+    """
+    fmt = (fmt or COLUMNAR_EXPORT)
+    if not fmt:
+        return None
+
+    if fmt not in EXTENSIONS:
+        print(f"Unknown COLUMNAR_EXPORT format '{fmt}' (use parquet or arrow) — skipping.")
+        return None
+
+    if pa is None:
+        print("COLUMNAR_EXPORT is set but pyarrow is not installed — skipping columnar export.")
+        return None
+
+    out_path = os.path.splitext(csv_path)[0] + EXTENSIONS[fmt]
+
+    try:
+        table = pa.Table.from_pylist(records)
+    except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+        print(f"Columnar export skipped for {out_path}: {e}")
+        return None
+
+    if fmt == "parquet":
+        pq.write_table(table, out_path)
+    else:
+        with pa.OSFile(out_path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+    return out_path
+
+
+def read_columnar(path):
+    """Load a columnar backup. Arrow IPC files are memory-mapped (zero-copy)."""
+    if pa is None:
+        raise ImportError("pyarrow is required to read columnar backups")
+
+    if path.endswith(".parquet"):
+        return pq.read_table(path, memory_map=True)
+
+    return pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
@@ -0,0 +1,105 @@
+# ================================
+# CREDENTIAL DEDUPE + CONFLICT PRE-CHECK
+# ================================
+#
+# Before STEP 3 pushes cards, MFA codes and license plates into Org B, every
+# credential in both orgs is indexed by a normalized key:
+#
+#   card:<facility_code>:<number>   (decimal, hex and base36 numbers all map to the same int)
+#   mfa:<code>
+#   plate:<PLATE>                   (upper-case, letters and digits only)
+#
+# A credential is only sent if Org B doesn't already hold it and no earlier
+# Org A user owns it too, so STEP 3 stops spending one failed request on each
+# duplicate or conflict.
+
+from utils.transforms import normalize_plate
+
+_NUMBER_FIELDS = (("card_number", 10), ("card_number_hex", 16), ("card_number_base36", 36))
+
+
+def card_key(card):
+    facility_code = str(card.facility_code or "").strip()
+    for field, base in _NUMBER_FIELDS:
+        raw = str(getattr(card, field) or "").strip()
+        if not raw:
+            continue
+        try:
+            return f"card:{facility_code}:{int(raw, base)}"
+        except ValueError:
+            return f"card:{facility_code}:{raw.lower()}"
+    return None
+
+
+def mfa_key(code):
+    code = str(code or "").strip()
+    return f"mfa:{code}" if code else None
+
+
+def plate_key(lp):
+    plate = normalize_plate(lp.license_plate_number)
+    return f"plate:{plate}" if plate else None
+
+
+def credential_keys(profile):
+    """Yield (kind, key) for every card, MFA code and plate on an AccessProfile."""
+    for kind, items, key_fn in (
+        ("Keycard", profile.cards, card_key),
+        ("MFA Code", profile.mfa_codes, mfa_key),
+        ("License Plate", profile.plates, plate_key),
+    ):
+        for item in items:
+            key = key_fn(item)
+            if key:
+                yield kind, key
+
+
+def plan_credentials(details_a, details_b):
+    """Decide which Org A credentials can be sent.
+
+    details_a: [(user_id, full_name, AccessProfile)] in migration order
+    details_b: [(external_id or user_id, full_name, AccessProfile)] for Org B
+
+    Returns (skip, conflicts, present): skip maps user_id → set of keys not to
+    send; conflicts lists credentials that belong to someone else; present
+    counts credentials the same user already holds in Org B.
+    """
+    held_in_b = {}
+    for owner, name, profile in details_b:
+        for _, key in credential_keys(profile):
+            held_in_b.setdefault(key, (owner, name))
+
+    first_owner_a = {}
+    skip = {}
+    conflicts = []
+    present = 0
+
+    for uid, full_name, profile in details_a:
+        for kind, key in credential_keys(profile):
+            holder = held_in_b.get(key)
+            if holder and holder[0] == uid:
+                skip.setdefault(uid, set()).add(key)
+                present += 1
+                continue
+
+            if holder:
+                skip.setdefault(uid, set()).add(key)
+                conflicts.append({
+                    "type": kind,
+                    "credential": key.split(":", 1)[1],
+                    "user": full_name,
+                    "reason": f"Already assigned to Org B user {holder[1]}",
+                })
+                continue
+
+            owner = first_owner_a.setdefault(key, (uid, full_name))
+            if owner[0] != uid:
+                skip.setdefault(uid, set()).add(key)
+                conflicts.append({
+                    "type": kind,
+                    "credential": key.split(":", 1)[1],
+                    "user": full_name,
+                    "reason": f"Duplicate of Org A user {owner[1]}",
+                })
+
+    return skip, conflicts, present
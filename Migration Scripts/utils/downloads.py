@@ -0,0 +1,82 @@
+# ================================
+# STREAMING, CONTENT-ADDRESSED DOWNLOADS
+# ================================
+#
+# Used for POI face images. Each file is streamed to disk in chunks (never
+# held in memory), hashed while it is written, and stored once under its
+# SHA-256:
+#
+#     <store>/ab/abcdef….jpg
+#
+# An interrupted download is left as <store>/.partial/<name>.part and resumed
+# with an HTTP Range request on the next run.
+
+import os
+import re
+import hashlib
+import mimetypes
+from urllib.error import HTTPError
+from urllib.parse import urlparse
+from urllib.request import Request, urlopen
+
+CHUNK_SIZE = 256 * 1024
+
+_UNSAFE = re.compile(r"[^A-Za-z0-9._-]")
+
+
+def _extension(content_type, url):
+    ext = mimetypes.guess_extension((content_type or "").split(";")[0].strip()) if content_type else None
+    if not ext:
+        ext = os.path.splitext(urlparse(url).path)[1]
+    return ext or ".jpg"
+
+
+def _hash_existing(path, digest):
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            digest.update(chunk)
+
+
+def download_to_store(url, store_dir, name, timeout=60):
+    """Stream url into the content-addressed store. Returns the stored path."""
+    partial_dir = os.path.join(store_dir, ".partial")
+    os.makedirs(partial_dir, exist_ok=True)
+    part = os.path.join(partial_dir, _UNSAFE.sub("_", str(name)) + ".part")
+
+    digest = hashlib.sha256()
+    offset = os.path.getsize(part) if os.path.exists(part) else 0
+    headers = {"Range": f"bytes={offset}-"} if offset else {}
+
+    try:
+        with urlopen(Request(url, headers=headers), timeout=timeout) as resp:
+            ext = _extension(resp.headers.get("Content-Type"), url)
+
+            if offset and resp.status == 206:
+                _hash_existing(part, digest)
+                mode = "ab"
+            else:
+                # No partial file, or the server ignored Range: start over
+                mode = "wb"
+
+            with open(part, mode) as out:
+                while chunk := resp.read(CHUNK_SIZE):
+                    out.write(chunk)
+                    digest.update(chunk)
+    except HTTPError as e:
+        # 416: the partial file already holds the whole image
+        if e.code != 416 or not offset:
+            raise
+        ext = _extension(None, url)
+        _hash_existing(part, digest)
+
+    sha = digest.hexdigest()
+    final = os.path.join(store_dir, sha[:2], sha + ext)
+
+    if os.path.exists(final):
+        os.remove(part)
+    else:
+        os.makedirs(os.path.dirname(final), exist_ok=True)
+        os.replace(part, final)
+
+    return final
+
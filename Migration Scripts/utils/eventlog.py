@@ -0,0 +1,214 @@
+# ================================
+# STRUCTURED EVENT LOG + CONSOLE PROGRESS
+# ================================
+#
+# Per-operation progress goes to ../Logs/<script>.jsonl instead of stdout,
+# one JSON object per line:
+#
+#     {"ts": "2025-01-01T12:00:00.123Z", "script": "Cameras", "op": "lpoi_create",
+#      "entity": "AB123", "outcome": "ok", "latency_ms": 182.4}
+#
+# Callers only enqueue; a background thread batches lines to disk and
+# rotates the file at EVENT_LOG_MAX_BYTES (keeping EVENT_LOG_BACKUPS old
+# files). The console gets one self-updating progress bar per loop instead.
+#
+#     log = EventLog("Cameras")
+#     for lp, _, err in log.bounded("lpoi_create", create_lpoi, lpois, entity=plate_of):
+#         ...
+#
+# Search a run with e.g. `grep '"outcome": "error"' ../Logs/Cameras.jsonl`.
+
+import os
+import sys
+import json
+import time
+import queue
+import atexit
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from utils.pool import run_bounded
+
+LOG_DIR = "../Logs"
+EVENT_LOG_MAX_BYTES = int(os.getenv("EVENT_LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+EVENT_LOG_BACKUPS = int(os.getenv("EVENT_LOG_BACKUPS", "5"))
+
+FLUSH_INTERVAL = 1.0   # seconds between disk writes
+FLUSH_LINES = 1000     # ...or sooner once this many lines are buffered
+
+_STOP = object()
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+class EventLog:
+    def __init__(self, script, log_dir=LOG_DIR, max_bytes=None, backups=None):
+        self.script = script
+        self.path = os.path.join(log_dir, f"{script}.jsonl")
+        self.max_bytes = EVENT_LOG_MAX_BYTES if max_bytes is None else max_bytes
+        self.backups = EVENT_LOG_BACKUPS if backups is None else backups
+
+        os.makedirs(log_dir, exist_ok=True)
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._writer, name=f"eventlog-{script}", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # ----------------------------------
+    # RECORDING (any thread)
+    # ----------------------------------
+    def event(self, op, entity=None, outcome="ok", latency=None, **fields):
+        """Record one operation. latency is in seconds."""
+        record = {"ts": _now(), "script": self.script, "op": op, "entity": entity, "outcome": outcome}
+        if latency is not None:
+            record["latency_ms"] = round(latency * 1000, 1)
+        record.update(fields)
+        self._queue.put(record)
+
+    @contextmanager
+    def timed(self, op, entity=None, **fields):
+        """Time a block; records outcome "error" (and re-raises) if it raises.
+
+        Yields the event's extra fields, so the block can add to them or set
+        fields["outcome"] (e.g. "partial") before the event is recorded.
+        """
+        start = time.perf_counter()
+        try:
+            yield fields
+        except Exception as e:
+            fields.pop("outcome", None)
+            self.event(op, entity, "error", time.perf_counter() - start,
+                       error=type(e).__name__, reason=str(e), **fields)
+            raise
+        outcome = fields.pop("outcome", "ok")
+        self.event(op, entity, outcome, time.perf_counter() - start, **fields)
+
+    def bounded(self, op, fn, items, entity=None, outcome_of=None, max_workers=None, label=None):
+        """run_bounded with one event per item and a console progress bar.
+
+        entity(item) names the item in the log; outcome_of(result) can turn a
+        returned value into an outcome other than "ok" (e.g. "partial").
+        Yields (item, result, error) exactly like run_bounded.
+        """
+        items = list(items)
+        name_of = entity or str
+
+        def call(item):
+            start = time.perf_counter()
+            try:
+                result = fn(item)
+            except Exception as e:
+                self.event(op, name_of(item), "error", time.perf_counter() - start,
+                           error=type(e).__name__, reason=str(e))
+                raise
+            outcome = outcome_of(result) if outcome_of else "ok"
+            self.event(op, name_of(item), outcome, time.perf_counter() - start)
+            return result
+
+        bar = ProgressBar(len(items), label or op)
+        try:
+            for item, result, error in run_bounded(call, items, max_workers):
+                bar.update(failed=error is not None)
+                yield item, result, error
+        finally:
+            bar.close()
+
+    def progress(self, total, label):
+        return ProgressBar(total, label)
+
+    # ----------------------------------
+    # BACKGROUND WRITER
+    # ----------------------------------
+    def _writer(self):
+        buffer = []
+        last_flush = time.monotonic()
+        stopping = False
+
+        while not stopping:
+            try:
+                item = self._queue.get(timeout=FLUSH_INTERVAL)
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                stopping = True
+            elif item is not None:
+                buffer.append(json.dumps(item, default=str))
+
+            due = time.monotonic() - last_flush >= FLUSH_INTERVAL
+            if buffer and (stopping or due or len(buffer) >= FLUSH_LINES):
+                self._flush(buffer)
+                buffer = []
+                last_flush = time.monotonic()
+
+    def _flush(self, lines):
+        data = "\n".join(lines) + "\n"
+        if self.max_bytes and os.path.exists(self.path) and os.path.getsize(self.path) + len(data) > self.max_bytes:
+            self._rotate()
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(data)
+
+    def _rotate(self):
+        # Cameras.jsonl → Cameras.1.jsonl → … → Cameras.<backups>.jsonl (dropped)
+        stem, ext = os.path.splitext(self.path)
+        for n in range(self.backups, 0, -1):
+            src = self.path if n == 1 else f"{stem}.{n - 1}{ext}"
+            if os.path.exists(src):
+                os.replace(src, f"{stem}.{n}{ext}")
+        if not self.backups:
+            os.remove(self.path)
+
+    def close(self):
+        """Flush everything still queued. Safe to call more than once."""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+
+
+class ProgressBar:
+    """Single-line console progress: label [#####-----] 42/100 · 3 failed · 12.5/s
+
+    Redraws at most every 0.1s on a terminal; when stdout is redirected only
+    the final line is printed.
+    """
+
+    WIDTH = 30
+
+    def __init__(self, total, label):
+        self.total = total
+        self.label = label
+        self.done = 0
+        self.failed = 0
+        self.start = time.monotonic()
+        self._last_draw = 0.0
+        self._tty = sys.stdout.isatty()
+        self._closed = False
+
+    def update(self, n=1, failed=False):
+        self.done += n
+        if failed:
+            self.failed += n
+        now = time.monotonic()
+        if self._tty and (now - self._last_draw >= 0.1 or self.done >= self.total):
+            self._last_draw = now
+            sys.stdout.write("\r" + self._line())
+            sys.stdout.flush()
+
+    def _line(self):
+        filled = int(self.WIDTH * self.done / self.total) if self.total else self.WIDTH
+        rate = self.done / max(time.monotonic() - self.start, 1e-9)
+        failed = f" · {self.failed} failed" if self.failed else ""
+        return (f"{self.label} [{'#' * filled}{'-' * (self.WIDTH - filled)}] "
+                f"{self.done}/{self.total}{failed} · {rate:.1f}/s")
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        if not self.total:
+            return
+        sys.stdout.write(("\r" if self._tty else "") + self._line() + "\n")
+        sys.stdout.flush()
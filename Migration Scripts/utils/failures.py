@@ -0,0 +1,184 @@
+# ================================
+# MACHINE-READABLE FAILURE LOG
+# ================================
+#
+# Failures that come from one Org B write are recorded with the operation
+# ("<client>.<method>", where <client> is a key of the script's clients dict),
+# its arguments and the error class. Every script dumps its failures to
+#
+#     ../Failures/<script>_failures.jsonl
+#
+# and `--retry-failures` replays only the recorded operations, concurrently,
+# rewriting the file with whatever still fails. User and group creates are
+# replayed before the writes that need them, and creates/adds that would
+# duplicate if re-sent (CREATE_CHECKS) are checked against Org B first and
+# replayed with retry_call(idempotent=False, verify=...), as in the first run.
+
+import os
+import json
+
+from utils.pool import run_bounded
+from utils.retry import retry_call
+
+FAILURES_DIR = "../Failures"
+
+# Keys that make a failure replayable; left out of the Markdown reports
+_REPLAY_KEYS = ("operation", "args", "kwargs", "error")
+
+
+def failure(operation, exc, args=(), kwargs=None, **context):
+    """Failure record for one write; context (user, card, ...) is what the report shows."""
+    return {
+        **context,
+        "reason": str(exc),
+        "error": type(exc).__name__,
+        "operation": operation,
+        "args": list(args),
+        "kwargs": kwargs or {},
+    }
+
+
+def summarize(item):
+    """One report line for a failure entry."""
+    if isinstance(item, dict) and "operation" in item:
+        return ", ".join(f"{k}: {v}" for k, v in item.items() if k not in _REPLAY_KEYS)
+    return str(item)
+
+
+def failure_log_path(script):
+    return os.path.join(FAILURES_DIR, f"{script}_failures.jsonl")
+
+
+def write_failure_log(script, failures):
+    """Write every failure (replayable or not) as one JSON object per line."""
+    path = failure_log_path(script)
+    os.makedirs(FAILURES_DIR, exist_ok=True)
+
+    with open(path, "w", encoding="utf-8") as f:
+        for category, items in failures.items():
+            if not isinstance(items, list):
+                continue
+            for item in items:
+                record = {"category": category, **item} if isinstance(item, dict) else {"category": category, "item": item}
+                f.write(json.dumps(record, default=str) + "\n")
+
+    return path
+
+
+def read_failure_log(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+# ----------------------------------
+# NON-IDEMPOTENT OPERATIONS
+# ----------------------------------
+# operation → check(clients, args, kwargs) returning the Org B object the
+# call would create, or None. The same lookups the scripts pass as verify=.
+def _named(items, name):
+    return next((item for item in items if item.get("name") == name), None)
+
+
+def _user_exists(clients, args, kwargs):
+    from utils.access_users import _user_in_org_b
+    return _user_in_org_b(clients, kwargs["external_id"])
+
+
+def _group_exists(clients, args, kwargs):
+    return _named(clients["access_b"].get_access_groups()["access_groups"], kwargs["name"])
+
+
+def _card_exists(clients, args, kwargs):
+    from utils.access_users import _card_on_user
+    number = {k: kwargs[k] for k in ("card_number", "card_number_hex", "card_number_base36") if kwargs.get(k)}
+    return _card_on_user(clients, kwargs["external_id"], number) if number else None
+
+
+def _mfa_exists(clients, args, kwargs):
+    from utils.access_users import _mfa_on_user
+    return _mfa_on_user(clients, kwargs["external_id"], kwargs["code"])
+
+
+def _plate_exists(clients, args, kwargs):
+    from utils.access_users import _plate_on_user
+    return _plate_on_user(clients, kwargs["external_id"], kwargs["license_plate_number"])
+
+
+def _lpoi_exists(clients, args, kwargs):
+    from utils.transforms import find_lpoi
+    return find_lpoi(clients["cam_b"], args[0])
+
+
+def _event_type_exists(clients, args, kwargs):
+    return _named(clients["helix_b"].get_helix_event_types().get("event_types", []), args[1])
+
+
+CREATE_CHECKS = {
+    "core_b.create_user": _user_exists,
+    "access_b.create_access_group": _group_exists,
+    "access_b.add_card_to_user": _card_exists,
+    "access_b.add_mfa_code_to_user": _mfa_exists,
+    "access_b.add_license_plate_to_user": _plate_exists,
+    "cam_b.create_lpoi": _lpoi_exists,
+    "helix_b.create_helix_event_type": _event_type_exists,
+}
+
+# Replayed (and finished) before everything else: group assignments and
+# credential writes fail against a user or group that doesn't exist yet
+_REPLAY_FIRST = ("core_b.create_user", "access_b.create_access_group")
+
+
+def _replay(record, clients):
+    client_name, method = record["operation"].split(".", 1)
+    fn = getattr(clients[client_name], method)
+    args, kwargs = record["args"], record["kwargs"]
+
+    check = CREATE_CHECKS.get(record["operation"])
+    if check is None:
+        return retry_call(fn, *args, **kwargs)
+
+    def verify():
+        return check(clients, args, kwargs)
+
+    # The first attempt may have landed even though it reported an error
+    try:
+        existing = verify()
+    except Exception:
+        existing = None
+    if existing:
+        return existing
+
+    return retry_call(fn, *args, idempotent=False, verify=verify, **kwargs)
+
+
+def replay_failures(script, clients, max_workers=None):
+    """Re-send every recorded operation; returns (fixed, still_failing)."""
+    path = failure_log_path(script)
+    records = read_failure_log(path)
+    replayable = [r for r in records if r.get("operation")]
+    still_failing = [r for r in records if not r.get("operation")]
+
+    print(f"Replaying {len(replayable)} of {len(records)} recorded failures from {path}\n")
+
+    phases = [
+        [r for r in replayable if r["operation"] in _REPLAY_FIRST],
+        [r for r in replayable if r["operation"] not in _REPLAY_FIRST],
+    ]
+
+    fixed = 0
+    for phase in phases:
+        for record, _, error in run_bounded(lambda r: _replay(r, clients), phase, max_workers):
+            if error is None:
+                fixed += 1
+                continue
+            record.update(reason=str(error), error=type(error).__name__)
+            still_failing.append(record)
+
+    with open(path, "w", encoding="utf-8") as f:
+        for record in still_failing:
+            f.write(json.dumps(record, default=str) + "\n")
+
+    print(f"✔ {fixed} operations succeeded, {len(still_failing)} failures remain in {path}\n")
+    return fixed, still_failing
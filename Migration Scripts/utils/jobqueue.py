@@ -0,0 +1,187 @@
+# ================================
+# DURABLE JOB QUEUE (SQLITE)
+# ================================
+#
+# Per-entity work items (one user, one camera, ...) are written to a SQLite
+# database that every worker can reach.
+#
+# Where the file lives matters: SQLite serializes writers with POSIX advisory
+# locks, and WAL mode additionally needs shared memory on a single host, so
+# the queue uses the rollback journal and is only safe on
+#   - a local disk (every worker on the same host), or
+#   - a shared filesystem with working POSIX byte-range locks across hosts
+#     (e.g. NFSv4 with locking enabled, or a cluster filesystem).
+# SMB/CIFS shares, and NFS mounted with "nolock" or "local_lock", do not
+# qualify: workers there can miss each other's writes or corrupt the file.
+# Workers claim items with a lease; an item whose lease expires (worker died,
+# host rebooted) goes back to the pool. Results are stored with the item and
+# merged centrally by the script that enqueued them — only that script
+# writes CSVs and reports.
+#
+# Tables:
+#   batches(batch, kind, meta)                 — one per enqueued step
+#   jobs(id, batch, kind, payload, status, …)  — status: pending | leased | done | failed
+
+import json
+import time
+import socket
+import sqlite3
+import os
+
+LEASE_SECONDS = 300
+MAX_ATTEMPTS = 3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS batches (
+    batch TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    meta TEXT,
+    created REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    batch TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    lease_owner TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (status, lease_expires);
+CREATE INDEX IF NOT EXISTS jobs_batch ON jobs (batch, status);
+"""
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class JobQueue:
+    def __init__(self, path):
+        self.path = path
+        self._db = sqlite3.connect(path, timeout=60, isolation_level=None)
+        # Not WAL: its shared-memory index only works when every process is on one host
+        self._db.execute("PRAGMA journal_mode=DELETE")
+        self._db.executescript(_SCHEMA)
+
+    def close(self):
+        self._db.close()
+
+    # ----------------------------------
+    # PRODUCER SIDE
+    # ----------------------------------
+    def enqueue(self, batch, kind, payloads, meta=None):
+        """Add one job per payload under a new batch. Returns the number queued."""
+        now = time.time()
+        with self._transaction():
+            self._db.execute(
+                "INSERT OR REPLACE INTO batches (batch, kind, meta, created) VALUES (?, ?, ?, ?)",
+                (batch, kind, json.dumps(meta), now),
+            )
+            cur = self._db.executemany(
+                "INSERT INTO jobs (batch, kind, payload, updated) VALUES (?, ?, ?, ?)",
+                ((batch, kind, json.dumps(p), now) for p in payloads),
+            )
+        return cur.rowcount
+
+    def counts(self, batch):
+        rows = self._db.execute(
+            "SELECT status, COUNT(*) FROM jobs WHERE batch = ? GROUP BY status", (batch,)
+        ).fetchall()
+        return dict(rows)
+
+    def is_finished(self, batch):
+        counts = self.counts(batch)
+        return not counts.get("pending") and not counts.get("leased")
+
+    def results(self, batch):
+        """Yield (payload, result, error) for every finished job in the batch."""
+        for payload, result, error in self._db.execute(
+            "SELECT payload, result, error FROM jobs WHERE batch = ? AND status IN ('done', 'failed') ORDER BY id",
+            (batch,),
+        ):
+            yield json.loads(payload), json.loads(result) if result else None, error
+
+    # ----------------------------------
+    # WORKER SIDE
+    # ----------------------------------
+    def claim(self, worker_id, lease_seconds=LEASE_SECONDS, batch=None, max_attempts=MAX_ATTEMPTS):
+        """Lease the next available job.
+
+        Returns (job_id, kind, payload, meta, attempt) or None; attempt is 1 on
+        the first claim. A lease that expired on the last allowed attempt
+        (the job keeps killing its worker, so fail() never ran) is marked
+        failed instead of being handed out again.
+        """
+        now = time.time()
+        batch_clause = " AND batch = ?" if batch else ""
+        batch_params = [batch] if batch else []
+        with self._transaction():
+            self._db.execute(
+                "UPDATE jobs SET status = 'failed', lease_owner = NULL, lease_expires = NULL, "
+                "error = COALESCE(error || '; ', '') || ?, updated = ? "
+                "WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?" + batch_clause,
+                [f"lease expired on attempt {max_attempts} (worker died or hung)", now, now, max_attempts]
+                + batch_params,
+            )
+
+            row = self._db.execute(
+                "SELECT id, batch, kind, payload, attempts FROM jobs "
+                "WHERE (status = 'pending' OR (status = 'leased' AND lease_expires < ? AND attempts < ?))"
+                + batch_clause + " ORDER BY id LIMIT 1",
+                [now, max_attempts] + batch_params,
+            ).fetchone()
+            if row is None:
+                return None
+
+            job_id, job_batch, kind, payload, attempts = row
+            self._db.execute(
+                "UPDATE jobs SET status = 'leased', lease_owner = ?, lease_expires = ?, "
+                "attempts = attempts + 1, updated = ? WHERE id = ?",
+                (worker_id, now + lease_seconds, now, job_id),
+            )
+            meta = self._db.execute("SELECT meta FROM batches WHERE batch = ?", (job_batch,)).fetchone()
+
+        return job_id, kind, json.loads(payload), json.loads(meta[0]) if meta and meta[0] else None, attempts + 1
+
+    def complete(self, job_id, worker_id, result):
+        self._finish(job_id, worker_id, "done", result=json.dumps(result))
+
+    def fail(self, job_id, worker_id, error, max_attempts=MAX_ATTEMPTS):
+        """Record a handler crash; the job is retried until max_attempts."""
+        attempts = self._db.execute("SELECT attempts FROM jobs WHERE id = ?", (job_id,)).fetchone()[0]
+        status = "failed" if attempts >= max_attempts else "pending"
+        self._finish(job_id, worker_id, status, error=error)
+
+    def _finish(self, job_id, worker_id, status, result=None, error=None):
+        # Only the current lease holder may finish a job; a worker whose lease
+        # already expired (and was re-claimed) must not overwrite the new result
+        self._db.execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, lease_owner = NULL, "
+            "lease_expires = NULL, updated = ? WHERE id = ? AND lease_owner = ?",
+            (status, result, error, time.time(), job_id, worker_id),
+        )
+
+    # ----------------------------------
+    # HELPERS
+    # ----------------------------------
+    def _transaction(self):
+        return _Transaction(self._db)
+
+
+class _Transaction:
+    def __init__(self, db):
+        self._db = db
+
+    def __enter__(self):
+        # IMMEDIATE takes the write lock up front so two workers can't claim the same job
+        self._db.execute("BEGIN IMMEDIATE")
+        return self._db
+
+    def __exit__(self, exc_type, *exc_info):
+        self._db.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
@@ -0,0 +1,173 @@
+# ================================
+# QUEUE JOB HANDLERS + COORDINATOR
+# ================================
+#
+# Job kinds that can be put on the queue (utils/jobqueue.py), the loop that
+# works them (used by Worker.py on every node, and by the coordinating
+# script while it waits), and run_batch() — enqueue, wait, collect results.
+#
+# Enabled by pointing JOB_QUEUE at a SQLite file every node can reach (local
+# disk or a lock-capable shared filesystem; see utils/jobqueue.py).
+
+import os
+import time
+import uuid
+
+from utils.jobqueue import JobQueue, LEASE_SECONDS, default_worker_id
+from utils.access_users import migrate_user, migrate_user_attributes, credentials_in_org_b
+from utils.user_records import UserRecord, AccessProfile
+from utils.camera_settings import fetch_camera_settings, restore_camera_settings
+
+# kind → fn(payload, meta, clients, attempt); attempt is 1 on the first claim
+HANDLERS = {}
+
+_clients = {}
+
+
+def handler(kind):
+    def register(fn):
+        HANDLERS[kind] = fn
+        return fn
+    return register
+
+
+def get_clients():
+    """Org A/B clients for this process, built once from the .env keys."""
+    if not _clients:
+        from dotenv import load_dotenv
+        from pykada.core_command import CoreCommandClient
+        from pykada.access_control import AccessControlClient
+        from pykada.cameras import CamerasClient
+        from utils.tokens import shared_token_manager
+
+        load_dotenv(override=True)
+        api_key_a = os.getenv("VERKADA_API_KEY_A")
+        api_key_b = os.getenv("VERKADA_API_KEY_B")
+
+        _clients.update({
+            "core_a": CoreCommandClient(token_manager=shared_token_manager(api_key_a)),
+            "core_b": CoreCommandClient(token_manager=shared_token_manager(api_key_b)),
+            "access_a": AccessControlClient(token_manager=shared_token_manager(api_key_a)),
+            "access_b": AccessControlClient(token_manager=shared_token_manager(api_key_b)),
+            "cam_a": CamerasClient(token_manager=shared_token_manager(api_key_a)),
+            "cam_b": CamerasClient(token_manager=shared_token_manager(api_key_b)),
+        })
+    return _clients
+
+
+def _empty(meta):
+    return {k: 0 for k in meta["stat_keys"]}, {k: [] for k in meta["failure_keys"]}
+
+
+# ----------------------------------
+# HANDLERS
+# ----------------------------------
+@handler("access_user")
+def _access_user(user, meta, clients, attempt):
+    stats, failures = _empty(meta)
+    migrate_user(UserRecord.from_dict(user), clients, stats, failures)
+    return {"stats": stats, "failures": failures}
+
+
+@handler("access_attributes")
+def _access_attributes(item, meta, clients, attempt):
+    stats, failures = _empty(meta)
+    skip = set(item.get("skip", ()))
+
+    # The coordinator's pre-check covers the first attempt. A retried job
+    # (handler raised, or its lease expired) may already have added some
+    # cards / MFA codes / plates; re-read Org B so they aren't sent twice
+    if attempt > 1:
+        try:
+            skip |= credentials_in_org_b(clients, item["user_id"])
+        except Exception as e:
+            # Fall back to the coordinator's pre-check alone
+            failures.setdefault("credential_index", []).append(
+                {"org": "B", "user": item["full_name"], "attempt": attempt, "reason": str(e)}
+            )
+
+    profile = item.get("profile")
+    migrate_user_attributes(
+        item["user_id"], item["full_name"], meta["group_name_to_b_id"], clients, stats, failures,
+        skip, AccessProfile.from_dict(profile) if profile else None
+    )
+    return {"stats": stats, "failures": failures}
+
+
+@handler("camera_settings")
+def _camera_settings(item, meta, clients, attempt):
+    stats, failures = _empty(meta)
+    cloud, audio = fetch_camera_settings(clients["cam_a"], item["camera_id"], failures)
+    return {"stats": stats, "failures": failures, "cloud": cloud, "audio": audio}
+
+
+@handler("camera_restore")
+def _camera_restore(item, meta, clients, attempt):
+    return restore_camera_settings(clients["cam_b"], item["camera_id_b"], item["row"])
+
+
+# ----------------------------------
+# WORK LOOP
+# ----------------------------------
+def work(queue, worker_id, batch=None, lease_seconds=LEASE_SECONDS):
+    """Claim and run jobs until none are available. Returns the number handled."""
+    handled = 0
+    while True:
+        job = queue.claim(worker_id, lease_seconds, batch=batch)
+        if job is None:
+            return handled
+
+        job_id, kind, payload, meta, attempt = job
+        try:
+            result = HANDLERS[kind](payload, meta, get_clients(), attempt)
+        except Exception as e:
+            queue.fail(job_id, worker_id, f"{type(e).__name__}: {e}")
+        else:
+            queue.complete(job_id, worker_id, result)
+        handled += 1
+
+
+# ----------------------------------
+# COORDINATOR
+# ----------------------------------
+def run_batch(queue_path, name, kind, payloads, meta=None, poll=2.0):
+    """Queue one job per payload, help work them, and wait for every worker.
+
+    Returns a list of (payload, result, error); result is None if the job
+    failed on every attempt.
+    """
+    queue = JobQueue(queue_path)
+    batch = f"{name}_{uuid.uuid4().hex[:8]}"
+    worker_id = default_worker_id()
+
+    queued = queue.enqueue(batch, kind, payloads, meta)
+    print(f"Queued {queued} {kind} jobs as batch {batch} on {queue_path}")
+
+    while True:
+        work(queue, worker_id, batch=batch)
+        if queue.is_finished(batch):
+            break
+        # Remaining jobs are leased by other workers; expired leases become
+        # claimable again, so keep polling rather than just waiting
+        time.sleep(poll)
+
+    counts = queue.counts(batch)
+    print(f"Batch {batch} finished: {counts.get('done', 0)} done, {counts.get('failed', 0)} failed")
+
+    results = list(queue.results(batch))
+    queue.close()
+    return results
+
+
+def merge_job_results(results, stats, failures):
+    """Fold {"stats", "failures"} job results into the coordinator's dicts."""
+    for payload, result, error in results:
+        if result is None:
+            failures.setdefault("job_queue", []).append({"job": payload, "reason": error})
+            continue
+
+        for k, v in result["stats"].items():
+            stats[k] = stats.get(k, 0) + v
+
+        for k, items in result["failures"].items():
+            failures.setdefault(k, []).extend(items)
@@ -0,0 +1,41 @@
+# ================================
+# BOUNDED CONCURRENCY
+# ================================
+#
+# One place for how many API requests the scripts keep in flight.
+# Set MIGRATION_MAX_WORKERS in .env to tune it for the org's rate limits.
+
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+MAX_WORKERS = max(1, int(os.getenv("MIGRATION_MAX_WORKERS", "8")))
+
+
+def run_bounded(fn, items, max_workers=None):
+    """Call fn(item) for every item with at most max_workers in flight.
+
+    Yields (item, result, error) as calls complete; error is None on success
+    and result is None on failure, so callers keep their own failure tracking.
+    """
+    items = list(items)
+    if not items:
+        return
+
+    workers = min(max_workers or MAX_WORKERS, len(items))
+
+    if workers == 1:
+        for item in items:
+            try:
+                yield item, fn(item), None
+            except Exception as e:
+                yield item, None, e
+        return
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(fn, item): item for item in items}
+        for future in as_completed(futures):
+            item = futures[future]
+            try:
+                yield item, future.result(), None
+            except Exception as e:
+                yield item, None, e
@@ -0,0 +1,228 @@
+# ================================
+# REPORT BUILDER
+# ================================
+#
+# Collects a report as named sections of buffered text chunks instead of
+# writing straight to the file. Each section is rendered exactly once, so the
+# same content can be written as Markdown, JSON or HTML without recomputing.
+#
+# Usage:
+#
+#     report = ReportBuilder("Verkada Camera Migration Report")
+#
+#     with report.section("summary", data=stats) as f:
+#         f.write("## Migration Summary\n\n")
+#
+#     report.deferred("cameras", render_cameras)   # rendered later, in parallel
+#     report.write(report_path)
+
+import os
+import re
+import json
+import html
+from concurrent.futures import ThreadPoolExecutor
+
+# Extra formats written next to the Markdown report, e.g. REPORT_FORMATS="md,json,html"
+REPORT_FORMATS = os.getenv("REPORT_FORMATS", "md")
+
+
+class Section:
+    """One named block of a report. Mimics the file API (write/writelines)."""
+
+    def __init__(self, name, data=None):
+        self.name = name
+        self.data = data
+        self.chunks = []
+
+    def write(self, text):
+        self.chunks.append(text)
+
+    def writelines(self, lines):
+        self.chunks.extend(lines)
+
+    def render(self):
+        return "".join(self.chunks)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+class ReportBuilder:
+    def __init__(self, title):
+        self.title = title
+        self._sections = []   # (Section, render_fn or None), in output order
+        self._rendered = None
+
+    # ----------------------------------
+    # BUILDING
+    # ----------------------------------
+    def section(self, name, data=None):
+        """Add a section that is written to directly (use as a context manager)."""
+        s = Section(name, data)
+        self._sections.append((s, None))
+        self._rendered = None
+        return s
+
+    def deferred(self, name, render_fn, data=None):
+        """Add a section whose content is produced later by render_fn(section).
+
+        Deferred sections are independent of each other, so they are rendered
+        concurrently when the report is rendered.
+        """
+        s = Section(name, data)
+        self._sections.append((s, render_fn))
+        self._rendered = None
+        return s
+
+    # ----------------------------------
+    # RENDERING
+    # ----------------------------------
+    def render(self, parallel=True):
+        """Render every deferred section once and return the sections in order."""
+        if self._rendered is not None:
+            return self._rendered
+
+        pending = [(s, fn) for s, fn in self._sections if fn is not None]
+
+        if parallel and len(pending) > 1:
+            with ThreadPoolExecutor(max_workers=min(len(pending), os.cpu_count() or 4)) as pool:
+                list(pool.map(lambda item: item[1](item[0]), pending))
+        else:
+            for s, fn in pending:
+                fn(s)
+
+        self._rendered = [s for s, _ in self._sections]
+        return self._rendered
+
+    def to_markdown(self):
+        return "".join(s.render() for s in self.render())
+
+    def to_json(self):
+        return json.dumps(
+            {
+                "title": self.title,
+                "sections": [
+                    {"name": s.name, "data": s.data, "markdown": s.render()}
+                    for s in self.render()
+                ],
+            },
+            indent=2,
+            default=str,
+        )
+
+    def to_html(self):
+        body = "\n".join(
+            f'<section id="{html.escape(s.name)}">\n{_markdown_to_html(s.render())}\n</section>'
+            for s in self.render()
+        )
+        return (
+            "<!DOCTYPE html>\n<html>\n<head>\n<meta charset=\"utf-8\">\n"
+            f"<title>{html.escape(self.title)}</title>\n</head>\n<body>\n{body}\n</body>\n</html>\n"
+        )
+
+    # ----------------------------------
+    # OUTPUT
+    # ----------------------------------
+    def write(self, path, formats=None):
+        """Write the Markdown report in one pass, plus any extra formats requested.
+
+        formats defaults to the REPORT_FORMATS environment variable ("md").
+        JSON/HTML are written next to the Markdown file with the same stem.
+        """
+        formats = [fmt.strip().lower() for fmt in (formats or REPORT_FORMATS).split(",") if fmt.strip()]
+        stem, _ = os.path.splitext(path)
+
+        outputs = {"md": (path, self.to_markdown),
+                   "json": (stem + ".json", self.to_json),
+                   "html": (stem + ".html", self.to_html)}
+
+        written = []
+        for fmt in formats or ["md"]:
+            if fmt not in outputs:
+                continue
+            out_path, render = outputs[fmt]
+            with open(out_path, "w", encoding="utf-8") as f:
+                f.write(render())
+            written.append(out_path)
+
+        return written
+
+
+# ----------------------------------
+# MINIMAL MARKDOWN → HTML
+# (Covers what the migration reports use: headings, lists, tables, rules, code)
+# ----------------------------------
+_HEADING = re.compile(r"^(#{1,6})\s+(.*)$")
+_BOLD = re.compile(r"\*\*(.+?)\*\*")
+_CODE = re.compile(r"`([^`]+)`")
+
+
+def _inline(text):
+    text = html.escape(text)
+    text = _BOLD.sub(r"<strong>\1</strong>", text)
+    return _CODE.sub(r"<code>\1</code>", text)
+
+
+def _markdown_to_html(md):
+    out = []
+    in_list = False
+    in_table = False
+    in_code = False
+
+    def close_blocks():
+        nonlocal in_list, in_table
+        if in_list:
+            out.append("</ul>")
+            in_list = False
+        if in_table:
+            out.append("</table>")
+            in_table = False
+
+    for line in md.splitlines():
+        stripped = line.strip()
+
+        if stripped.startswith("```"):
+            close_blocks()
+            out.append("</pre>" if in_code else "<pre>")
+            in_code = not in_code
+            continue
+        if in_code:
+            out.append(html.escape(line))
+            continue
+
+        heading = _HEADING.match(stripped)
+        if heading:
+            close_blocks()
+            level = len(heading.group(1))
+            out.append(f"<h{level}>{_inline(heading.group(2))}</h{level}>")
+        elif stripped == "---":
+            close_blocks()
+            out.append("<hr>")
+        elif stripped.startswith("|"):
+            cells = [c.strip() for c in stripped.strip("|").split("|")]
+            if all(set(c) <= set("-:") for c in cells):
+                continue
+            if not in_table:
+                close_blocks()
+                out.append("<table>")
+                in_table = True
+            out.append("<tr>" + "".join(f"<td>{_inline(c)}</td>" for c in cells) + "</tr>")
+        elif stripped.startswith("- "):
+            if not in_list:
+                close_blocks()
+                out.append("<ul>")
+                in_list = True
+            out.append(f"<li>{_inline(stripped[2:])}</li>")
+        elif stripped:
+            close_blocks()
+            out.append(f"<p>{_inline(stripped)}</p>")
+        else:
+            close_blocks()
+
+    close_blocks()
+    if in_code:
+        out.append("</pre>")
+    return "\n".join(out)
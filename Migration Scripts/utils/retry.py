@@ -0,0 +1,99 @@
+# ================================
+# SAFE RETRIES FOR ORG B WRITES
+# ================================
+#
+# Retries transient failures (429, 5xx, dropped connections, timeouts) with
+# exponential backoff and full jitter. Anything else (400, 404, 409, ...) is
+# raised straight away, exactly as before.
+#
+# Idempotent writes (settings updates, toggles) are simply re-sent. Creates
+# are not: the failed request may have landed before the connection dropped,
+# so before re-sending, verify() looks the object up in Org B by its natural
+# key (external_id, group name, plate, event type name). If it is there, that
+# object is returned as the result instead of creating a duplicate.
+
+import os
+import re
+import time
+import random
+
+RETRY_ATTEMPTS = max(1, int(os.getenv("RETRY_ATTEMPTS", "4")))
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 30.0
+
+# Only status text in the shapes HTTP libraries use ("503 Server Error",
+# "HTTP 429", "status code 502") — not any 3-digit number, which could be a
+# card number or ID quoted in a 400 message
+_STATUS_IN_MESSAGE = re.compile(
+    r"\b(?:HTTP(?:/\d(?:\.\d)?)?|status(?:[ _]code)?)[\s:=]*(408|429|5\d\d)\b"
+    r"|\b(408|429|5\d\d) (?:Client|Server) Error\b",
+    re.IGNORECASE,
+)
+_NETWORK_ERRORS = ("ConnectionError", "Timeout", "ReadTimeout", "ConnectTimeout", "ChunkedEncodingError")
+
+
+def status_of(exc):
+    """HTTP status carried by a client exception, if any."""
+    for candidate in (exc, getattr(exc, "response", None)):
+        for attr in ("status_code", "status"):
+            status = getattr(candidate, attr, None)
+            if isinstance(status, int):
+                return status
+    return None
+
+
+def is_transient(exc):
+    status = status_of(exc)
+    if status is not None:
+        return status in (408, 429) or status >= 500
+
+    if isinstance(exc, (ConnectionError, TimeoutError)):
+        return True
+    if any(cls.__name__ in _NETWORK_ERRORS for cls in type(exc).__mro__):
+        return True
+
+    # pykada sometimes re-raises HTTP errors as plain exceptions with the status in the message
+    return bool(_STATUS_IN_MESSAGE.search(str(exc)))
+
+
+def backoff_delay(attempt, exc=None):
+    """Full jitter: uniform(0, min(max, base * 2^attempt)), or the server's Retry-After."""
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    retry_after = headers.get("Retry-After")
+    if retry_after:
+        try:
+            return min(RETRY_MAX_DELAY, float(retry_after))
+        except ValueError:
+            pass
+
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+
+
+def retry_call(fn, *args, idempotent=True, verify=None, attempts=None, **kwargs):
+    """Call fn(*args, **kwargs), retrying transient failures.
+
+    For non-idempotent calls pass verify(), returning the existing Org B object
+    (or None). Without verify, non-idempotent calls are never re-sent. If
+    verify itself fails the original error is raised rather than risking a
+    duplicate.
+    """
+    attempts = attempts or RETRY_ATTEMPTS
+
+    for attempt in range(attempts):
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            if attempt == attempts - 1 or not is_transient(e):
+                raise
+            if not idempotent and verify is None:
+                raise
+
+            time.sleep(backoff_delay(attempt, e))
+
+            if not idempotent:
+                try:
+                    existing = verify()
+                except Exception:
+                    raise e
+                if existing:
+                    return existing
@@ -0,0 +1,217 @@
+# ================================
+# ACCESS SCHEDULE ANALYSIS
+# ================================
+#
+# Turns each access level's access_schedule_events into a compact bitmap over
+# the week (one bit per minute, one bitmap per door_status), so identical
+# schedules can be deduped across thousands of levels in a single pass and
+# common patterns (24/7, weekday hours, daily hours) recognized with plain
+# integer comparisons instead of per-day list scans.
+
+DAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+DAY_INDEX = {d: i for i, d in enumerate(DAYS)}
+
+MINUTES_PER_DAY = 24 * 60
+WEEK_MINUTES = 7 * MINUTES_PER_DAY
+
+GRANTED = "access_granted"
+
+
+def _mask(lo, hi):
+    """Bitmap with bits [lo, hi) set."""
+    return ((1 << (hi - lo)) - 1) << lo if hi > lo else 0
+
+
+DAY_MASK = _mask(0, MINUTES_PER_DAY)
+FULL_WEEK = _mask(0, WEEK_MINUTES)
+
+
+def _minutes(hhmm, is_end=False):
+    h, m = (hhmm or "00:00").split(":")[:2]
+    minutes = int(h) * 60 + int(m)
+    # The API closes a full day with 23:59; treat it as end-of-day
+    if is_end and minutes >= MINUTES_PER_DAY - 1:
+        return MINUTES_PER_DAY
+    return minutes
+
+
+def _fmt(minutes):
+    if minutes >= MINUTES_PER_DAY:
+        return "23:59"
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def _runs(bits):
+    """Yield (start, end) minute runs of set bits."""
+    offset = 0
+    while bits:
+        low = (bits & -bits).bit_length() - 1
+        bits >>= low
+        offset += low
+        length = (bits ^ (bits + 1)).bit_length() - 1
+        yield offset, offset + length
+        bits >>= length
+        offset += length
+
+
+# ----------------------------------
+# EVENTS → BITMAP SIGNATURE
+# ----------------------------------
+# (weekday, start, end) → bitmap; the same few blocks repeat across most levels
+_EVENT_MASKS = {}
+
+
+def _event_mask(weekday, start_time, end_time):
+    """Week bitmap for one event, or None if it can't be placed on the week."""
+    day = DAY_INDEX.get(weekday)
+    if day is None:
+        return None
+    try:
+        start = _minutes(start_time)
+        end = _minutes(end_time, is_end=True)
+    except (ValueError, AttributeError):
+        return None
+    if not (0 <= start < MINUTES_PER_DAY and 0 <= end <= MINUTES_PER_DAY) or start == end:
+        return None
+
+    base = day * MINUTES_PER_DAY
+    if end > start:
+        return _mask(base + start, base + end)
+
+    # Overnight block (e.g. 22:00 → 06:00): this day's tail plus the next
+    # day's head; Sunday night wraps to Monday morning
+    next_base = ((day + 1) % 7) * MINUTES_PER_DAY
+    return _mask(base + start, base + MINUTES_PER_DAY) | _mask(next_base, next_base + end)
+
+
+def schedule_signature(events):
+    """Return a hashable signature: (bitmaps, raw).
+
+    bitmaps is sorted ((door_status, week_bitmap), ...); identical schedules
+    (regardless of event order or how blocks were split) produce identical
+    bitmaps. raw holds, verbatim, any event that couldn't be bitmapped
+    (unknown weekday, unparseable times), so it is never silently dropped.
+    """
+    by_status = {}
+    raw = set()
+    for ev in events or []:
+        key = (ev.get("weekday"), ev.get("start_time"), ev.get("end_time"))
+        status = ev.get("door_status") or GRANTED
+        if key not in _EVENT_MASKS:
+            _EVENT_MASKS[key] = _event_mask(*key)
+        mask = _EVENT_MASKS[key]
+        if mask is None:
+            raw.add(tuple(str(v) if v is not None else "" for v in key) + (status,))
+            continue
+        by_status[status] = by_status.get(status, 0) | mask
+    return tuple(sorted(by_status.items())), tuple(sorted(raw))
+
+
+def day_bits(bitmap, day):
+    return (bitmap >> (day * MINUTES_PER_DAY)) & DAY_MASK
+
+
+def blocks(signature):
+    """Canonical (merged) schedule blocks for a signature, then any raw events."""
+    bitmaps, raw = signature
+    out = []
+    for status, bitmap in bitmaps:
+        for day, name in enumerate(DAYS):
+            for start, end in _runs(day_bits(bitmap, day)):
+                out.append({
+                    "weekday": name,
+                    "start_time": _fmt(start),
+                    "end_time": _fmt(end),
+                    "door_status": status,
+                })
+    for weekday, start_time, end_time, status in raw:
+        out.append({
+            "weekday": weekday,
+            "start_time": start_time,
+            "end_time": end_time,
+            "door_status": status,
+        })
+    return out
+
+
+# ----------------------------------
+# CLASSIFICATION
+# ----------------------------------
+def _single_window(bits):
+    runs = list(_runs(bits))
+    if len(runs) == 1:
+        return f"{_fmt(runs[0][0])}–{_fmt(runs[0][1])}"
+    return None
+
+
+def classify(signature):
+    """Return (kind, label) for a schedule signature."""
+    bitmaps, raw = signature
+    if raw:
+        # Events we couldn't interpret: never call these 24/7 or empty
+        return "custom", "Custom schedule"
+
+    if not bitmaps:
+        return "none", "No schedule (likely 24/7)"
+
+    if len(bitmaps) != 1 or bitmaps[0][0] != GRANTED:
+        return "custom", "Custom schedule"
+
+    bitmap = bitmaps[0][1]
+    if bitmap == FULL_WEEK:
+        return "24/7", "Access granted 24/7"
+
+    days = [day_bits(bitmap, d) for d in range(7)]
+
+    if len(set(days)) == 1:
+        window = _single_window(days[0])
+        if window:
+            return "daily", f"Every day {window}"
+
+    if len(set(days[:5])) == 1 and days[0] and not days[5] and not days[6]:
+        window = _single_window(days[0])
+        if window:
+            return "weekdays", f"Weekdays (MO–FR) {window}"
+
+    return "custom", "Custom schedule"
+
+
+# ----------------------------------
+# BATCH ANALYSIS
+# ----------------------------------
+def analyze_levels(levels):
+    """Dedupe schedules across all levels in one pass.
+
+    levels: normalized levels with "access_level_id", "name" and "schedule".
+
+    Returns (patterns, level_pattern) where patterns is a list of
+    {"pattern_id", "kind", "label", "blocks", "level_ids", "level_names"}
+    ordered by how many levels share them, and level_pattern maps
+    access_level_id → pattern.
+    """
+    by_signature = {}
+    level_pattern = {}
+
+    for lvl in levels:
+        sig = schedule_signature(lvl["schedule"])
+        pattern = by_signature.get(sig)
+        if pattern is None:
+            kind, label = classify(sig)
+            pattern = {
+                "signature": sig,
+                "kind": kind,
+                "label": label,
+                "level_ids": [],
+                "level_names": [],
+            }
+            by_signature[sig] = pattern
+        pattern["level_ids"].append(lvl["access_level_id"])
+        pattern["level_names"].append(lvl["name"])
+        level_pattern[lvl["access_level_id"]] = pattern
+
+    patterns = sorted(by_signature.values(), key=lambda p: -len(p["level_ids"]))
+    for n, pattern in enumerate(patterns, start=1):
+        pattern["pattern_id"] = n
+        pattern["blocks"] = blocks(pattern.pop("signature"))
+
+    return patterns, level_pattern
@@ -0,0 +1,122 @@
+# ================================
+# CAMERA SERIAL ↔ CAMERA ID INDEX
+# ================================
+#
+# Serial numbers are the only stable identity of a camera across orgs: after
+# a claim it gets a new camera_id in Org B. This index maps both ways in O(1)
+# and is persisted per org in ../CSVs/.cache so post-claim tools don't
+# re-download the whole fleet on every run.
+#
+# Refresh policy:
+#   - a cached index older than SERIAL_INDEX_MAX_AGE seconds is re-fetched
+#   - a lookup miss on a cached index re-fetches once (the camera may have
+#     been claimed since the cache was written)
+#   - refresh=True always re-fetches
+
+import os
+import json
+import time
+import hashlib
+
+from utils.transforms import camera_list, normalize_cameras
+
+CACHE_DIR = "../CSVs/.cache"
+SERIAL_INDEX_MAX_AGE = int(os.getenv("SERIAL_INDEX_MAX_AGE", "3600"))
+
+
+class SerialIndex:
+    def __init__(self, serial_to_id=None, fetched_at=None, cam_client=None, org=None, from_cache=False):
+        self.serial_to_id = dict(serial_to_id or {})
+        self.id_to_serial = {cam_id: serial for serial, cam_id in self.serial_to_id.items()}
+        self.fetched_at = fetched_at or time.time()
+        self._cam_client = cam_client
+        self._org = org
+        # Only an index read from disk can be stale enough to refresh on a miss
+        self._may_refresh = from_cache and cam_client is not None
+
+    # ----------------------------------
+    # BUILD / LOAD
+    # ----------------------------------
+    @classmethod
+    def from_cameras(cls, cameras, **kwargs):
+        """Index already-normalized camera dicts (see utils.transforms.normalize_cameras)."""
+        return cls({c["serial"]: c["camera_id"] for c in cameras if c["serial"] and c["camera_id"]}, **kwargs)
+
+    @classmethod
+    def fetch(cls, cam_client, org=None):
+        cameras = normalize_cameras(camera_list(cam_client.get_camera_data()))
+        index = cls.from_cameras(cameras, cam_client=cam_client, org=org)
+        if org:
+            index.save(org)
+        return index
+
+    @classmethod
+    def load(cls, cam_client, org, max_age=None, refresh=False):
+        """Cached index for org ("A" / "B") if fresh enough, otherwise re-fetched."""
+        max_age = SERIAL_INDEX_MAX_AGE if max_age is None else max_age
+        path = cls.cache_path(org)
+
+        if not refresh and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                cached = json.load(f)
+            if time.time() - cached["fetched_at"] <= max_age:
+                return cls(cached["serial_to_id"], cached["fetched_at"],
+                           cam_client=cam_client, org=org, from_cache=True)
+
+        return cls.fetch(cam_client, org)
+
+    @staticmethod
+    def cache_path(org):
+        return os.path.join(CACHE_DIR, f"serial_index_{org}.json")
+
+    def save(self, org):
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(self.cache_path(org), "w", encoding="utf-8") as f:
+            json.dump({"fetched_at": self.fetched_at, "serial_to_id": self.serial_to_id}, f)
+
+    # ----------------------------------
+    # LOOKUPS
+    # ----------------------------------
+    def camera_id(self, serial):
+        cam_id = self.serial_to_id.get(serial)
+        if cam_id is None and self._refresh_on_miss():
+            cam_id = self.serial_to_id.get(serial)
+        return cam_id
+
+    def serial(self, camera_id):
+        serial = self.id_to_serial.get(camera_id)
+        if serial is None and self._refresh_on_miss():
+            serial = self.id_to_serial.get(camera_id)
+        return serial
+
+    def unclaimed(self, serials):
+        """Serials (in order) that have no camera in this org."""
+        return [s for s in serials if self.camera_id(s) is None]
+
+    def __contains__(self, serial):
+        return self.camera_id(serial) is not None
+
+    def __len__(self):
+        return len(self.serial_to_id)
+
+    def fingerprint(self):
+        """Hash of the whole mapping; equal fingerprints mean nothing was claimed or removed."""
+        digest = hashlib.sha256()
+        for serial, cam_id in sorted(self.serial_to_id.items()):
+            digest.update(f"{serial}\0{cam_id}\n".encode("utf-8"))
+        return digest.hexdigest()
+
+    @property
+    def age(self):
+        return time.time() - self.fetched_at
+
+    def _refresh_on_miss(self):
+        if not self._may_refresh:
+            return False
+        self._may_refresh = False
+
+        fresh = self.fetch(self._cam_client, self._org)
+        self.serial_to_id = fresh.serial_to_id
+        self.id_to_serial = fresh.id_to_serial
+        self.fetched_at = fresh.fetched_at
+        return True
@@ -0,0 +1,76 @@
+# ================================
+# MULTI-PROCESS SHARDING
+# ================================
+#
+# Splits a large entity list across N worker processes by a stable hash of
+# each entity's ID. Each worker is a separate Python process (its own GIL,
+# connection pool, stats and failures), started as:
+#
+#     python -m <worker_module> <shard_input.json> <shard_output.json>
+#
+# The coordinator waits for every shard and merges their stats/failures.
+
+import os
+import sys
+import json
+import zlib
+import tempfile
+import subprocess
+
+# Workers are started from the "Migration Scripts" folder so `utils` imports
+# and the relative ../CSVs paths resolve the same way as for the scripts
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def shard_of(key, shards):
+    """Stable shard number for key (unlike hash(), identical across processes)."""
+    return zlib.crc32(str(key).encode("utf-8")) % shards
+
+
+def partition(items, shards, key):
+    parts = [[] for _ in range(shards)]
+    for item in items:
+        parts[shard_of(key(item), shards)].append(item)
+    return parts
+
+
+def run_shards(worker_module, shard_inputs):
+    """Run one worker process per shard input and return their results in order."""
+    with tempfile.TemporaryDirectory(prefix="shards_") as workdir:
+        procs = []
+        for n, shard_input in enumerate(shard_inputs):
+            in_path = os.path.join(workdir, f"shard_{n}_in.json")
+            out_path = os.path.join(workdir, f"shard_{n}_out.json")
+            with open(in_path, "w", encoding="utf-8") as f:
+                json.dump(shard_input, f)
+
+            proc = subprocess.Popen(
+                [sys.executable, "-m", worker_module, in_path, out_path],
+                cwd=SCRIPTS_DIR,
+            )
+            procs.append((n, proc, out_path))
+
+        results = []
+        for n, proc, out_path in procs:
+            code = proc.wait()
+            if code != 0 or not os.path.exists(out_path):
+                results.append({"error": f"shard {n} exited with code {code}", "shard": n})
+                continue
+            with open(out_path, encoding="utf-8") as f:
+                results.append(json.load(f))
+
+        return results
+
+
+def merge_shard_results(results, stats, failures):
+    """Fold every shard's stats/failures into the coordinator's dicts."""
+    for result in results:
+        if "error" in result:
+            failures.setdefault("shard", []).append(result)
+            continue
+
+        for k, v in result["stats"].items():
+            stats[k] = stats.get(k, 0) + v
+
+        for k, items in result["failures"].items():
+            failures.setdefault(k, []).extend(items)
@@ -0,0 +1,91 @@
+# ================================
+# PER-SITE CAMERA CRAWL
+# ================================
+#
+# Cameras.py STEP 2 fetches cloud backup + audio settings for every camera.
+# The crawl partitions the fleet by site_id and queues cameras site by site
+# on one bounded pool, so settings for several sites are in flight at once
+# and each site's CSV shard is written the moment its last camera returns:
+#
+#     ../CSVs/camera_sites/<site>__<site_id>.csv
+#     ../CSVs/camera_sites/index.csv     (site_id, site, cameras, shard)
+#
+# Regional teams can start rebuilding their site as soon as its shard lands;
+# the merged camera_data_backup.csv is still written by Cameras.py.
+
+import os
+import re
+import csv
+from collections import OrderedDict
+
+from utils.pool import run_bounded
+
+SITES_DIR = "../CSVs/camera_sites"
+INDEX_COLUMNS = ["site_id", "site", "cameras", "shard"]
+
+_UNSAFE = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+def partition_by_site(cameras):
+    """site_id → cameras, smallest sites first so their shards finish early."""
+    sites = OrderedDict()
+    for cam in cameras:
+        sites.setdefault(cam.get("site_id") or "unassigned", []).append(cam)
+    return OrderedDict(sorted(sites.items(), key=lambda kv: len(kv[1])))
+
+
+def site_slug(site_id, site_name):
+    """File-name-safe "<site>__<site_id>", shared by the CSV shards and guide pages."""
+    return _UNSAFE.sub("_", f"{site_name or 'site'}__{site_id}").strip("_")
+
+
+def shard_path(site_id, site_name, sites_dir=SITES_DIR):
+    return os.path.join(sites_dir, f"{site_slug(site_id, site_name)}.csv")
+
+
+def _write_csv(path, columns, rows):
+    # Written under a temp name so a half-written shard is never picked up
+    tmp = path + ".tmp"
+    with open(tmp, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        writer.writerows(rows)
+    os.replace(tmp, path)
+
+
+def crawl_sites(cameras, build_row, columns, sites_dir=SITES_DIR, max_workers=None):
+    """Build one CSV row per camera concurrently, sharded by site.
+
+    build_row(cam) → list of values in columns order. Yields
+    (site_id, site_name, shard_path, cameras, rows) as each site completes;
+    rows line up with the site's cameras. The caller writes the merged CSV
+    and the index.
+    """
+    os.makedirs(sites_dir, exist_ok=True)
+
+    sites = partition_by_site(cameras)
+    remaining = {site_id: len(cams) for site_id, cams in sites.items()}
+    rows = {}
+
+    queue = [(site_id, i, cam) for site_id, cams in sites.items() for i, cam in enumerate(cams)]
+
+    for (site_id, i, cam), row, error in run_bounded(lambda job: build_row(job[2]), queue, max_workers):
+        if error is not None:
+            # build_row records its own API failures; keep the camera with what we know
+            row = [cam.get(c) for c in columns]
+        rows[(site_id, i)] = row
+        remaining[site_id] -= 1
+
+        if remaining[site_id] == 0:
+            site_rows = [rows.pop((site_id, n)) for n in range(len(sites[site_id]))]
+            site_name = sites[site_id][0].get("site")
+            path = shard_path(site_id, site_name, sites_dir)
+            _write_csv(path, columns, site_rows)
+            yield site_id, site_name, path, sites[site_id], site_rows
+
+
+def write_site_index(shards, sites_dir=SITES_DIR):
+    """shards: [(site_id, site, camera count, shard file name)] → index.csv path."""
+    path = os.path.join(sites_dir, "index.csv")
+    _write_csv(path, INDEX_COLUMNS, sorted(shards, key=lambda s: str(s[1] or "")))
+    return path
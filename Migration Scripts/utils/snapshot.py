@@ -0,0 +1,223 @@
+# ================================
+# SNAPSHOT ARCHIVE
+# ================================
+#
+# Packs every export in ../CSVs and ../Documentation into a content-addressed
+# store. Files are split into chunks (groups of CSV rows / text lines, fixed
+# blocks for binary files), each chunk is compressed and stored once under
+# its SHA-256, and a manifest records how to reassemble every file.
+#
+# Chunk boundaries are content-defined (a row ends a chunk when its hash hits
+# a target), so inserting or changing a few entities only changes the chunks
+# around them — later snapshots of the same org reuse everything else.
+#
+# Layout:
+#
+#     ../Snapshots/objects/ab/abcdef....zst   (or .gz)
+#     ../Snapshots/manifests/<label>_<timestamp>.json
+
+import os
+import gzip
+import json
+import zlib
+import hashlib
+from datetime import datetime, timezone
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+SNAPSHOT_DIR = "../Snapshots"
+SOURCE_DIRS = ["../CSVs", "../Documentation"]
+
+TEXT_EXTENSIONS = {".csv", ".md", ".json", ".jsonl", ".html", ".txt"}
+
+# A line ends a chunk when crc32(line) % CHUNK_TARGET == 0 → ~256 rows per chunk
+CHUNK_TARGET = 256
+MAX_CHUNK_LINES = 4096
+BINARY_CHUNK_BYTES = 1024 * 1024
+
+
+# ----------------------------------
+# COMPRESSION
+# ----------------------------------
+def _codec():
+    return "zst" if zstandard is not None else "gz"
+
+
+def _compress(data, codec):
+    if codec == "zst":
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def _decompress(data, codec):
+    if codec == "zst":
+        if zstandard is None:
+            raise ImportError("zstandard is required to read .zst snapshot objects")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+# ----------------------------------
+# CHUNKING
+# ----------------------------------
+def _chunks(path, data):
+    """Split file contents into content-defined chunks."""
+    if os.path.splitext(path)[1].lower() not in TEXT_EXTENSIONS:
+        for i in range(0, len(data), BINARY_CHUNK_BYTES):
+            yield data[i:i + BINARY_CHUNK_BYTES]
+        return
+
+    lines = data.splitlines(keepends=True)
+
+    # Keep a CSV header in its own chunk so every row chunk is header-independent
+    if path.lower().endswith(".csv") and lines:
+        yield lines[0]
+        lines = lines[1:]
+
+    current = []
+    for line in lines:
+        current.append(line)
+        if zlib.crc32(line) % CHUNK_TARGET == 0 or len(current) >= MAX_CHUNK_LINES:
+            yield b"".join(current)
+            current = []
+    if current:
+        yield b"".join(current)
+
+
+# ----------------------------------
+# OBJECT STORE
+# ----------------------------------
+def _object_path(root, digest, codec):
+    return os.path.join(root, "objects", digest[:2], f"{digest}.{codec}")
+
+
+def _find_object(root, digest):
+    for codec in ("zst", "gz"):
+        path = _object_path(root, digest, codec)
+        if os.path.exists(path):
+            return path, codec
+    return None, None
+
+
+def _store_chunk(root, chunk, codec):
+    """Store a chunk if it is new. Returns (digest, stored_bytes or 0 if reused)."""
+    digest = hashlib.sha256(chunk).hexdigest()
+    existing, _ = _find_object(root, digest)
+    if existing:
+        return digest, 0
+
+    path = _object_path(root, digest, codec)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    compressed = _compress(chunk, codec)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(compressed)
+    os.replace(tmp, path)
+    return digest, len(compressed)
+
+
+# ----------------------------------
+# SNAPSHOT / RESTORE
+# ----------------------------------
+def create_snapshot(label="org_a", sources=None, root=SNAPSHOT_DIR):
+    """Archive every file under the source folders. Returns (manifest_path, stats)."""
+    sources = sources or SOURCE_DIRS
+    codec = _codec()
+    created_at = datetime.now(timezone.utc)
+
+    stats = {"files": 0, "chunks": 0, "chunks_new": 0, "bytes_in": 0, "bytes_stored": 0}
+    files = []
+
+    for source in sources:
+        if not os.path.isdir(source):
+            continue
+        base = os.path.dirname(os.path.abspath(source))
+
+        for dirpath, _, filenames in os.walk(source):
+            for name in sorted(filenames):
+                path = os.path.join(dirpath, name)
+                with open(path, "rb") as f:
+                    data = f.read()
+
+                chunk_ids = []
+                for chunk in _chunks(path, data):
+                    digest, stored = _store_chunk(root, chunk, codec)
+                    chunk_ids.append(digest)
+                    stats["chunks"] += 1
+                    if stored:
+                        stats["chunks_new"] += 1
+                        stats["bytes_stored"] += stored
+
+                files.append({
+                    "path": os.path.relpath(os.path.abspath(path), base),
+                    "size": len(data),
+                    "sha256": hashlib.sha256(data).hexdigest(),
+                    "chunks": chunk_ids,
+                })
+                stats["files"] += 1
+                stats["bytes_in"] += len(data)
+
+    manifest = {
+        "label": label,
+        "created_at": created_at.isoformat(),
+        "codec": codec,
+        "stats": stats,
+        "files": files,
+    }
+
+    manifest_dir = os.path.join(root, "manifests")
+    os.makedirs(manifest_dir, exist_ok=True)
+    # Microsecond stamp plus an exclusive create, so two snapshots with the
+    # same label never overwrite each other's manifest
+    stamp = created_at.strftime("%Y%m%dT%H%M%S%fZ")
+    attempt = 0
+    while True:
+        suffix = f"-{attempt}" if attempt else ""
+        manifest_path = os.path.join(manifest_dir, f"{label}_{stamp}{suffix}.json")
+        try:
+            with open(manifest_path, "x", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=2)
+            break
+        except FileExistsError:
+            attempt += 1
+
+    return manifest_path, stats
+
+
+def restore_snapshot(manifest_path, dest, root=SNAPSHOT_DIR):
+    """Rebuild every file recorded in a manifest under dest. Returns files restored."""
+    with open(manifest_path, encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    restored = 0
+    for entry in manifest["files"]:
+        parts = []
+        for digest in entry["chunks"]:
+            path, codec = _find_object(root, digest)
+            if path is None:
+                raise FileNotFoundError(f"Missing snapshot object {digest} for {entry['path']}")
+            with open(path, "rb") as f:
+                parts.append(_decompress(f.read(), codec))
+
+        data = b"".join(parts)
+        if hashlib.sha256(data).hexdigest() != entry["sha256"]:
+            raise ValueError(f"Checksum mismatch restoring {entry['path']}")
+
+        out_path = os.path.join(dest, entry["path"])
+        os.makedirs(os.path.dirname(out_path), exist_ok=True)
+        with open(out_path, "wb") as f:
+            f.write(data)
+        restored += 1
+
+    return restored
+
+
+def list_snapshots(root=SNAPSHOT_DIR):
+    manifest_dir = os.path.join(root, "manifests")
+    if not os.path.isdir(manifest_dir):
+        return []
+    return sorted(os.path.join(manifest_dir, name) for name in os.listdir(manifest_dir) if name.endswith(".json"))
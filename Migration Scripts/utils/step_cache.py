@@ -0,0 +1,146 @@
+# ================================
+# PER-STEP RESULT CACHE (PARTIAL RERUNS)
+# ================================
+#
+# Lets a script run only some of its steps (AccessControl.py --steps ...).
+# Every step that runs saves what later steps and the report need, together
+# with the stats and failures it added, to ../CSVs/.cache/<script>_<step>.json.
+# A step that is skipped is restored from that file instead, so the report
+# and failure log still cover the whole migration.
+#
+#     cache = StepCache("AccessControl", stats, failures)
+#     if "groups" in steps:
+#         cache.begin("groups")
+#         ...
+#         cache.save("groups", group_name_to_b_id=group_name_to_b_id)
+#     else:
+#         group_name_to_b_id = (cache.restore("groups") or {}).get("group_name_to_b_id", {})
+#
+# Stats are counters, so a step's contribution is stored as the difference
+# between stats before and after it ran; failures as the entries it appended.
+# After a --retry-failures replay, prune_cached_failures() drops the cached
+# failures it fixed, so skipped steps don't put them back in the failure log.
+
+import os
+import json
+import time
+from collections import Counter
+
+CACHE_DIR = "../CSVs/.cache"
+
+
+class StepCache:
+    def __init__(self, script, stats, failures, cache_dir=CACHE_DIR):
+        self.script = script
+        self.stats = stats
+        self.failures = failures
+        self.cache_dir = cache_dir
+        self._started = {}
+
+    def path(self, step):
+        return os.path.join(self.cache_dir, f"{self.script}_{step}.json")
+
+    def begin(self, step):
+        """Mark where a step's stats and failures start."""
+        self._started[step] = (
+            dict(self.stats),
+            {category: len(items) for category, items in self.failures.items()},
+        )
+
+    def save(self, step, **outputs):
+        """Persist the step's outputs plus the stats/failures added since begin()."""
+        stats_before, failures_before = self._started.pop(step)
+        record = {
+            "saved_at": time.time(),
+            "stats": {k: v - stats_before.get(k, 0) for k, v in self.stats.items() if v != stats_before.get(k, 0)},
+            "failures": {
+                category: items[failures_before.get(category, 0):]
+                for category, items in self.failures.items()
+                if len(items) > failures_before.get(category, 0)
+            },
+            "outputs": outputs,
+        }
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.path(step)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(record, f, default=str)
+        os.replace(tmp, path)
+
+    def restore(self, step):
+        """Merge a skipped step's cached stats/failures in and return its outputs.
+
+        Returns None (and changes nothing) when the step has never been run.
+        """
+        try:
+            with open(self.path(step), encoding="utf-8") as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            print(f"  • {step}: no cached results from an earlier run (its report rows will be empty)")
+            return None
+
+        for k, v in record["stats"].items():
+            self.stats[k] = self.stats.get(k, 0) + v
+        for category, items in record["failures"].items():
+            self.failures.setdefault(category, []).extend(items)
+
+        saved = time.strftime("%Y-%m-%d %H:%M", time.localtime(record["saved_at"]))
+        print(f"  • {step}: using results cached {saved}")
+        return record["outputs"]
+
+
+def _replay_key(category, item):
+    return category, item["operation"], json.dumps(item["args"], default=str), json.dumps(item["kwargs"], default=str)
+
+
+def prune_cached_failures(script, still_failing, cache_dir=CACHE_DIR):
+    """Drop cached replayable failures that are no longer in the failure log.
+
+    still_failing is what replay_failures() left in the log (records carry
+    their "category"); a cached failure with the same operation and arguments
+    is kept, any other replayable one was fixed by the replay. Failures that
+    cannot be replayed are left alone. Returns how many were dropped.
+    """
+    remaining = Counter(
+        _replay_key(r["category"], r) for r in still_failing if r.get("operation") and "category" in r
+    )
+    dropped = 0
+
+    try:
+        names = sorted(os.listdir(cache_dir))
+    except OSError:
+        return 0
+
+    for name in names:
+        if not (name.startswith(f"{script}_") and name.endswith(".json")):
+            continue
+        path = os.path.join(cache_dir, name)
+        try:
+            with open(path, encoding="utf-8") as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            continue
+
+        changed = False
+        for category, items in record.get("failures", {}).items():
+            kept = []
+            for item in items:
+                if isinstance(item, dict) and item.get("operation"):
+                    key = _replay_key(category, item)
+                    if remaining[key] <= 0:
+                        changed = True
+                        dropped += 1
+                        continue
+                    remaining[key] -= 1
+                kept.append(item)
+            items[:] = kept
+
+        if changed:
+            record["failures"] = {category: items for category, items in record["failures"].items() if items}
+            tmp = path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(record, f, default=str)
+            os.replace(tmp, path)
+
+    return dropped
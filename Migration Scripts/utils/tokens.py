@@ -0,0 +1,128 @@
+# ================================
+# SHARED API TOKENS WITH PROACTIVE REFRESH
+# ================================
+#
+# Each pykada client normally owns a VerkadaTokenManager, which refreshes its
+# 30-minute token inline from whichever request happens to notice it is
+# stale — with no lock, so on a busy pool every worker fetches at once, and a
+# failed fetch fails that request.
+#
+# Here there is one manager per API key, shared by every client in the
+# process. After the first fetch a background thread renews the token
+# TOKEN_REFRESH_LEAD seconds before it expires (retrying with backoff if the
+# token endpoint hiccups), so requests just read the current token. Only if
+# the token is actually about to lapse does a request fetch one itself, and
+# then the first thread in fetches while the others wait for its result.
+#
+#     cam_a = CamerasClient(token_manager=shared_token_manager(api_key_a))
+
+import os
+import threading
+from datetime import datetime, timezone
+
+from pykada.api_tokens import VerkadaTokenManager, resolve_base_url
+
+from utils.retry import retry_call, backoff_delay
+
+TOKEN_REFRESH_LEAD = int(os.getenv("TOKEN_REFRESH_LEAD", "300"))
+
+MIN_VALIDITY = 30   # seconds; a token closer to expiry than this is never handed out
+
+
+def _seconds_left(expiry):
+    return (expiry - datetime.now(timezone.utc)).total_seconds()
+
+
+class SharedTokenManager(VerkadaTokenManager):
+    def __init__(self, api_key, refresh_lead=None, **kwargs):
+        super().__init__(api_key, **kwargs)
+        lead = TOKEN_REFRESH_LEAD if refresh_lead is None else refresh_lead
+        # Never renew more often than every half token lifetime
+        self.refresh_lead = min(lead, self._token_lifetime_minutes * 30)
+        self.refreshes = 0
+
+        # (token, expiry) is swapped as one tuple so readers never pair a new
+        # token with the old expiry
+        self._current = (None, None)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._refresher = None
+
+    def get_token(self):
+        token, expiry = self._current
+        if token and _seconds_left(expiry) > MIN_VALIDITY:
+            return token
+
+        with self._lock:
+            # Another thread may have refreshed while we waited for the lock
+            token, expiry = self._current
+            if token and _seconds_left(expiry) > MIN_VALIDITY:
+                return token
+            token = self._refresh()
+
+        self._start_refresher()
+        return token
+
+    def _refresh(self):
+        """Fetch and publish a new token. Caller holds self._lock."""
+        token, expiry = retry_call(self._fetch_new_token)
+        self._current = (token, expiry)
+        self._token, self._token_expiry = token, expiry
+        self.refreshes += 1
+        return token
+
+    # ----------------------------------
+    # BACKGROUND REFRESH
+    # ----------------------------------
+    def _start_refresher(self):
+        with self._lock:
+            # is_alive(): a forked worker inherits the manager but not the thread
+            if self._refresher is None or not self._refresher.is_alive():
+                self._refresher = threading.Thread(target=self._refresh_loop, name="token-refresh", daemon=True)
+                self._refresher.start()
+
+    def _refresh_loop(self):
+        attempt = 0
+        while not self._stop.is_set():
+            _, expiry = self._current
+            wait = 0 if attempt == 0 else backoff_delay(attempt)
+            wait = max(wait, _seconds_left(expiry) - self.refresh_lead)
+            if self._stop.wait(wait):
+                return
+
+            try:
+                with self._lock:
+                    if _seconds_left(self._current[1]) <= self.refresh_lead:
+                        self._refresh()
+                attempt = 0
+            except Exception:
+                # The current token is still good for a while; keep trying.
+                # If it does lapse, the next get_token() fetches inline.
+                attempt += 1
+
+    def close(self):
+        """Stop the background refresher."""
+        self._stop.set()
+
+
+# ----------------------------------
+# ONE MANAGER PER API KEY
+# ----------------------------------
+_managers = {}
+_managers_lock = threading.Lock()
+
+
+def shared_token_manager(api_key):
+    """The process-wide SharedTokenManager for api_key.
+
+    Returns None when no key is set, so clients fall back to pykada's default
+    (VERKADA_API_KEY) exactly as if they had been given api_key=None.
+    """
+    if not api_key:
+        return None
+    with _managers_lock:
+        manager = _managers.get(api_key)
+        if manager is None:
+            # Same host the client would have picked from VERKADA_REGION / VERKADA_BASE_URL
+            manager = _managers[api_key] = SharedTokenManager(api_key, base_url=resolve_base_url())
+        return manager
@@ -0,0 +1,49 @@
+# ================================
+# ORG B USER EXISTENCE INDEX
+# ================================
+#
+# Bulk-loads Org B's access users once and indexes them by external_id and
+# by email, so reruns (or a partially pre-populated Org B) skip users that
+# already exist instead of spending a create_user request on a 409.
+
+
+from utils.transforms import normalize_email
+
+
+class UserIndex:
+    def __init__(self, members=()):
+        self.members = list(members)
+        self.by_external_id = {}
+        self.by_email = {}
+
+        for m in self.members:
+            ext = m.get("external_id")
+            if ext:
+                self.by_external_id[ext] = m
+
+            email = normalize_email(m.get("email"))
+            if email:
+                self.by_email.setdefault(email, m)
+
+    @classmethod
+    def load(cls, access_client):
+        """Index every access user in the org behind access_client."""
+        return cls(access_client.get_all_access_users()["access_members"])
+
+    def __len__(self):
+        return len(self.by_external_id)
+
+    def find(self, external_id=None, email=None):
+        """Return (member, matched_on) or (None, None).
+
+        external_id wins over email; an email-only match means the user exists
+        in Org B but was not created by this utility.
+        """
+        if external_id and external_id in self.by_external_id:
+            return self.by_external_id[external_id], "external_id"
+
+        email = normalize_email(email)
+        if email and email in self.by_email:
+            return self.by_email[email], "email"
+
+        return None, None
@@ -0,0 +1,128 @@
+# ================================
+# COMPACT ACCESS USER RECORDS
+# ================================
+#
+# AccessControl.py holds every Org A user (and, for the credential pre-check,
+# every user's access details) for the whole run. Raw API dicts cost several
+# KB each; these __slots__ records keep only the fields the migration reads,
+# with repeated strings (departments, companies, titles, group names, card
+# types) interned so 50k users share one copy of each.
+#
+# Records are built as soon as a response is parsed and the raw dict is
+# dropped. to_dict()/from_dict() carry them to shard and queue workers.
+
+import sys
+from collections import namedtuple
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+Card = namedtuple("Card", "type card_number card_number_hex card_number_base36 facility_code active")
+Plate = namedtuple("Plate", "license_plate_number name active")
+
+
+class UserRecord:
+    """One entry of get_all_access_users()["access_members"]."""
+
+    __slots__ = ("user_id", "full_name", "email", "company_name",
+                 "department", "department_id", "employee_title",
+                 "first_name", "last_name")
+
+    def __init__(self, user_id, full_name, email="", company_name=None,
+                 department=None, department_id=None, employee_title=None,
+                 first_name=None, last_name=None):
+        self.user_id = user_id
+        self.full_name = full_name
+        # Filled in batch by utils.transforms.normalize_users
+        self.first_name = first_name
+        self.last_name = last_name
+        self.email = email
+        self.company_name = _intern(company_name)
+        self.department = _intern(department)
+        self.department_id = _intern(department_id)
+        self.employee_title = _intern(employee_title)
+
+    @classmethod
+    def from_api(cls, member):
+        return cls(
+            member["user_id"],
+            member["full_name"],
+            member.get("email", ""),
+            member.get("company_name"),
+            member.get("department"),
+            member.get("department_id"),
+            member.get("employee_title"),
+        )
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(**d)
+
+
+class AccessProfile:
+    """The parts of get_access_user() that STEP 3 migrates."""
+
+    __slots__ = ("ble_unlock", "remote_unlock", "start_date", "end_date",
+                 "entry_code", "groups", "cards", "mfa_codes", "plates")
+
+    def __init__(self, ble_unlock=False, remote_unlock=False, start_date=None, end_date=None,
+                 entry_code=None, groups=(), cards=(), mfa_codes=(), plates=()):
+        self.ble_unlock = ble_unlock
+        self.remote_unlock = remote_unlock
+        self.start_date = start_date
+        self.end_date = end_date
+        self.entry_code = entry_code
+        self.groups = groups
+        self.cards = cards
+        self.mfa_codes = mfa_codes
+        self.plates = plates
+
+    @classmethod
+    def from_api(cls, full):
+        return cls(
+            bool(full.get("ble_unlock")),
+            bool(full.get("remote_unlock")),
+            full.get("start_date"),
+            full.get("end_date"),
+            full.get("entry_code"),
+            tuple(_intern(g["name"]) for g in full.get("access_groups", [])),
+            tuple(
+                Card(
+                    _intern(c.get("type", "")),
+                    c.get("card_number"),
+                    c.get("card_number_hex"),
+                    c.get("card_number_base36"),
+                    _intern(c.get("facility_code", "")),
+                    c.get("active", False),
+                )
+                for c in full.get("cards", [])
+            ),
+            tuple(m.get("code", "unknown") for m in full.get("mfa_codes", [])),
+            tuple(
+                Plate(lp.get("license_plate_number"), lp.get("name", None), lp.get("active", False))
+                for lp in full.get("license_plates", [])
+            ),
+        )
+
+    def to_dict(self):
+        d = {name: getattr(self, name) for name in self.__slots__}
+        d["groups"] = list(self.groups)
+        d["cards"] = [c._asdict() for c in self.cards]
+        d["mfa_codes"] = list(self.mfa_codes)
+        d["plates"] = [lp._asdict() for lp in self.plates]
+        return d
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(**{
+            **d,
+            "groups": tuple(_intern(g) for g in d.get("groups", ())),
+            "cards": tuple(Card(**c) for c in d.get("cards", ())),
+            "mfa_codes": tuple(d.get("mfa_codes", ())),
+            "plates": tuple(Plate(**lp) for lp in d.get("plates", ())),
+        })
@@ -0,0 +1,128 @@
+# ================================
+# CROSS-ORG VERIFICATION (HASH JOINS)
+# ================================
+#
+# Verify.py bulk-fetches the same entities from Org A and Org B and compares
+# them here. Every comparison is a hash join: one dict is built over Org B on
+# the join key (external_id, name, plate, serial) and Org A is probed against
+# it, so a 50k-user org is compared in linear time.
+#
+# Results are accumulated per entity:
+#
+#     summary[entity] = {"matched", "missing_in_b", "extra_in_b", "field_mismatches"}
+#     mismatches      = [{"entity", "key", "field", "org_a", "org_b"}]
+#
+# Anything that could not be fetched is in the caller's failures dict (passed
+# in); such a run is INCOMPLETE rather than PASS, since what was not fetched
+# was not compared.
+
+
+def hash_join(left, right, key_left, key_right=None):
+    """Join two lists on a key. Returns (pairs, only_left, only_right).
+
+    pairs is [(key, left_item, right_item)] in left order; items whose key is
+    None are treated as unmatched. Duplicate right keys keep the first item.
+    """
+    key_right = key_right or key_left
+
+    index = {}
+    for r in right:
+        k = key_right(r)
+        if k is not None:
+            index.setdefault(k, r)
+
+    pairs = []
+    only_left = []
+    matched = set()
+    for l in left:
+        k = key_left(l)
+        r = index.get(k) if k is not None else None
+        if r is None:
+            only_left.append(l)
+        else:
+            pairs.append((k, l, r))
+            matched.add(k)
+
+    only_right = [r for k, r in index.items() if k not in matched]
+    return pairs, only_left, only_right
+
+
+def _same(a, b):
+    # CSV/API values drift in type (1 vs "1", None vs ""); compare as text
+    a = "" if a is None else str(a)
+    b = "" if b is None else str(b)
+    return a == b
+
+
+class Verification:
+    def __init__(self, failures=None):
+        self.failures = failures if failures is not None else {}   # category → [fetch failure]
+        self.summary = {}
+        self.mismatches = []
+        self.missing = {}   # entity → [key] present in A only
+        self.extra = {}     # entity → [key] present in B only
+
+    def _entity(self, entity):
+        return self.summary.setdefault(
+            entity, {"matched": 0, "missing_in_b": 0, "extra_in_b": 0, "field_mismatches": 0}
+        )
+
+    def join(self, entity, items_a, items_b, key_a, key_b=None, label=None):
+        """hash_join and record what exists on one side only. Returns the pairs."""
+        pairs, only_a, only_b = hash_join(items_a, items_b, key_a, key_b)
+        label_a = label or key_a
+        label_b = label or key_b or key_a
+
+        counts = self._entity(entity)
+        counts["matched"] += len(pairs)
+        counts["missing_in_b"] += len(only_a)
+        counts["extra_in_b"] += len(only_b)
+        self.missing.setdefault(entity, []).extend(label_a(x) for x in only_a)
+        self.extra.setdefault(entity, []).extend(label_b(x) for x in only_b)
+        return pairs
+
+    def compared(self, entity):
+        """Count one entity that was compared without a join of its own (memberships, credentials)."""
+        self._entity(entity)["matched"] += 1
+
+    def diff(self, entity, key, values_a, values_b):
+        """Compare two {field: value} dicts for one matched entity."""
+        found = False
+        for field, a in values_a.items():
+            b = values_b.get(field)
+            if not _same(a, b):
+                self.mismatches.append({"entity": entity, "key": key, "field": field, "org_a": a, "org_b": b})
+                self._entity(entity)["field_mismatches"] += 1
+                found = True
+        return found
+
+    def diff_sets(self, entity, key, field, set_a, set_b):
+        """Set-valued field (groups, cards, ...): reports what B lacks and what B has extra."""
+        missing = set_a - set_b
+        extra = set_b - set_a
+        if not missing and not extra:
+            return False
+        self.mismatches.append({
+            "entity": entity, "key": key, "field": field,
+            "org_a": "; ".join(sorted(missing)), "org_b": "; ".join(sorted(extra)),
+        })
+        self._entity(entity)["field_mismatches"] += 1
+        return True
+
+    @property
+    def fetch_failures(self):
+        return sum(len(items) for items in self.failures.values())
+
+    @property
+    def clean(self):
+        """True when everything in Org A was fetched and is in Org B unchanged (extras in B are allowed)."""
+        return not self.fetch_failures and all(
+            not c["missing_in_b"] and not c["field_mismatches"] for c in self.summary.values()
+        )
+
+    @property
+    def status(self):
+        """PASS, FAIL (missing or different in Org B) or INCOMPLETE (some fetches failed)."""
+        if self.fetch_failures:
+            return "INCOMPLETE"
+        return "PASS" if self.clean else "FAIL"